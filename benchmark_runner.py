@@ -1,5 +1,6 @@
 ﻿import argparse
 from typing import Optional
+from src.domain.enums import DuckDBProfile, RemoteIOBackend
 from src.presentation.configuration import initialize_dependencies
 from src.presentation.entrypoints import (
     db_scan_blob_storage,
@@ -35,19 +36,38 @@ from src.presentation.entrypoints import (
     national_scale_spatial_join_databricks_2_nodes,
     national_scale_spatial_join_databricks_4_nodes,
     national_scale_spatial_join_databricks_8_nodes,
+    national_scale_spatial_join_duckdb_out_of_core,
+    national_scale_spatial_join_duckdb_pruned,
+    db_scan_blob_storage_parallel,
+    spatial_aggregation_grid_duckdb_parallel,
+    vector_tiles_load_vmt_sync,
+    vector_tiles_load_vmt_async,
+    vector_tiles_single_tile_static_mvt,
+    vector_tiles_100k_static_mvt,
+    conflation_iou_sql,
+    conflation_iou_strtree,
+    partition_key_vectorized,
+    fkb_polygonization_tiled,
+    fkb_polygonization_global,
 )
 
 
 def benchmark_runner() -> None:
     """
     In-container entrypoint executed by each Azure Container Instance. Parses the
-    ``--script-id``, ``--benchmark-run`` and ``--run-id`` CLI arguments, initializes
-    the dependency injection container, and dispatches to the matching benchmark
-    function in ``src/presentation/entrypoints/``. Raises ``ValueError`` if the
-    script ID is unknown.
+    ``--script-id``, ``--benchmark-run``, ``--run-id``, ``--duckdb-profile`` and
+    ``--remote-io-backend`` CLI arguments, initializes the dependency injection container, and dispatches to the
+    matching benchmark function in ``src/presentation/entrypoints/``. Raises
+    ``ValueError`` if the script ID is unknown.
     """
-    script_id, benchmark_run, run_id = _get_args()
-    initialize_dependencies(run_id=run_id, benchmark_run=benchmark_run)
+    script_id, benchmark_run, run_id, duckdb_profile, remote_io_backend = _get_args()
+    initialize_dependencies(
+        run_id=run_id,
+        benchmark_run=benchmark_run,
+        script_id=script_id,
+        duckdb_profile=duckdb_profile,
+        remote_io_backend=remote_io_backend
+    )
 
     match script_id:
         case "db-scan-blob-storage":
@@ -146,6 +166,45 @@ def benchmark_runner() -> None:
         case "national-scale-spatial-join-databricks-8-nodes":
             national_scale_spatial_join_databricks_8_nodes()
             return
+        case "national-scale-spatial-join-duckdb-out-of-core":
+            national_scale_spatial_join_duckdb_out_of_core()
+            return
+        case "national-scale-spatial-join-duckdb-pruned":
+            national_scale_spatial_join_duckdb_pruned()
+            return
+        case "db-scan-blob-storage-parallel":
+            db_scan_blob_storage_parallel()
+            return
+        case "spatial-aggregation-grid-duckdb-parallel":
+            spatial_aggregation_grid_duckdb_parallel()
+            return
+        case "vector-tiles-load-vmt-sync":
+            vector_tiles_load_vmt_sync()
+            return
+        case "vector-tiles-load-vmt-async":
+            vector_tiles_load_vmt_async()
+            return
+        case "vector-tiles-single-tile-static-mvt":
+            vector_tiles_single_tile_static_mvt()
+            return
+        case "vector-tiles-100k-static-mvt":
+            vector_tiles_100k_static_mvt()
+            return
+        case "conflation-iou-sql":
+            conflation_iou_sql()
+            return
+        case "conflation-iou-strtree":
+            conflation_iou_strtree()
+            return
+        case "partition-key-vectorized":
+            partition_key_vectorized()
+            return
+        case "fkb-polygonization-tiled":
+            fkb_polygonization_tiled()
+            return
+        case "fkb-polygonization-global":
+            fkb_polygonization_global()
+            return
         case "setup-framework":
             setup_benchmarking_framework()
             return
@@ -153,7 +212,7 @@ def benchmark_runner() -> None:
             raise ValueError("Script ID is invalid")
 
 
-def _get_args() -> tuple[str, int, Optional[str]]:
+def _get_args() -> tuple[str, int, Optional[str], Optional[str], Optional[str]]:
     parser = argparse.ArgumentParser("doppa-data")
     parser.add_argument(
         "--script-id",
@@ -172,8 +231,20 @@ def _get_args() -> tuple[str, int, Optional[str]]:
         help="Run identifier. Randomly generated and prefixed with today's date",
     )
 
+    parser.add_argument(
+        "--duckdb-profile",
+        choices=[profile.value for profile in DuckDBProfile],
+        help="DuckDB resource profile. Defaults to the DUCKDB_PROFILE environment variable or 'default'",
+    )
+
+    parser.add_argument(
+        "--remote-io-backend",
+        choices=[backend.value for backend in RemoteIOBackend],
+        help="Remote I/O backend used by DuckDB. Defaults to the REMOTE_IO_BACKEND environment variable or 'az'",
+    )
+
     args = parser.parse_args()
-    return args.script_id, int(args.benchmark_run), args.run_id
+    return args.script_id, int(args.benchmark_run), args.run_id, args.duckdb_profile, args.remote_io_backend
 
 
 if __name__ == "__main__":
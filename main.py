@@ -101,6 +101,8 @@ def _run_container_benchmark(
     docker_image = str(experiment["image"])
     cpu = str(experiment["cpu"])
     memory_gb = str(experiment["memory_gb"])
+    duckdb_profile = _get_duckdb_profile(experiment=experiment, benchmark_run=benchmark_run)
+    remote_io_backend = _get_remote_io_backend(experiment=experiment, benchmark_run=benchmark_run)
 
     container_group_name = f"benchmark-{experiment_id}"
     _delete_container_instance(container_group_name=container_group_name)
@@ -112,11 +114,45 @@ def _run_container_benchmark(
         docker_image=docker_image,
         cpu=cpu,
         memory_gb=memory_gb,
+        duckdb_profile=duckdb_profile,
+        remote_io_backend=remote_io_backend,
     )
     _check_container_state(container_group_name=container_group_name)
     _delete_container_instance(container_group_name=container_group_name)
 
 
+def _get_duckdb_profile(
+    experiment: dict[str, str | int | list[str]], benchmark_run: int
+) -> str | None:
+    """
+    Selects the DuckDB profile for an experiment. Experiments listing ``duckdb_profiles`` in
+    ``benchmarks.yml`` rotate through the profiles across benchmark runs, so setting
+    ``BENCHMARK_RUNS`` to a multiple of the number of profiles sweeps every profile equally often.
+    """
+    profiles = experiment.get("duckdb_profiles")
+    if not profiles:
+        return None
+
+    return str(profiles[(benchmark_run - 1) % len(profiles)])  # type: ignore
+
+
+def _get_remote_io_backend(
+    experiment: dict[str, str | int | list[str]], benchmark_run: int
+) -> str | None:
+    """
+    Selects the remote I/O backend for an experiment. Experiments listing ``remote_io_backends`` in
+    ``benchmarks.yml`` advance to the next backend once every DuckDB profile has been run, so
+    ``BENCHMARK_RUNS`` equal to the number of profiles times the number of backends covers every
+    combination.
+    """
+    backends = experiment.get("remote_io_backends")
+    if not backends:
+        return None
+
+    profile_count = len(experiment.get("duckdb_profiles") or [None])  # type: ignore
+    return str(backends[((benchmark_run - 1) // profile_count) % len(backends)])  # type: ignore
+
+
 def _create_run_id() -> str:
     date_prefix = date.today().isoformat()
     suffix = "".join(
@@ -208,6 +244,8 @@ def _create_container_instance(
     docker_image: str,
     cpu: str,
     memory_gb: str,
+    duckdb_profile: str | None = None,
+    remote_io_backend: str | None = None,
 ) -> None:
     acr_login_server = os.getenv("ACR_LOGIN_SERVER")
 
@@ -217,6 +255,10 @@ def _create_container_instance(
         f"--benchmark-run {benchmark_run} "
         f"--run-id {run_id}"
     )
+    if duckdb_profile is not None:
+        startup_command += f" --duckdb-profile {duckdb_profile}"
+    if remote_io_backend is not None:
+        startup_command += f" --remote-io-backend {remote_io_backend}"
 
     create_command = [
         "az",
@@ -264,13 +306,16 @@ def _create_container_instance(
     logger.info(f"Creating container group '{container_group_name}'...")
     _run_cmd(create_command)
     logger.info(
-        "Benchmark run %s/%s - Created container group '%s' (experiment=%s, CPU=%s cores, RAM=%s GB, run_id=%s)",
+        "Benchmark run %s/%s - Created container group '%s' (experiment=%s, CPU=%s cores, RAM=%s GB, "
+        "DuckDB profile=%s, remote I/O backend=%s, run_id=%s)",
         benchmark_run,
         Config.BENCHMARK_RUNS,
         container_group_name,
         experiment_id,
         cpu,
         memory_gb,
+        duckdb_profile or "default",
+        remote_io_backend or "az",
         run_id,
     )
 
@@ -1,17 +1,20 @@
 import datetime
 import functools
+import json
 
 from src import Config
 from src.application.common import logger
 from src.application.common.monitor_utils import (
     _get_run_id,
     _get_benchmark_run,
+    _get_duckdb_settings,
+    _get_remote_io_metrics_collector,
     _measure_io,
     _save_run,
     _save_run_metadata,
     _save_run_cost_analytics,
 )
-from src.application.dtos import CostConfiguration, DatabricksRunResult
+from src.application.dtos import CostConfiguration, DatabricksRunResult, QueryResult
 from src.domain.enums import BenchmarkIteration, BlobOperationType, SchemaVersion
 
 
@@ -30,6 +33,9 @@ def monitor(
     :param cost_configuration: Which Azure cost components to compute and store.
     :param skip_warmup: Disable warmup runs. Use for Databricks, since each run provisions a cluster and warmup would multiply cost. Default is False.
     :param elapsed_from_result: Treat the wrapped function's return value as a (elapsed_seconds, cardinality) tuple instead of using wall-clock time and len(result). Use for Databricks, since the notebook self-reports both. Default is False.
+
+    If the wrapped function returns a `QueryResult`, the cardinality is taken from its rows and its
+    metrics are stored as JSON in the `query_metrics` column of each sample.
     """
 
     def decorator(func):
@@ -39,6 +45,8 @@ def monitor(
 
             run_id = _get_run_id()
             benchmark_run = _get_benchmark_run()
+            duckdb_settings = _get_duckdb_settings()
+            remote_io_metrics_collector = _get_remote_io_metrics_collector()
 
             logger.info(
                 f"Starting benchmark for query '{query_id}' with run ID '{run_id}'."
@@ -65,6 +73,7 @@ def monitor(
             for i in range(benchmark_iteration.value):
                 iteration = i + 1
 
+                remote_io_metrics_collector.reset()
                 started_at = datetime.datetime.now(datetime.UTC)
                 (
                     result,
@@ -75,6 +84,7 @@ def monitor(
                     cpu_time_system_seconds,
                 ) = _measure_io(func, *args, **kwargs)
                 ended_at = datetime.datetime.now(datetime.UTC)
+                remote_io_metrics = remote_io_metrics_collector.snapshot()
 
                 executor_input_bytes_read = None
                 executor_run_time_ms = None
@@ -82,6 +92,7 @@ def monitor(
                 shuffle_write_bytes = None
                 driver_collection_time_ms = None
                 stage_durations_ms = None
+                query_metrics = None
 
                 if elapsed_from_result:
                     if isinstance(result, DatabricksRunResult):
@@ -95,6 +106,10 @@ def monitor(
                         stage_durations_ms = result.stage_durations_ms
                     else:
                         elapsed_time, result_cardinality = result
+                elif isinstance(result, QueryResult):
+                    elapsed_time = wall_elapsed_time
+                    result_cardinality = len(result.rows)
+                    query_metrics = json.dumps(result.metrics)
                 else:
                     elapsed_time = wall_elapsed_time
                     result_cardinality = len(result) if result is not None else -1
@@ -124,7 +139,12 @@ def monitor(
                             "shuffle_write_bytes": shuffle_write_bytes,
                             "driver_collection_time_ms": driver_collection_time_ms,
                             "stage_durations_ms": stage_durations_ms,
-                            "schema_version": SchemaVersion.V3.value,
+                            "duckdb_profile": duckdb_settings.profile,
+                            "duckdb_settings": duckdb_settings.to_json(),
+                            "query_metrics": query_metrics,
+                            "remote_io_backend": remote_io_metrics.backend,
+                            "remote_io_metrics": remote_io_metrics.to_json(),
+                            "schema_version": SchemaVersion.V6.value,
                         }
                     ],
                 )
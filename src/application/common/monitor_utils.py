@@ -11,8 +11,9 @@ from dependency_injector.wiring import inject, Provide
 
 from src import Config
 from src.application.common import logger
+from src.application.common.remote_io_metrics_collector import RemoteIOMetricsCollector
 from src.application.contracts import IMonitoringStorageService, IAzureCostService
-from src.application.dtos import CostConfiguration
+from src.application.dtos import CostConfiguration, DuckDBSettings
 from src.domain.enums import BlobOperationType
 from src.infra.infrastructure import Containers
 
@@ -40,6 +41,20 @@ def _get_benchmark_run(
     return benchmark_run
 
 
+@inject
+def _get_duckdb_settings(
+    duckdb_settings: DuckDBSettings = Provide[Containers.duckdb_settings],
+) -> DuckDBSettings:
+    return duckdb_settings
+
+
+@inject
+def _get_remote_io_metrics_collector(
+    remote_io_metrics_collector: RemoteIOMetricsCollector = Provide[Containers.remote_io_metrics_collector],
+) -> RemoteIOMetricsCollector:
+    return remote_io_metrics_collector
+
+
 @inject
 def _save_run(
     run_id: str,
@@ -0,0 +1,55 @@
+import threading
+
+from src.application.dtos import RemoteIOMetrics
+from src.domain.enums import RemoteIOBackend
+
+
+class RemoteIOMetricsCollector:
+    """
+    Thread-safe counter for the range requests issued by Python-side remote filesystems. DuckDB's
+    native azure extension does not expose its requests, so the metrics are None for that backend.
+    """
+    __backend: RemoteIOBackend
+    __lock: threading.Lock
+    __request_count: int
+    __bytes_read: int
+    __total_latency_seconds: float
+    __max_latency_seconds: float
+
+    def __init__(self, backend: RemoteIOBackend) -> None:
+        self.__backend = backend
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def record(self, bytes_read: int, latency_seconds: float) -> None:
+        with self.__lock:
+            self.__request_count += 1
+            self.__bytes_read += bytes_read
+            self.__total_latency_seconds += latency_seconds
+            self.__max_latency_seconds = max(self.__max_latency_seconds, latency_seconds)
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__request_count = 0
+            self.__bytes_read = 0
+            self.__total_latency_seconds = 0.0
+            self.__max_latency_seconds = 0.0
+
+    def snapshot(self) -> RemoteIOMetrics:
+        if self.__backend == RemoteIOBackend.AZURE_EXTENSION:
+            return RemoteIOMetrics(
+                backend=self.__backend.value,
+                request_count=None,
+                bytes_read=None,
+                total_latency_seconds=None,
+                max_latency_seconds=None,
+            )
+
+        with self.__lock:
+            return RemoteIOMetrics(
+                backend=self.__backend.value,
+                request_count=self.__request_count,
+                bytes_read=self.__bytes_read,
+                total_latency_seconds=self.__total_latency_seconds,
+                max_latency_seconds=self.__max_latency_seconds,
+            )
@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Callable
+
+import psutil
+
+from src import Config
+from src.application.common import logger
+
+
+class ResourceSampler:
+    """
+    Background sampler tracking the peak resident set size of the current process and, if a
+    `spill_bytes_reader` is given, the peak number of bytes spilled to disk by the query engine.
+    With `include_children`, the resident set size of all child processes is added to each sample
+    so work fanned out to a process pool is accounted for. Use as a context manager around the code
+    to measure and read `to_metrics()` afterwards.
+    """
+    __interval: float
+    __spill_bytes_reader: Callable[[], int] | None
+    __include_children: bool
+    __thread_event: threading.Event
+    __thread: threading.Thread | None
+    __start_time: float
+
+    def __init__(
+            self,
+            spill_bytes_reader: Callable[[], int] | None = None,
+            interval: float = Config.RESOURCE_SAMPLER_INTERVAL_SECONDS,
+            include_children: bool = False
+    ) -> None:
+        self.__interval = interval
+        self.__spill_bytes_reader = spill_bytes_reader
+        self.__include_children = include_children
+        self.__thread_event = threading.Event()
+        self.__thread = None
+
+        self.peak_rss_bytes = 0
+        self.peak_spill_bytes = 0
+        self.elapsed_time = 0.0
+
+    def __enter__(self) -> "ResourceSampler":
+        self.__start_time = time.perf_counter()
+        self.__sample()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.__thread_event.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout=self.__interval * 4)
+        self.__sample()
+        self.elapsed_time = time.perf_counter() - self.__start_time
+
+    def to_metrics(self) -> dict[str, int | float]:
+        return {
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "peak_spill_bytes": self.peak_spill_bytes,
+            "sampled_elapsed_time": self.elapsed_time,
+        }
+
+    def __run(self) -> None:
+        while not self.__thread_event.wait(self.__interval):
+            self.__sample()
+
+    def __sample(self) -> None:
+        try:
+            self.peak_rss_bytes = max(self.peak_rss_bytes, self.__get_rss_bytes())
+            if self.__spill_bytes_reader is not None:
+                self.peak_spill_bytes = max(self.peak_spill_bytes, int(self.__spill_bytes_reader() or 0))
+        except Exception as e:
+            logger.error(f"Sampling error in ResourceSampler: {e}")
+
+    def __get_rss_bytes(self) -> int:
+        process = psutil.Process()
+        rss_bytes = process.memory_info().rss
+        if not self.__include_children:
+            return rss_bytes
+
+        for child in process.children(recursive=True):
+            try:
+                rss_bytes += child.memory_info().rss
+            except psutil.NoSuchProcess:
+                continue
+
+        return rss_bytes
@@ -9,6 +9,11 @@ from .bytes_service_interface import IBytesService
 from .conflation_service_interface import IConflationService
 from .county_service_interface import ICountyService
 from .dataset_synthesis_service_interface import IDatasetSynthesisService
+from .duckdb_configuration_service_interface import IDuckDBConfigurationService
+from .spatial_join_service_interface import ISpatialJoinService
+from .parallel_scan_service_interface import IParallelScanService
+from .remote_io_service_interface import IRemoteIOService
+from .postgres_seed_service_interface import IPostgresSeedService
 from .file_path_service_interface import IFilePathService
 from .fkb_service_interface import IFKBService
 from .monitoring_storage_service import IMonitoringStorageService
@@ -21,4 +26,9 @@ from .stac_service_interface import IStacService
 from .test_dataset_service_interface import ITestDatasetService
 from .tile_api_service_interface import ITileApiService
 from .tile_service_interface import ITileService
+from .tile_load_service_interface import ITileLoadService
+from .tile_cache_service_interface import ITileCacheService
+from .async_tile_client_service_interface import IAsyncTileClientService
+from .tile_builder_service_interface import ITileBuilderService
+from .tile_workload_service_interface import ITileWorkloadService
 from .vector_service_interface import IVectorService
@@ -0,0 +1,86 @@
+from abc import ABC, abstractmethod
+
+from src.application.dtos import TileLoadReport
+
+
+class IAsyncTileClientService(ABC):
+    @abstractmethod
+    def fetch_vmt_tiles(
+            self,
+            tiles: list[tuple[int, int, int]],
+            concurrency: int,
+            http2: bool,
+            server_url: str | None = None,
+            revalidate: bool = False
+    ) -> TileLoadReport:
+        """
+        Requests every tile in `tiles` from the VMT server with an async HTTP client keeping
+        `concurrency` requests in flight, the way a map client fetches the tiles of a viewport. The
+        client reuses connections unless `Config.TILE_CLIENT_KEEPALIVE` is disabled. With `revalidate`
+        the `ETag` of every fetched tile is kept and sent as `If-None-Match` when the tile is requested
+        again. Failed requests are counted as errors instead of aborting the run.
+        :param tiles: Tiles to request as (z, x, y) tuples, in request order.
+        :param concurrency: Number of requests kept in flight at the same time.
+        :param http2: Whether to negotiate HTTP/2, multiplexing the requests over fewer connections.
+        :param server_url: Base URL of the VMT server. Defaults to `Config.AZURE_VMT_SERVER_URL`.
+        :param revalidate: Whether to revalidate tiles that were fetched before with their ETag.
+        :return: Report with throughput, latency percentiles, error counts, negotiated HTTP version and
+            the `X-Cache` header counts of the run.
+        :rtype: TileLoadReport
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def fetch_pmtiles_tiles(
+            self,
+            pmtiles_url: str,
+            tiles: list[tuple[int, int, int]],
+            concurrency: int,
+            http2: bool,
+            batch_size: int = 1,
+            prefetch: bool = False
+    ) -> TileLoadReport:
+        """
+        Reads every tile in `tiles` from the PMTiles archive at `pmtiles_url` with an async HTTP
+        client keeping `concurrency` batches of `batch_size` consecutive tiles in flight. Each tile is
+        resolved like `pmtiles.reader.Reader.get` by walking the root and leaf directories down to the
+        tile data, with one HTTP range request per step. The tile data ranges of a batch that lie close
+        together in the archive are merged into single range requests, and every tile of a batch is
+        timed until the whole batch has been read. The header and up to
+        `Config.PMTILES_DIRECTORY_CACHE_ENTRIES` deserialized directories are cached for the run, so
+        with a warm cache a read costs a single range request; a cache size of 0 re-reads the header
+        and every directory per tile. With `prefetch` the leaf directories of all tiles are read with
+        merged range requests before the first batch, as part of the timed run. Every range response
+        must be HTTP 206 with the requested length. Failed batches count every tile as an error.
+        :param pmtiles_url: HTTP(S) URL of the PMTiles archive.
+        :param tiles: Tiles to read as (z, x, y) tuples, in request order.
+        :param concurrency: Number of tile batches kept in flight at the same time.
+        :param http2: Whether to negotiate HTTP/2, multiplexing the range requests over fewer connections.
+        :param batch_size: Number of consecutive tiles read as one batch. 1 reads tile by tile.
+        :param prefetch: Whether to read the leaf directories of all tiles up front.
+        :return: Report with throughput, latency percentiles, error counts, negotiated HTTP version and
+            range request, merged request and directory cache counters.
+        :rtype: TileLoadReport
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def fetch_static_mvt_tiles(
+            self,
+            base_url: str,
+            tiles: list[tuple[int, int, int]],
+            concurrency: int,
+            http2: bool
+    ) -> TileLoadReport:
+        """
+        Requests every tile in `tiles` as a `{z}/{x}/{y}.pbf` blob under `base_url` with an async HTTP
+        client keeping `concurrency` requests in flight. Each tile costs one GET request. Missing blobs
+        are counted as not found and failed requests as errors.
+        :param base_url: HTTP(S) URL of the blob prefix holding the tile pyramid.
+        :param tiles: Tiles to request as (z, x, y) tuples, in request order.
+        :param concurrency: Number of requests kept in flight at the same time.
+        :param http2: Whether to negotiate HTTP/2, multiplexing the requests over fewer connections.
+        :return: Report with throughput, latency percentiles, error counts and negotiated HTTP version.
+        :rtype: TileLoadReport
+        """
+        raise NotImplementedError
@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 
+from typing import Iterable
+
 import geopandas as gpd
+import pyarrow as pa
 from azure.storage.blob import ContainerClient
 
 from src.domain.enums import StorageContainer, Theme, DatasetSize
@@ -107,6 +110,40 @@ class IBlobStorageService(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def upload_arrow_tables_as_geoparquet(
+            self,
+            container: StorageContainer,
+            release: str,
+            theme: Theme,
+            region: str,
+            partitions: Iterable[pa.Table],
+            dataset_size: DatasetSize | None = None,
+            row_group_size: int | None = None,
+            first_part_index: int = 0,
+            **kwargs: str
+    ) -> list[str]:
+        """
+        Upload Arrow table partitions as GeoParquet files, consuming `partitions` one table at a time so that
+        only a single partition is held in memory. Each table must carry WKB in `geometry` and a `bbox` struct
+        column with `xmin`, `ymin`, `xmax` and `ymax`, which is declared as the GeoParquet 1.1.0 covering.
+        Blob paths and file names follow `upload_blobs_as_parquet`, and empty partitions are skipped.
+        :param container: Storage container enum to upload to.
+        :param release: Release version on the format 'yyyy-mm-dd.x'.
+        :param theme: Theme enum representing the data theme.
+        :param region: County ID, e.g. '03' for Oslo.
+        :param partitions: Iterable of Arrow tables, one per partition.
+        :param dataset_size: Optional dataset size. When provided, inserts `size={value}/` between
+            release and theme. Omit for raw OSM/FKB writes.
+        :param row_group_size: Optional GeoParquet row group size.
+        :param first_part_index: Index of the first `part_XXXXX.parquet` file, for callers uploading one
+            partition at a time.
+        :param kwargs: Additional Hive partition keys appended between release/size and theme.
+        :return: List of URLs of the uploaded blobs.
+        :rtype: list[str]
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def has_files_under_blob_path_base(self, container: StorageContainer, path: str) -> bool:
         """
@@ -118,6 +155,18 @@ class IBlobStorageService(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def list_parquet_blob_names(self, container: StorageContainer, path: str) -> list[str]:
+        """
+        Lists the names of all Parquet blobs under the specified base path in the given container. The
+        file-name segment is stripped from `path` before listing, the same way as in `get_blob_summary`.
+        :param container: Container enum to list blobs from.
+        :param path: Base path to list blobs from.
+        :return: Sorted list of blob names ending with '.parquet'.
+        :rtype: list[str]
+        """
+        raise NotImplementedError
+
     def get_blob_summary(self, container: StorageContainer, path: str) -> tuple[int, int]:
         """
         Get a summary of blobs under the specified base path in the given container, including total
@@ -1,5 +1,6 @@
 ﻿from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import BinaryIO, Iterator
 
 import pandas as pd
 import geopandas as gpd
@@ -34,6 +35,26 @@ class IBytesService(ABC):
         """
         raise NotImplementedError
 
+    @staticmethod
+    @abstractmethod
+    def convert_parquet_file_to_gdf_batches(
+            file: BinaryIO,
+            epsg_code: EPSGCode,
+            batch_rows: int
+    ) -> Iterator[gpd.GeoDataFrame]:
+        """
+        Streams a parquet file as GeoDataFrame batches of at most `batch_rows` rows. Row groups are read one at a
+        time from the seekable file object, so a remote file opened through fsspec is fetched with ranged reads
+        instead of being downloaded in full. The WKB `geometry` column is decoded per batch with a single
+        vectorized `shapely.from_wkb` call.
+        :param file: Seekable binary file object of the parquet file.
+        :param epsg_code: EPSG code for the coordinate reference system (CRS).
+        :param batch_rows: Maximum number of rows per yielded GeoDataFrame.
+        :return: Iterator of GeoDataFrame batches.
+        :rtype: Iterator[gpd.GeoDataFrame]
+        """
+        raise NotImplementedError
+
     @staticmethod
     @abstractmethod
     def convert_fgb_bytes_to_gdf(
@@ -1,22 +1,33 @@
 from abc import ABC, abstractmethod
 
+from typing import Iterator
+
 import pandas as pd
-import geopandas as gpd
+import pyarrow as pa
 
-from src.domain.enums import Theme
+from src.domain.enums import Theme, ConflationEngine
 
 
 class IConflationService(ABC):
     @abstractmethod
-    def get_fkb_osm_id_relations(self, release: str, theme: Theme, region: str) -> pd.DataFrame:
+    def get_fkb_osm_id_relations(
+            self,
+            release: str,
+            theme: Theme,
+            region: str,
+            engine: ConflationEngine = ConflationEngine.STRTREE
+    ) -> pd.DataFrame:
         """
         Creates a DataFrame relating FKB and OSM building IDs for the given release, theme, and region.
-        Pairs are produced by spatially joining FKB and OSM buildings on a centroid grid: rows with a
-        NULL `osm_id` are FKB-only buildings, rows with a NULL `fkb_id` are OSM-only buildings, and
-        rows with both IDs are overlapping buildings whose IoU exceeds 0.70.
+        Rows with a NULL `osm_id` are FKB-only buildings, rows with a NULL `fkb_id` are OSM-only buildings,
+        and rows with both IDs are overlapping buildings whose IoU exceeds `Config.CONFLATION_IOU_THRESHOLD`.
+        The STRtree engine finds every intersecting pair once with a spatial index and computes the IoU of
+        each pair once. The SQL engine joins the buildings on a centroid grid in DuckDB and misses pairs
+        whose centroids fall in different grid cells.
         :param release: Release identifier on the format 'yyyy-mm-dd.x'.
         :param theme: Theme enum.
         :param region: Region ID, e.g. '03' for Oslo.
+        :param engine: Engine used to find the intersecting FKB/OSM pairs.
         :return: DataFrame with `fkb_id` and `osm_id` columns relating the two datasets.
         :rtype: pd.DataFrame
         """
@@ -29,17 +40,19 @@ class IConflationService(ABC):
             region: str,
             theme: Theme,
             ids: pd.DataFrame
-    ) -> list[gpd.GeoDataFrame]:
+    ) -> Iterator[pa.Table]:
         """
         Selects geometries based on the FKB/OSM ID relations and merges them into a single dataset.
         FKB geometries are preferred when both sources match (rows with both IDs), OSM-only buildings
-        are taken from the OSM source, and FKB-only buildings are taken from the FKB source. The merged
-        dataset is partitioned by `partition_key`.
+        are taken from the OSM source, and FKB-only buildings are taken from the FKB source. The selected
+        IDs are registered as Arrow tables and semi-joined against the raw GeoParquet files. The merged
+        rows are streamed from DuckDB sorted by `partition_key`, and one table is yielded per partition
+        once it is complete. Geometries are WKB, and each table has a GeoParquet `bbox` covering column.
         :param release: Release identifier on the format 'yyyy-mm-dd.x'.
         :param region: Region ID, e.g. '03' for Oslo.
         :param theme: Theme enum.
         :param ids: ID DataFrame relating FKB and OSM IDs, as produced by `get_fkb_osm_id_relations`.
-        :return: A list of GeoDataFrames. Each element is a partition keyed by `partition_key`.
-        :rtype: list[gpd.GeoDataFrame]
+        :return: An iterator of Arrow tables. Each element is a partition keyed by `partition_key`.
+        :rtype: Iterator[pa.Table]
         """
         raise NotImplementedError
@@ -5,16 +5,21 @@ from src.domain.enums import DatasetSize
 
 class IDatasetSynthesisService(ABC):
     @abstractmethod
-    def run_pipeline(self, release: str, target_size: DatasetSize) -> None:
+    def run_pipeline(self, release: str, target_sizes: list[DatasetSize]) -> None:
         """
-        Synthesizes a larger building dataset from the existing `size=small` partition for the given
+        Synthesizes larger building datasets from the existing `size=small` partition for the given
         release by geometric cloning (translate + rotate + jitter). Output is written under
         `release/{release}/size={target_size}/` with the same Hive layout as the source. Only
         `DatasetSize.MEDIUM` and `DatasetSize.LARGE` are valid targets; `DatasetSize.SMALL` is already
-        produced by the conflation step and raises `ValueError`.
+        produced by the conflation step and raises `ValueError`. Each region is read once, and the clones
+        of all target sizes are generated together. Clones are transformed on their coordinate arrays in
+        chunks of at most `Config.SYNTHESIS_CHUNK_ROWS`, and each chunk is uploaded as its own GeoParquet
+        file per size before the next is generated. Source rows are read in `partition_key`, `source`,
+        `external_id` order, and the random draws are seeded with `Config.SYNTHESIS_SEED`, the region and
+        the chunk, so the datasets are reproducible and each size is a superset of the smaller sizes.
         :param release: Release identifier on the format 'yyyy-mm-dd.x'.
-        :param target_size: Target dataset size enum. Must be MEDIUM or LARGE.
+        :param target_sizes: Target dataset size enums. Each must be MEDIUM or LARGE.
         :return: None
-        :raises ValueError: If `target_size` has a non-positive `clones_per_polygon`.
+        :raises ValueError: If `target_sizes` is empty or a size has a non-positive `clones_per_polygon`.
         """
         raise NotImplementedError
@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+
+from src.application.dtos import DuckDBSettings
+from src.domain.enums import DuckDBProfile
+
+
+class IDuckDBConfigurationService(ABC):
+    @abstractmethod
+    def resolve_settings(self, script_id: str | None, profile: DuckDBProfile) -> DuckDBSettings:
+        """
+        Derives the DuckDB settings for the given profile from the container resources of the
+        experiment identified by `script_id`. The `cpu` and `memory_gb` values are read from the
+        benchmark YAML file. When the script is not listed there (e.g. the setup framework or the
+        tile server), the resources visible to the process are used instead. `DuckDBProfile.DEFAULT`
+        leaves every setting unset so DuckDB falls back to its own detection.
+        :param script_id: Script identifier matching an `id` field under `experiments` in the
+            benchmark YAML file, or None when running outside the orchestrator.
+        :param profile: DuckDB profile to derive settings for.
+        :return: Settings to apply to the DuckDB connection.
+        :rtype: DuckDBSettings
+        """
+        raise NotImplementedError
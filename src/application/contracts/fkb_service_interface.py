@@ -1,28 +1,43 @@
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 import geopandas as gpd
 
-from src.domain.enums import EPSGCode
+from src.domain.enums import EPSGCode, PolygonizationStrategy
 
 
 class IFKBService(ABC):
     @abstractmethod
-    def extract_fkb_data(self) -> gpd.GeoDataFrame:
+    def extract_fkb_data(self) -> Iterator[gpd.GeoDataFrame]:
         """
-        Extracts FKB data from the contribution storage container and returns it as a GeoDataFrame.
-        :return: GeoDataFrame containing the extracted FKB data.
-        :rtype: gpd.GeoDataFrame
+        Extracts FKB data from the contribution storage container. The Parquet blob is streamed row group by
+        row group with ranged reads, and batches of at most `BUILDINGS_BATCH_SIZE` features are yielded lazily.
+        :return: Iterator of GeoDataFrame batches containing the extracted FKB data.
+        :rtype: Iterator[gpd.GeoDataFrame]
         """
         raise NotImplementedError
 
     @abstractmethod
-    def create_building_polygons(self, gdf: gpd.GeoDataFrame, crs: EPSGCode) -> gpd.GeoDataFrame:
+    def create_building_polygons(
+            self,
+            gdf: gpd.GeoDataFrame,
+            crs: EPSGCode,
+            strategy: PolygonizationStrategy = PolygonizationStrategy.GLOBAL
+    ) -> gpd.GeoDataFrame:
         """
         Create polygons for buildings from the given GeoDataFrame. Takes the FKB dataset as input and
         merges all building parts into single building polygons. Filters out buildings that do not
         have a point representation. Flattens the geometries to 2D.
+        The global strategy unions every roof-edge line in one DuckDB query and polygonizes the result.
+        The tiled strategy splits the lines on a grid of `FKB_POLYGONIZE_TILE_SIZE_DEGREES` tiles,
+        and each tile also gets the lines within `FKB_POLYGONIZE_TILE_MARGIN_DEGREES` of it. The tiles
+        are polygonized in a process pool. A polygon is only kept by the tile containing its
+        representative point, so polygons crossing tile borders are not duplicated. Polygons reaching
+        further than the margin beyond the tile owning their representative point may be missing or
+        polygonized incorrectly by the tiled strategy, so it is only used when requested explicitly.
         :param gdf: FKB GeoDataFrame.
         :param crs: EPSG code for the coordinate reference system.
+        :param strategy: Strategy used to polygonize the roof-edge lines.
         :return: GeoDataFrame with building polygons.
         :rtype: gpd.GeoDataFrame
         """
@@ -15,3 +15,12 @@ class IMVTService(ABC):
         :rtype: bytes | None
         """
         raise NotImplementedError
+
+    @abstractmethod
+    async def close(self) -> None:
+        """
+        Releases the database connections held by the service. Called once when the tile server shuts
+        down.
+        :return: None
+        """
+        raise NotImplementedError
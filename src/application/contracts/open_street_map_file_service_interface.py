@@ -3,49 +3,41 @@ from abc import ABC, abstractmethod
 from osmium import SimpleHandler
 from osmium.osm import Area
 
-import geopandas as gpd
-
 
 class IOpenStreetMapFileService(ABC, SimpleHandler):
     @staticmethod
     @abstractmethod
     def download_pbf() -> None:
         """
-        Downloads the OpenStreetMap PBF file from the configured source URL to the configured local path.
+        Downloads the OpenStreetMap PBF file from `Config.OSM_PBF_URL` to `Config.OSM_FILE_PATH`.
         Skips the download if the file already exists locally. The file is streamed to disk in chunks to
         avoid loading it fully into memory.
         :return: None
         """
         raise NotImplementedError
 
-    @property
     @abstractmethod
-    def batches(self) -> list[gpd.GeoDataFrame]:
-        """
-        Accumulated building batches produced while parsing the PBF file. Each batch is a GeoDataFrame
-        of up to `BUILDINGS_BATCH_SIZE` building features.
-        :return: List of building batches as GeoDataFrames.
-        :rtype: list[gpd.GeoDataFrame]
+    def create_contribution_dataset(self) -> str:
         """
-        raise NotImplementedError
-
-    @batches.setter
-    @abstractmethod
-    def batches(self, batches: list[gpd.GeoDataFrame]) -> None:
-        """
-        Overwrites the accumulated building batches with the provided list.
-        :param batches: List of building batches as GeoDataFrames.
-        :return: None
+        Converts the OpenStreetMap PBF file into the GeoParquet contribution dataset read by
+        `IOpenStreetMapService.create_building_batches`. Only assembled areas are passed from Osmium to
+        Python. Tags and WKB of buildings are accumulated per column, and each batch of
+        `BUILDINGS_BATCH_SIZE` buildings is encoded to Arrow on `OSM_ENCODER_WORKERS` threads. Batches are
+        written in order as row groups of `Config.OSM_GEOPARQUET_FILE`, which is then uploaded to the
+        contribution container as `Config.OSM_CONTRIBUTION_BLOB`.
+        :return: Blob path of the uploaded contribution dataset.
+        :rtype: str
         """
         raise NotImplementedError
 
     @abstractmethod
     def area(self, area: Area) -> None:
         """
-        Handler invoked by Osmium for each OSM area element. When the area is tagged as a building, a
-        feature is created and appended to the internal buffer. Once the buffer reaches
-        `BUILDINGS_BATCH_SIZE`, it is converted into a GeoDataFrame and appended to `batches`. Areas
-        whose geometry cannot be constructed are skipped with a warning.
+        Handler invoked by Osmium for each OSM area element. When the area is tagged as a building, its ID,
+        hex-encoded WKB and the tags in `OSM_TAG_COLUMNS` are appended to the column buffers. Once the
+        buffers reach `BUILDINGS_BATCH_SIZE`, they are handed to an encoder worker. Areas whose geometry
+        cannot be constructed are skipped with a warning, while a failure to encode or write an earlier
+        batch is raised and aborts `create_contribution_dataset`.
         :param area: OSM area element provided by Osmium.
         :return: None
         """
@@ -54,17 +46,9 @@ class IOpenStreetMapFileService(ABC, SimpleHandler):
     @abstractmethod
     def post_apply_file_cleanup(self) -> None:
         """
-        Flushes any buildings still buffered after the PBF file has been fully parsed into a final
-        batch. Called once after Osmium has finished applying the file.
-        :return: None
-        """
-        raise NotImplementedError
-
-    @abstractmethod
-    def pop_batch_by_index(self, index: int) -> None:
-        """
-        Removes the batch at the given index from `batches`, freeing the memory it held.
-        :param index: Index of the batch to remove from `batches`.
+        Flushes any buildings still buffered after the PBF file has been fully parsed into a final batch,
+        waits for all pending batches to be written and closes the GeoParquet writer. Called once after
+        Osmium has finished applying the file.
         :return: None
         """
         raise NotImplementedError
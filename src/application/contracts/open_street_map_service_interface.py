@@ -1,17 +1,17 @@
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 import geopandas as gpd
 
 
 class IOpenStreetMapService(ABC):
     @abstractmethod
-    def create_building_batches(self) -> list[gpd.GeoDataFrame]:
+    def create_building_batches(self) -> Iterator[gpd.GeoDataFrame]:
         """
-        Create batches of building features from the OSM dataset. The dataset is read from the
-        contribution container as a single Parquet blob and returned as a list with one batch. The
-        list shape is kept to mirror `IOpenStreetMapFileService.batches` which produces many batches
-        when parsing PBF files directly.
-        :return: List of building GeoDataFrames as batches.
-        :rtype: list[gpd.GeoDataFrame]
+        Create batches of building features from the OSM dataset. The Parquet blob in the contribution
+        container is streamed row group by row group with ranged reads, and batches of at most
+        `BUILDINGS_BATCH_SIZE` features are yielded lazily, so the blob is never held in memory in full.
+        :return: Iterator of building GeoDataFrames as batches.
+        :rtype: Iterator[gpd.GeoDataFrame]
         """
         raise NotImplementedError
@@ -0,0 +1,70 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+import pyarrow as pa
+
+from src.domain.enums import DatasetSize, Theme
+
+
+class IParallelScanService(ABC):
+    @abstractmethod
+    def get_release_manifest(self, release: str, theme: Theme, dataset_size: DatasetSize) -> list[str]:
+        """
+        Lists every Parquet file of a release as `az://` paths by listing the blob container once. The
+        manifest lets scans be fanned out per file without DuckDB expanding the glob itself.
+        :param release: Release identifier on the format 'yyyy-mm-dd.x'.
+        :param theme: Theme enum value.
+        :param dataset_size: Dataset size enum value.
+        :return: Sorted list of `az://` file paths.
+        :rtype: list[str]
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def scan_to_arrow(
+            self,
+            files: list[str],
+            partial_sql: str,
+            parameters: list[Any] | None = None,
+            max_workers: int = 8,
+            files_per_task: int = 1
+    ) -> pa.Table:
+        """
+        Runs `partial_sql` once per group of `files_per_task` files, each on its own DuckDB cursor in a
+        thread pool bounded by `max_workers`, and concatenates the resulting Arrow tables. The query must
+        read from the `{source}` placeholder, which is replaced with a `read_parquet` call over the
+        files of the group.
+        :param files: Files to scan, typically from `get_release_manifest`.
+        :param partial_sql: Query run per file group. Must contain the `{source}` placeholder.
+        :param parameters: Optional prepared statement parameters for `partial_sql`.
+        :param max_workers: Maximum number of concurrent cursors.
+        :param files_per_task: Number of files read by each partial query.
+        :return: Concatenation of all partial results.
+        :rtype: pa.Table
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def scan_and_merge(
+            self,
+            files: list[str],
+            partial_sql: str,
+            merge_sql: str,
+            parameters: list[Any] | None = None,
+            max_workers: int = 8,
+            files_per_task: int = 1
+    ) -> list[tuple]:
+        """
+        Runs `scan_to_arrow` and merges the partial results with `merge_sql`, which reads from the
+        `partials` table. Partial aggregates must be mergeable, e.g. `COUNT(*)` is merged with `SUM`
+        and `AVG(x)` is computed from a partial `SUM(x)` and `COUNT(x)`.
+        :param files: Files to scan, typically from `get_release_manifest`.
+        :param partial_sql: Query run per file group. Must contain the `{source}` placeholder.
+        :param merge_sql: Query merging the partial results from the `partials` table.
+        :param parameters: Optional prepared statement parameters for `partial_sql`.
+        :param max_workers: Maximum number of concurrent cursors.
+        :param files_per_task: Number of files read by each partial query.
+        :return: Rows returned by `merge_sql`.
+        :rtype: list[tuple]
+        """
+        raise NotImplementedError
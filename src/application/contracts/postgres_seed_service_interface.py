@@ -0,0 +1,54 @@
+from abc import ABC, abstractmethod
+
+from src.application.dtos import PostgresSeedReport
+from src.domain.enums import DatasetSize
+
+
+class IPostgresSeedService(ABC):
+    @abstractmethod
+    def seed_buildings(self, release: str, dataset_size: DatasetSize, loader_count: int) -> PostgresSeedReport | None:
+        """
+        Seeds the `buildings_{dataset_size}` table in PostgreSQL from the GeoParquet files of the given
+        release. The files are split across `loader_count` loaders. Each loader streams Arrow batches
+        from its own DuckDB cursor into `COPY ... FROM STDIN` as CSV, with the geometry as hex WKB, over
+        its own PostgreSQL connection into an UNLOGGED staging table. The staging table is then copied
+        into a logged table with `INSERT ... SELECT`, which replaces the previous table in one
+        transaction. Finally a GIST index is built, the table is clustered on it, and `VACUUM ANALYZE`
+        is run. The GeoParquet `bbox` covering column is not copied, since the GIST index replaces it.
+        :param release: Release identifier on the format 'yyyy-mm-dd.x'.
+        :param dataset_size: Dataset size to seed.
+        :param loader_count: Number of parallel COPY loaders.
+        :return: Report with the wall-clock time and rows/s of each phase, or None if no rows were found.
+        :rtype: PostgresSeedReport | None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def prepare_tile_tables(self, dataset_size: DatasetSize) -> dict[str, float]:
+        """
+        Prepares the seeded `buildings_{dataset_size}` table for MVT tile serving. Adds a `geom_3857`
+        column holding the geometry in Web Mercator with its own GIST index, so tile queries no longer
+        reproject on every request. Then creates one generalized table per zoom band in
+        `Config.MVT_GENERALIZED_ZOOM_BANDS`. Like the tile builder, each generalized table keeps the
+        unsimplified `geom_3857` of the features whose longest bounding box side is at least
+        `Config.TILE_BUILDER_MIN_FEATURE_PIXELS` pixels at the band's highest zoom level, so both serve
+        the same features at that zoom level. Every generalized table gets a GIST index and is
+        clustered on it. Must run after `seed_buildings`,
+        since seeding replaces the table.
+        :param dataset_size: Dataset size of the seeded table to prepare.
+        :return: Wall-clock seconds per preparation phase.
+        :rtype: dict[str, float]
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_tile_tables_bytes(self, dataset_size: DatasetSize) -> int:
+        """
+        Returns the storage footprint of the tables the VMT server renders tiles from: the seeded
+        `buildings_{dataset_size}` table and its generalized tables, including indexes and TOAST data.
+        Tables that do not exist are skipped.
+        :param dataset_size: Dataset size of the seeded table.
+        :return: Total size in bytes as reported by `pg_total_relation_size`.
+        :rtype: int
+        """
+        raise NotImplementedError
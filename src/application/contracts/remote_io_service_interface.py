@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+
+
+class IRemoteIOService(ABC):
+    @abstractmethod
+    def create_parquet_source(self, path: str) -> str:
+        """
+        Creates a DuckDB relation expression reading the Parquet files at `path` through the remote I/O
+        backend selected for the run. The azure extension backend reads the `az://` path directly, the
+        fsspec backend reads the same files through the registered `adlfs` filesystem under `abfs://`,
+        and the Arrow backend scans a PyArrow dataset over `adlfs` that is handed to DuckDB as an Arrow
+        stream. The Arrow relation decodes the WKB geometry column so that every backend exposes
+        `geometry` as a GEOMETRY column.
+        :param path: Virtual filesystem path on the `az://` scheme, e.g. from
+            `IFilePathService.create_release_virtual_filesystem_path`. May contain glob patterns.
+        :return: Relation expression that can be used in a `FROM` clause.
+        :rtype: str
+        """
+        raise NotImplementedError
@@ -0,0 +1,51 @@
+from abc import ABC, abstractmethod
+
+from src.domain.enums import DatasetSize
+
+
+class ISpatialJoinService(ABC):
+    @abstractmethod
+    def prepare_county_pieces(self, max_vertices: int) -> int:
+        """
+        Loads the county polygons from the metadata container and subdivides them into pieces with at
+        most `max_vertices` vertices each, the shapely equivalent of PostGIS `ST_Subdivide`. The pieces
+        are stored in a regular (non-temporary) DuckDB table so that every cursor of the shared
+        connection can read them. Must be called before `count_buildings_per_county`.
+        :param max_vertices: Maximum number of vertices per county piece.
+        :return: Number of county pieces created.
+        :rtype: int
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def count_buildings_per_county(
+            self,
+            release: str,
+            dataset_size: DatasetSize,
+            max_workers: int
+    ) -> list[tuple[str, int]]:
+        """
+        Counts the buildings intersecting each county using a partition-pruned join. The candidate
+        files for a county are the files in its own `region=` partition plus any other file whose
+        GeoParquet bbox intersects the county bbox. Each county is then joined against its subdivided
+        pieces on its own DuckDB cursor, with up to `max_workers` counties in flight at once.
+        :param release: Release identifier on the format 'yyyy-mm-dd.x'.
+        :param dataset_size: Dataset size to join against.
+        :param max_workers: Maximum number of counties joined concurrently.
+        :return: List of (county ID, building count) tuples ordered by descending count.
+        :rtype: list[tuple[str, int]]
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def count_buildings_per_county_naive(self, release: str, dataset_size: DatasetSize) -> list[tuple[str, int]]:
+        """
+        Counts the buildings intersecting each county with a single `ST_Intersects` join between all
+        county polygons and all building files. Used as the reference result for
+        `count_buildings_per_county`.
+        :param release: Release identifier on the format 'yyyy-mm-dd.x'.
+        :param dataset_size: Dataset size to join against.
+        :return: List of (county ID, building count) tuples ordered by descending count.
+        :rtype: list[tuple[str, int]]
+        """
+        raise NotImplementedError
@@ -2,22 +2,55 @@ from abc import abstractmethod, ABC
 
 from pmtiles.reader import Reader
 
+from src.application.dtos import PMTilesReaderStats
+
 
 class ITileApiService(ABC):
     @abstractmethod
-    def fetch_vmt_tile(self, z: int, x: int, y: int) -> bytes | None:
+    def fetch_vmt_tile(self, z: int, x: int, y: int, server_url: str | None = None) -> bytes | None:
         """
         Fetches a tile from the VMT server based on the provided z, x, and y coordinates. Cache headers
-        are set to bypass any intermediate cache.
+        are set to bypass any intermediate cache. Safe to call from several threads at once; the
+        underlying session keeps up to `Config.TILE_CLIENT_MAX_CONNECTIONS` connections per host.
         :param z: Zoom level of the tile
         :param x: X coordinate of the tile
         :param y: Y coordinate of the tile
+        :param server_url: Base URL of the VMT server. Defaults to `Config.AZURE_VMT_SERVER_URL`.
         :return: Raw tile bytes, or None when the server returns 404 or an empty response body.
         :rtype: bytes | None
         :raises RuntimeError: If the VMT server cannot be reached or returns a non-404 error status.
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def fetch_vmt_cache_stats(self, server_url: str | None = None, reset: bool = False) -> dict:
+        """
+        Fetches the tile cache statistics of the VMT server, or resets them when `reset` is True.
+        Statistics are kept per server worker process, so the result describes the worker that handled
+        the request.
+        :param server_url: Base URL of the VMT server. Defaults to `Config.AZURE_VMT_SERVER_URL`.
+        :param reset: Whether to reset the counters before returning them.
+        :return: Tile cache statistics as returned by the `/tiles/stats` endpoint.
+        :rtype: dict
+        :raises RuntimeError: If the VMT server cannot be reached or returns an error status.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def fetch_static_mvt_tile(self, base_url: str, z: int, x: int, y: int) -> bytes | None:
+        """
+        Fetches a pre-rendered tile stored as a single `{z}/{x}/{y}.pbf` blob under `base_url` with a
+        plain HTTP GET.
+        :param base_url: HTTP(S) URL of the blob prefix holding the tile pyramid.
+        :param z: Zoom level of the tile
+        :param x: X coordinate of the tile
+        :param y: Y coordinate of the tile
+        :return: Raw tile bytes, or None when no blob exists for the tile.
+        :rtype: bytes | None
+        :raises RuntimeError: If the storage account cannot be reached or returns an error status other than 404.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def fetch_pmtiles_tile(self, reader: Reader, z: int, x: int, y: int) -> bytes | None:
         """
@@ -32,12 +65,25 @@ class ITileApiService(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def get_pmtiles_reader_stats(self, reader: Reader) -> PMTilesReaderStats | None:
+        """
+        Returns the tile, range request and directory cache counters of a reader from
+        `create_pmtiles_reader`.
+        :param reader: PMTiles Reader from `create_pmtiles_reader`.
+        :return: Reader counters, or None for readers that do not keep counters.
+        :rtype: PMTilesReaderStats | None
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def create_pmtiles_reader(self, pmtiles_url: str) -> Reader:
         """
         Creates a PMTiles Reader that reads the archive at the given URL using HTTP range requests. The
         underlying byte-source validates that the server returns HTTP 206 Partial Content with the exact
-        requested byte range.
+        requested byte range. The reader keeps the header and an LRU cache of up to
+        `Config.PMTILES_DIRECTORY_CACHE_ENTRIES` deserialized directories, and counts range requests
+        per tile. A cache size of 0 re-reads the header and every directory per tile.
         :param pmtiles_url: HTTP(S) URL of the PMTiles archive.
         :return: PMTiles Reader bound to the remote archive.
         :rtype: Reader
@@ -0,0 +1,55 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from src.application.dtos import TileBuildReport
+from src.domain.enums import DatasetSize
+
+
+class ITileBuilderService(ABC):
+    @abstractmethod
+    def build_tiles(
+            self,
+            release: str,
+            dataset_size: DatasetSize,
+            min_zoom: int,
+            max_zoom: int,
+            pmtiles_path: Path,
+            mvt_dir: Path
+    ) -> TileBuildReport:
+        """
+        Builds the vector tile pyramid of the buildings dataset from its GeoParquet files in a single
+        pass. The files are read as Arrow batches, and each feature is assigned to the tiles its bbox
+        covers, including the tile buffer, at every zoom level between `min_zoom` and `max_zoom`.
+        Below `max_zoom`, features smaller than `Config.TILE_BUILDER_MIN_FEATURE_PIXELS` pixels are
+        dropped. The assignments are sorted by tile and encoded as MVT with DuckDB's `ST_AsMVT` in a
+        pool of `Config.TILE_BUILDER_WORKERS` processes. Each encoded tile is written uncompressed to
+        `mvt_dir/z/x/y.pbf` and gzip-compressed into a clustered PMTiles archive at `pmtiles_path`.
+        :param release: Release identifier on the format 'yyyy-mm-dd.x'.
+        :param dataset_size: Dataset size to build tiles for.
+        :param min_zoom: Lowest zoom level of the pyramid.
+        :param max_zoom: Highest zoom level of the pyramid. All features are kept at this zoom level.
+        :param pmtiles_path: Local path of the PMTiles archive to write.
+        :param mvt_dir: Local directory to write the z/x/y tile files to. Existing tiles are replaced.
+        :return: Report with tile counts, output sizes, wall-clock time per phase and peak memory.
+        :rtype: TileBuildReport
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def count_features_per_tile(
+            self,
+            release: str,
+            dataset_size: DatasetSize,
+            zoom: int
+    ) -> list[tuple[int, int, int, int]]:
+        """
+        Computes the occupied tiles at `zoom` from the `bbox` column of the buildings GeoParquet files,
+        without rendering any tile. Each feature counts towards every tile its bbox covers. The counts
+        are computed per Arrow batch with vectorized tile math and merged at the end.
+        :param release: Release identifier on the format 'yyyy-mm-dd.x'.
+        :param dataset_size: Dataset size to count features for.
+        :param zoom: Zoom level of the tiles.
+        :return: Occupied tiles as (z, x, y, feature_count) tuples, sorted by x and then y.
+        :rtype: list[tuple[int, int, int, int]]
+        """
+        raise NotImplementedError
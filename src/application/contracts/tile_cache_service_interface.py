@@ -0,0 +1,54 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+
+from src.application.dtos import CachedTile, TileCacheStats
+
+
+class ITileCacheService(ABC):
+    @abstractmethod
+    async def get_tile(self, z: int, x: int, y: int, render: Callable[[], Awaitable[bytes | None]]) -> CachedTile:
+        """
+        Returns the tile at (z, x, y), calling `render` only when the tile is not cached. The cache
+        mode decides where rendered tiles are kept: nowhere, in an in-memory LRU bounded by a byte
+        budget, or on disk under `<cache dir>/<dataset version>/z/x/y.mvt`. Concurrent misses for the
+        same tile are coalesced so that only one of them calls `render` and the rest await its result.
+        Empty tiles are returned, and cached, with empty content.
+        :param z: Zoom level of the tile.
+        :param x: X coordinate of the tile.
+        :param y: Y coordinate of the tile.
+        :param render: Coroutine function rendering the tile bytes, or returning None when the tile is empty.
+        :return: Tile content with its ETag and whether it was a cache hit, miss or coalesced miss.
+        :rtype: CachedTile
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_not_modified(self, tile: CachedTile, if_none_match: str | None) -> bool:
+        """
+        Checks an `If-None-Match` request header against the ETag of `tile` and counts the request as
+        not modified when one of the listed ETags, or `*`, matches.
+        :param tile: Tile returned by `get_tile`.
+        :param if_none_match: Raw `If-None-Match` header value, or None when the header is missing.
+        :return: True if the client already holds the current version of the tile.
+        :rtype: bool
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_stats(self) -> TileCacheStats:
+        """
+        Returns the hit, miss and latency counters of the cache since the last reset, summed over all
+        uvicorn workers of the server. Each worker keeps its counters in a memory-mapped file under
+        `VMT_TILE_CACHE_STATS_DIR/<server process id>/`, which any worker can read.
+        :return: Cache statistics of all workers.
+        :rtype: TileCacheStats
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def reset_stats(self) -> None:
+        """
+        Resets the hit, miss and latency counters of all uvicorn workers of the server. Cached tiles are kept.
+        :return: None
+        """
+        raise NotImplementedError
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+
+from src.application.dtos import TileLoadReport
+
+
+class ITileLoadService(ABC):
+    @abstractmethod
+    def run_vmt_load(self, tiles: list[tuple[int, int, int]], server_url: str, concurrency: int) -> TileLoadReport:
+        """
+        Requests every tile in `tiles` from the VMT server at `server_url` with `concurrency` requests
+        in flight at once and records the latency of each request. Failed requests are counted as
+        errors instead of aborting the run, so pool exhaustion and timeouts on the server show up in
+        the report.
+        :param tiles: Tiles to request as (z, x, y) tuples, in request order.
+        :param server_url: Base URL of the VMT server.
+        :param concurrency: Number of requests kept in flight at the same time.
+        :return: Report with throughput, latency percentiles and error counts for the run.
+        :rtype: TileLoadReport
+        """
+        raise NotImplementedError
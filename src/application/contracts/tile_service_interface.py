@@ -47,12 +47,25 @@ class ITileService(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def load_tile_counts(self) -> list[tuple[int, int, int, int]]:
+        """
+        Loads the occupied tiles and their feature counts from the tiles JSON file on disk. Each entry
+        is either a (z, x, y) or a (z, x, y, feature_count) list. Entries without a count get a count
+        of 1.
+        :return: List of tiles as (z, x, y, feature_count) tuples, in file order.
+        :rtype: list[tuple[int, int, int, int]]
+        :raises ValueError: If the source file is empty, not valid JSON, not a list, or contains
+            malformed tile entries.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def load_tiles(self, number_of_tiles: int) -> list[tuple[int, int, int]]:
         """
         Loads valid VMT tile coordinates (z, x, y) from a predefined JSON source on disk. The
         implementation parses and validates the file, then cycles the loaded tiles so the returned
-        list has exactly `number_of_tiles` entries.
+        list has exactly `number_of_tiles` entries. Feature counts in the file are ignored.
         :param number_of_tiles: Number of tile coordinates to return. Tiles are repeated cyclically
             when the source contains fewer than `number_of_tiles` entries.
         :return: List of valid tile coordinates (z, x, y) of length `number_of_tiles`.
@@ -0,0 +1,61 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from src.application.dtos import TileTrace
+
+
+class ITileWorkloadService(ABC):
+    @abstractmethod
+    def generate_trace(self, number_of_requests: int, seed: int) -> TileTrace:
+        """
+        Synthesizes a tile request trace of map sessions from the occupied tiles and building counts in
+        the tiles file. Each session starts at a tile drawn from a Zipf distribution over the tiles
+        ranked by building count, at a zoom level drawn from `Config.TILE_WORKLOAD_ZOOM_LEVELS`. Every
+        view requests the tiles of a `Config.TILE_WORKLOAD_VIEWPORT_TILES` viewport around the map
+        center. Between views the session pans one tile in a random direction with probability
+        `Config.TILE_WORKLOAD_PAN_PROBABILITY`, and otherwise zooms in or out. Session lengths are
+        geometric with a mean of `Config.TILE_WORKLOAD_MEAN_SESSION_VIEWS` views. The same seed always
+        yields the same trace.
+        :param number_of_requests: Number of tile requests in the trace.
+        :param seed: Seed of the random generator.
+        :return: Trace of tile requests in request order.
+        :rtype: TileTrace
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def write_trace(self, trace: TileTrace, path: Path) -> None:
+        """
+        Serializes a trace to a compact binary file. The file starts with a fixed header holding a
+        magic number, the format version, the seed and the request count, followed by the session ids,
+        zoom levels, x and y coordinates as little-endian columns (13 bytes per request).
+        :param trace: Trace to serialize.
+        :param path: Local path of the trace file.
+        :return: None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_trace(self, path: Path) -> TileTrace:
+        """
+        Reads a trace written by `write_trace`.
+        :param path: Local path of the trace file.
+        :return: The deserialized trace.
+        :rtype: TileTrace
+        :raises ValueError: If the file is not a trace file, has an unsupported version, or is truncated.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_trace(self, number_of_requests: int, seed: int) -> TileTrace:
+        """
+        Loads the trace for `number_of_requests` and `seed` from `Config.TILE_WORKLOAD_TRACE_DIR`. The
+        file name includes a digest of `Config.MVT_TILES_PATH` and the `Config.TILE_WORKLOAD_*`
+        settings. The trace is generated and written first if the file does not exist, so every
+        benchmark replaying the same seed and inputs requests the same tiles in the same order.
+        :param number_of_requests: Number of tile requests in the trace.
+        :param seed: Seed of the random generator.
+        :return: Trace of tile requests in request order.
+        :rtype: TileTrace
+        """
+        raise NotImplementedError
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
+
 import geopandas as gpd
 
 from src.domain.enums import EPSGCode
@@ -17,6 +19,31 @@ class IVectorService(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def assign_dataframes_to_regions(
+            self,
+            dataframes: Iterable[gpd.GeoDataFrame],
+            region_wkbs: dict[str, bytes],
+            epsg_code: EPSGCode
+    ) -> Iterator[tuple[str, gpd.GeoDataFrame]]:
+        """
+        Assigns every row of the input GeoDataFrames to all regions whose geometry it intersects, in a
+        single pass over the features instead of one clip per region. Each input frame is indexed once
+        with an STRtree and queried with all region geometries, and its rows are yielded per region
+        before the next frame is read, so only one input frame is held at a time. Rows intersecting
+        several regions are included in each. The optional columns `feature_update_time` and `feature_capture_time` are
+        added as NULL when missing so all regions share the same schema.
+        :param dataframes: GeoDataFrames to assign, consumed once in order, e.g. a lazy stream of batches.
+            Must include `external_id`, `geometry`, and `building_id` columns, in the same coordinate
+            reference system as the region geometries.
+        :param region_wkbs: WKB region geometries keyed by region ID.
+        :param epsg_code: EPSG code for the coordinate reference system of the returned GeoDataFrames.
+        :return: Iterator of (region ID, GeoDataFrame) pairs, one per input frame and intersecting region,
+            in input order. Regions without any intersecting rows in a frame are skipped.
+        :rtype: Iterator[tuple[str, gpd.GeoDataFrame]]
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def partition_dataframe(self, dataframe: gpd.GeoDataFrame) -> list[gpd.GeoDataFrame]:
         """
@@ -27,25 +54,3 @@ class IVectorService(ABC):
         :rtype: list[gpd.GeoDataFrame]
         """
         raise NotImplementedError
-
-    @abstractmethod
-    def clip_dataframes_to_wkb(
-            self,
-            dataframes: list[gpd.GeoDataFrame],
-            wkb: bytes,
-            epsg_code: EPSGCode
-    ) -> gpd.GeoDataFrame:
-        """
-        Clips each input GeoDataFrame to the geometry defined by the given WKB and concatenates the
-        results into a single GeoDataFrame. The clip is performed via DuckDB `ST_Intersects`. Empty
-        input frames are skipped, and the optional columns `feature_update_time` and
-        `feature_capture_time` are added as NULL when missing so all partitions share the same schema.
-        :param dataframes: List of GeoDataFrames to clip. Must include `external_id`, `geometry`, and
-            `building_id` columns.
-        :param wkb: WKB representation of the clip geometry.
-        :param epsg_code: EPSG code for the coordinate reference system of the returned GeoDataFrame.
-        :return: Concatenated GeoDataFrame containing only the rows whose geometry intersects the clip
-            geometry, with geometries decoded from WKB.
-        :rtype: gpd.GeoDataFrame
-        """
-        raise NotImplementedError
@@ -4,3 +4,7 @@ from .blob_storage import *
 from .cost import *
 from .database import *
 from .databricks import *
+from .duckdb import *
+from .query import *
+from .remote_io import *
+from .tile import *
@@ -22,6 +22,27 @@ class DatabaseUsage:
         return json.dumps(self.to_dict())
 
 
+@dataclass(frozen=True)
+class PostgresSeedReport:
+    table_name: str
+    rows: int
+    loader_count: int
+    phase_seconds: dict[str, float]
+
+    @property
+    def rows_per_second(self) -> dict[str, float]:
+        return {
+            phase: (self.rows / seconds if seconds > 0 else 0.0)
+            for phase, seconds in self.phase_seconds.items()
+        }
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "rows_per_second": self.rows_per_second}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+
 @dataclass(frozen=True)
 class DatabasePricing:
     compute_per_second: float
@@ -0,0 +1,20 @@
+import json
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class DuckDBSettings:
+    profile: str
+    threads: int | None = None
+    memory_limit_gb: float | None = None
+    preserve_insertion_order: bool | None = None
+    azure_read_transfer_concurrency: int | None = None
+    azure_read_transfer_chunk_size: int | None = None
+    temp_directory: str | None = None
+    max_temp_directory_size_gb: float | None = None
+
+    def to_dict(self) -> dict[str, str | int | float | bool | None]:
+        return asdict(self)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
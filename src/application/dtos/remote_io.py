@@ -0,0 +1,17 @@
+import json
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class RemoteIOMetrics:
+    backend: str
+    request_count: int | None
+    bytes_read: int | None
+    total_latency_seconds: float | None
+    max_latency_seconds: float | None
+
+    def to_dict(self) -> dict[str, str | int | float | None]:
+        return asdict(self)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
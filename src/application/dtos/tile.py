@@ -0,0 +1,188 @@
+import json
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class TileLoadReport:
+    server_url: str
+    concurrency: int
+    requests: int
+    errors: int
+    not_found: int
+    elapsed_seconds: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+    latency_max_ms: float
+    http_version: str | None = None
+    cache_statuses: dict[str, int] = field(default_factory=dict)
+    pmtiles_reader: dict[str, int | float] | None = None
+
+    @staticmethod
+    def from_latencies(
+            server_url: str,
+            concurrency: int,
+            latencies_seconds: list[float],
+            errors: int,
+            not_found: int,
+            elapsed_seconds: float,
+            http_version: str | None = None,
+            cache_statuses: dict[str, int] | None = None
+    ) -> "TileLoadReport":
+        latencies_ms = np.array(latencies_seconds or [0.0]) * 1000
+        return TileLoadReport(
+            server_url=server_url,
+            concurrency=concurrency,
+            requests=len(latencies_seconds),
+            errors=errors,
+            not_found=not_found,
+            elapsed_seconds=elapsed_seconds,
+            latency_p50_ms=float(np.percentile(latencies_ms, 50)),
+            latency_p95_ms=float(np.percentile(latencies_ms, 95)),
+            latency_p99_ms=float(np.percentile(latencies_ms, 99)),
+            latency_max_ms=float(latencies_ms.max()),
+            http_version=http_version,
+            cache_statuses=cache_statuses or {},
+        )
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, str | int | float]:
+        return {**asdict(self), "requests_per_second": self.requests_per_second}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+
+@dataclass(frozen=True)
+class CachedTile:
+    content: bytes
+    etag: str
+    cache_status: str
+
+
+@dataclass(frozen=True)
+class TileCacheStats:
+    mode: str
+    dataset_version: str
+    workers: int
+    hits: int
+    misses: int
+    coalesced: int
+    not_modified: int
+    entries: int
+    size_bytes: int
+    hit_latency_ms_mean: float
+    miss_latency_ms_mean: float
+    miss_latency_ms_max: float
+
+    @property
+    def hit_ratio(self) -> float:
+        requests = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / requests if requests > 0 else 0.0
+
+    def to_dict(self) -> dict[str, str | int | float]:
+        return {**asdict(self), "hit_ratio": self.hit_ratio}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+
+@dataclass(frozen=True)
+class PMTilesReaderStats:
+    tiles_read: int
+    range_requests: int
+    bytes_read: int
+    merged_requests: int
+    directory_cache_hits: int
+    directory_cache_misses: int
+
+    @property
+    def range_requests_per_tile(self) -> float:
+        return self.range_requests / self.tiles_read if self.tiles_read > 0 else 0.0
+
+    def to_dict(self) -> dict[str, int | float]:
+        return {**asdict(self), "range_requests_per_tile": self.range_requests_per_tile}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+
+@dataclass(frozen=True)
+class TileBuildReport:
+    dataset_size: str
+    min_zoom: int
+    max_zoom: int
+    features: int
+    tile_assignments: int
+    tiles: int
+    pmtiles_bytes: int
+    mvt_bytes: int
+    workers: int
+    peak_rss_bytes: int
+    phase_seconds: dict[str, float]
+
+    @property
+    def tiles_per_second(self) -> float:
+        encode_seconds = self.phase_seconds.get("encode", 0.0)
+        return self.tiles / encode_seconds if encode_seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, str | int | float | dict[str, float]]:
+        return {**asdict(self), "tiles_per_second": self.tiles_per_second}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+
+@dataclass(frozen=True)
+class TileTrace:
+    seed: int
+    session_ids: np.ndarray
+    z: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+
+    @property
+    def requests(self) -> int:
+        return len(self.z)
+
+    @property
+    def sessions(self) -> int:
+        return len(np.unique(self.session_ids))
+
+    def to_tiles(self) -> list[tuple[int, int, int]]:
+        return list(zip(self.z.tolist(), self.x.tolist(), self.y.tolist()))
+
+    def to_dict(self) -> dict[str, int]:
+        return {
+            "seed": self.seed,
+            "requests": self.requests,
+            "sessions": self.sessions,
+            "unique_tiles": len(set(self.to_tiles())),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+
+@dataclass(frozen=True)
+class TileStorageReport:
+    strategy: str
+    objects: int
+    bytes: int
+    build_seconds: float
+    upload_seconds: float
+
+    @property
+    def mean_object_bytes(self) -> float:
+        return self.bytes / self.objects if self.objects > 0 else 0.0
+
+    def to_dict(self) -> dict[str, str | int | float]:
+        return {**asdict(self), "mean_object_bytes": self.mean_object_bytes}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
@@ -54,15 +54,47 @@ class Config:
     POSTGRES_DB: str = "postgres"
     POSTGRES_PORT: int = 5432
     POSTGRES_PAGE_SIZE: int = 10_000
+    POSTGRES_SEED_LOADER_COUNT: int = int(os.getenv("POSTGRES_SEED_LOADER_COUNT", "4"))
+    POSTGRES_SEED_BATCH_ROWS: int = 100_000
+    POSTGRES_POOL_SIZE: int = int(os.getenv("POSTGRES_POOL_SIZE", "5"))
+    POSTGRES_MAX_OVERFLOW: int = int(os.getenv("POSTGRES_MAX_OVERFLOW", "10"))
+    POSTGRES_ASYNC_POOL_MIN_SIZE: int = int(os.getenv("POSTGRES_ASYNC_POOL_MIN_SIZE", "2"))
+    POSTGRES_ASYNC_POOL_MAX_SIZE: int = int(os.getenv("POSTGRES_ASYNC_POOL_MAX_SIZE", "20"))
+    POSTGRES_ASYNC_STATEMENT_CACHE_SIZE: int = 100
+    POSTGRES_ASYNC_COMMAND_TIMEOUT_SECONDS: float = 30.0
+
+    # VMT SERVER
+    VMT_DB_DRIVER: str = os.getenv("VMT_DB_DRIVER", "sqlalchemy")
+    VMT_SERVER_WORKERS: int = int(os.getenv("VMT_SERVER_WORKERS", "4"))
+    AZURE_VMT_ASYNC_SERVER_URL: str = os.getenv("AZURE_VMT_ASYNC_SERVER_URL", "https://doppa-vmt-async.azurewebsites.net")
+    VMT_LOAD_CONCURRENCY_LEVELS: tuple[int, ...] = (1, 8, 32, 64)
+    VMT_LOAD_REQUESTS_PER_LEVEL: int = 5_000
+    VMT_TILE_CACHE_MODE: str = os.getenv("VMT_TILE_CACHE_MODE", "none")
+    VMT_TILE_CACHE_MAX_BYTES: int = int(os.getenv("VMT_TILE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    VMT_TILE_CACHE_DIR: Path = Path(os.getenv("VMT_TILE_CACHE_DIR", "/tmp/vmt_tile_cache"))
+    VMT_TILE_CACHE_STATS_DIR: Path = Path(os.getenv("VMT_TILE_CACHE_STATS_DIR", "/tmp/vmt_tile_cache_stats"))
+    VMT_USE_TILE_TABLES: bool = os.getenv("VMT_USE_TILE_TABLES", "true").lower() == "true"
+    MVT_TILE_BUFFER: int = 256
+    MVT_TILE_EXTENT: int = 4096
+    # Zoom bands (min_zoom, max_zoom) served from generalized tables. Higher zoom levels use the full table.
+    # The tables drop features like the tile builder does, see TILE_BUILDER_MIN_FEATURE_PIXELS
+    MVT_GENERALIZED_ZOOM_BANDS: tuple[tuple[int, int], ...] = ((0, 9), (10, 11), (12, 13))
+    PMTILES_DIRECTORY_CACHE_ENTRIES: int = int(os.getenv("PMTILES_DIRECTORY_CACHE_ENTRIES", "1024"))
+    PMTILES_RANGE_MERGE_GAP_BYTES: int = 16 * 1024
+    PMTILES_MAX_MERGED_RANGE_BYTES: int = 4 * 1024 * 1024
+    # Tiles read as one batch by the async PMTiles client, one 4x3 viewport by default
+    PMTILES_CLIENT_BATCH_TILES: int = int(os.getenv("PMTILES_CLIENT_BATCH_TILES", "12"))
+    PMTILES_PREFETCH_LEAF_DIRECTORIES: bool = os.getenv("PMTILES_PREFETCH_LEAF_DIRECTORIES", "true").lower() == "true"
 
     # DIRECTORIES
     ROOT_DIR: Path = Path.cwd() if not IS_NOTEBOOK else Path.cwd().parent.parent.parent
     LOG_DIR: Path = ROOT_DIR / f"logs"
     BUILDINGS_SHAPEFILE: Path = ROOT_DIR / "resources" / "buildings.shp"
     BUILDINGS_PARQUET_FILE: Path = ROOT_DIR / "resources" / "buildings.parquet"
-    BUILDINGS_GEOJSONL_FILE: Path = ROOT_DIR / "resources" / "buildings.geojsonl"
     BUILDINGS_PMTILES_FILE: Path = ROOT_DIR / "resources" / "buildings.pmtiles"
     BUILDINGS_MVT_DIR: Path = ROOT_DIR / "resources" / "buildings_mvt"
+    TILE_BUILDER_WORK_DIR: Path = ROOT_DIR / "resources" / "tile_builder"
+    TILE_STORAGE_REPORT_FILE: Path = ROOT_DIR / "resources" / "tile_storage_report.json"
     MVT_TILES_PATH: Path = ROOT_DIR / "resources" / "tiles.json"
 
     # LOGGING
@@ -90,9 +122,39 @@ class Config:
     PARTITION_RESOLUTION: int = 3
     BUILDINGS_BATCH_SIZE: int = 250_000
     GEOPARQUET_ROW_GROUP_SIZE: int = 100_000
+    PARTITION_KEY_BENCHMARK_REGION: str = "03"
+
+    # OPENSTREETMAP
+    OSM_PBF_URL: str = os.getenv("OSM_PBF_URL", "https://download.geofabrik.de/europe/norway-latest.osm.pbf")
+    OSM_FILE_PATH: Path = ROOT_DIR / "resources" / "norway-latest.osm.pbf"
+    OSM_GEOPARQUET_FILE: Path = ROOT_DIR / "resources" / "osm.parquet"
+    OSM_CONTRIBUTION_BLOB: str = "osm.parquet"
+    OSM_STREAMING_CHUNK_SIZE: int = 8 * 1024 * 1024
+    # (OSM tag, column) pairs written to the contribution dataset
+    OSM_TAG_COLUMNS: tuple[tuple[str, str], ...] = (("building", "building_type"), ("ref:bygningsnr", "building_id"))
+    OSM_ENCODER_WORKERS: int = int(os.getenv("OSM_ENCODER_WORKERS", "4"))
+    OSM_MAX_PENDING_BATCHES: int = 4
+
+    # CONFLATION
+    CONFLATION_IOU_THRESHOLD: float = 0.70
+    CONFLATION_MERGE_BATCH_ROWS: int = 100_000
+    CONFLATION_BENCHMARK_REGIONS: tuple[str, ...] = ("03", "11", "50")
+
+    # FKB POLYGONIZATION
+    FKB_POLYGONIZE_TILE_SIZE_DEGREES: float = 0.05
+    FKB_POLYGONIZE_TILE_MARGIN_DEGREES: float = 0.005
+    FKB_POLYGONIZE_WORKERS: int = int(os.getenv("FKB_POLYGONIZE_WORKERS", str(os.cpu_count() or 1)))
 
     # DATASET SYNTHESIS
     SYNTHESIS_JITTER_DEGREES: float = 1e-5
+    SYNTHESIS_CHUNK_ROWS: int = 500_000
+    SYNTHESIS_SEED: int = int(os.getenv("SYNTHESIS_SEED", "42"))
+
+    # SETUP PIPELINE
+    SETUP_UPLOAD_WORKERS: int = int(os.getenv("SETUP_UPLOAD_WORKERS", "8"))
+    SETUP_MEMORY_BUDGET_GB: float = float(os.getenv("SETUP_MEMORY_BUDGET_GB", "4"))
+    # Local directory the county assignment spills each county's features to before they are partitioned
+    SETUP_SPILL_DIR: Path = Path(os.getenv("SETUP_SPILL_DIR", "/tmp/setup_spill"))
 
     # TEST MODE
     SETUP_COUNTY_LIMIT: int | None = (
@@ -103,14 +165,65 @@ class Config:
     BENCHMARK_FILE: Path = ROOT_DIR / "benchmarks.yml"
     RUN_ID_LENGTH: int = 6
     DEFAULT_SAMPLE_TIMEOUT: float = 0.01
+    RESOURCE_SAMPLER_INTERVAL_SECONDS: float = 0.5
     BENCHMARK_RUNS: int = 1
     BENCHMARK_WARMUP_ITERATIONS: int = 5
     BENCHMARK_ITERATIONS: int = 100
     BENCHMARK_METADATA_BLOB_NAME: str = "benchmark_metadata.parquet"
     BENCHMARK_DOPPA_DATA_RELEASE: str = "2026-04-02.0"
+    VMT_DATASET_VERSION: str = os.getenv("VMT_DATASET_VERSION", BENCHMARK_DOPPA_DATA_RELEASE)
 
     INGESTION_DELAY_SECONDS: int = 600
 
+    # TILE BUILDER
+    TILE_BUILDER_MIN_ZOOM: int = 0
+    TILE_BUILDER_MAX_ZOOM: int = int(os.getenv("TILE_BUILDER_MAX_ZOOM", "14"))
+    TILE_BUILDER_LAYER_NAME: str = "buildings"
+    TILE_BUILDER_BATCH_ROWS: int = 100_000
+    # Below the max zoom, features smaller than this many pixels on their longest side are dropped
+    TILE_BUILDER_MIN_FEATURE_PIXELS: float = 1.0
+    TILE_BUILDER_FEATURES_PER_TASK: int = 250_000
+    TILE_BUILDER_WORKERS: int = int(os.getenv("TILE_BUILDER_WORKERS", str(os.cpu_count() or 1)))
+    TILE_BUILDER_WORKER_MEMORY_LIMIT: str = os.getenv("TILE_BUILDER_WORKER_MEMORY_LIMIT", "1GB")
+    BUILDINGS_MVT_BLOB_PREFIX: str = "mvt"
+    TILE_UPLOAD_WORKERS: int = int(os.getenv("TILE_UPLOAD_WORKERS", "32"))
+
+    # TILE WORKLOAD
+    TILE_WORKLOAD_SEED: int = int(os.getenv("TILE_WORKLOAD_SEED", "42"))
+    TILE_WORKLOAD_TRACE_DIR: Path = ROOT_DIR / "resources" / "tile_traces"
+    # Session start tiles are drawn with probability proportional to 1 / rank ** exponent, ranked by building count
+    TILE_WORKLOAD_ZIPF_EXPONENT: float = 1.0
+    TILE_WORKLOAD_ZOOM_LEVELS: tuple[int, ...] = (12, 13, 14)
+    TILE_WORKLOAD_VIEWPORT_TILES: tuple[int, int] = (4, 3)
+    TILE_WORKLOAD_MEAN_SESSION_VIEWS: int = 20
+    TILE_WORKLOAD_PAN_PROBABILITY: float = 0.7
+    TILE_CLIENT_MAX_CONNECTIONS: int = 64
+    TILE_CLIENT_TIMEOUT_SECONDS: float = 10.0
+    TILE_CLIENT_CONCURRENCY: int = int(os.getenv("TILE_CLIENT_CONCURRENCY", "6"))
+    TILE_CLIENT_HTTP2: bool = os.getenv("TILE_CLIENT_HTTP2", "true").lower() == "true"
+    TILE_CLIENT_KEEPALIVE: bool = os.getenv("TILE_CLIENT_KEEPALIVE", "true").lower() == "true"
+
+    # DUCKDB
+    DUCKDB_PROFILE: str = os.getenv("DUCKDB_PROFILE", "default")
+    DUCKDB_MEMORY_LIMIT_FRACTION: float = 0.75
+    DUCKDB_CONSERVATIVE_MEMORY_LIMIT_FRACTION: float = 0.5
+    DUCKDB_AZURE_READ_TRANSFER_CONCURRENCY: int = 5
+    DUCKDB_AZURE_READ_TRANSFER_CHUNK_SIZE: int = 1024 * 1024
+    REMOTE_IO_BACKEND: str = os.getenv("REMOTE_IO_BACKEND", "az")
+    ADLFS_BLOCK_SIZE: int = int(os.getenv("ADLFS_BLOCK_SIZE", str(4 * 1024 * 1024)))
+    ADLFS_MAX_CONCURRENCY: int = int(os.getenv("ADLFS_MAX_CONCURRENCY", "8"))
+    DUCKDB_OUT_OF_CORE_MEMORY_LIMIT_FRACTION: float = 0.5
+    DUCKDB_TEMP_DIRECTORY: Path = Path(os.getenv("DUCKDB_TEMP_DIRECTORY", "/tmp/duckdb_spill"))
+    DUCKDB_MAX_TEMP_DIRECTORY_SIZE_GB: float = float(os.getenv("DUCKDB_MAX_TEMP_DIRECTORY_SIZE_GB", "40"))
+
+    # SPATIAL JOIN
+    SPATIAL_JOIN_SUBDIVIDE_MAX_VERTICES: int = 256
+    SPATIAL_JOIN_MAX_WORKERS: int = 4
+
+    # PARALLEL SCAN
+    PARALLEL_SCAN_MAX_WORKERS: int = 8
+    PARALLEL_SCAN_FILES_PER_TASK: int = 1
+
     # DATABRICKS
     DATABRICKS_HOST: str = os.getenv("DATABRICKS_HOST")
     DATABRICKS_TOKEN: str = os.getenv("DATABRICKS_TOKEN")
@@ -9,3 +9,9 @@ from .data_source import DataSource
 from .dataset_size import DatasetSize
 from .bounding_box import BoundingBox
 from .schema_version import SchemaVersion
+from .duckdb_profile import DuckDBProfile
+from .remote_io_backend import RemoteIOBackend
+from .mvt_database_driver import MVTDatabaseDriver
+from .tile_cache_mode import TileCacheMode
+from .conflation_engine import ConflationEngine
+from .polygonization_strategy import PolygonizationStrategy
@@ -7,6 +7,7 @@ class BenchmarkIteration(Enum):
     DB_SCAN = 1_000
     VECTOR_TILE_SINGLE_TILE = 1500
     VECTOR_TILE_100K = 2
+    VECTOR_TILE_LOAD = 3
     BBOX_FILTERING_SIMPLE = 1000
     BBOX_FILTERING_ADVANCED = 100
     BBOX_FILTERING_RESULT_SET_SIZES = 900
@@ -15,5 +16,8 @@ class BenchmarkIteration(Enum):
     ORDERED_RANGE_QUERY = 1500
     POINT_IN_POLYGON_LOOKUP = 2500
     NATIONAL_SCALE_SPATIAL_JOIN = 7
+    CONFLATION_IOU = 5
+    PARTITION_KEY = 20
+    FKB_POLYGONIZATION = 10
 
     FALLBACK = Config.BENCHMARK_ITERATIONS
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class ConflationEngine(Enum):
+    SQL = "sql"
+    STRTREE = "strtree"
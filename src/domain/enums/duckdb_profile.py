@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class DuckDBProfile(Enum):
+    DEFAULT = "default"
+    MATCHED = "matched"
+    IO_BOUND = "io_bound"
+    MEMORY_CONSERVATIVE = "memory_conservative"
+    OUT_OF_CORE = "out_of_core"
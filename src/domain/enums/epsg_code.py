@@ -6,3 +6,4 @@ class EPSGCode(Enum):
     UTM32N = 25832
     UTM33N = 25833
     LAEA_EUROPE = 3035
+    WEB_MERCATOR = 3857
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class MVTDatabaseDriver(Enum):
+    SQLALCHEMY = "sqlalchemy"
+    ASYNCPG = "asyncpg"
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class PolygonizationStrategy(Enum):
+    GLOBAL = "global"
+    TILED = "tiled"
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class RemoteIOBackend(Enum):
+    AZURE_EXTENSION = "az"
+    FSSPEC_ADLFS = "abfs"
+    ARROW_DATASET = "arrow"
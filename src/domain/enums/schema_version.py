@@ -4,3 +4,6 @@ from enum import Enum
 class SchemaVersion(Enum):
     V2 = "v2"
     V3 = "v3"
+    V4 = "v4"
+    V5 = "v5"
+    V6 = "v6"
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class TileCacheMode(Enum):
+    NONE = "none"
+    MEMORY = "memory"
+    DISK = "disk"
@@ -4,17 +4,61 @@ from pystac import StacIO
 from src.infra.infrastructure.services import (
     BlobStorageService, OpenStreetMapService, OpenStreetMapFileService, FilePathService, ReleaseService, BytesService,
     CountyService, VectorService, StacService, StacIOService, FKBService, ConflationService,
-    TestDatasetService, DatasetSynthesisService, MonitoringStorageService, MVTService, TileApiService, TileService,
+    TestDatasetService, DatasetSynthesisService, MonitoringStorageService, MVTService, AsyncMVTService, TileApiService,
+    TileService, TileLoadService, TileCacheService, AsyncTileClientService, TileBuilderService, TileWorkloadService,
     AzureCostService, BenchmarkConfigurationService, AzureMetricService, AzurePricingService, BenchmarkService,
-    DatabricksService
+    DatabricksService, DuckDBConfigurationService, SpatialJoinService, ParallelScanService, RemoteIOService,
+    PostgresSeedService
+)
+from src.application.common.remote_io_metrics_collector import RemoteIOMetricsCollector
+from src.domain.enums import DuckDBProfile, RemoteIOBackend, TileCacheMode
+from src.infra.persistence.context import (
+    create_duckdb_context, create_blob_storage_context, create_postgres_db_context, create_azure_filesystem_context,
+    create_postgres_async_pool
 )
-from src.infra.persistence.context import create_duckdb_context, create_blob_storage_context, create_postgres_db_context
 
 
 class Containers(containers.DeclarativeContainer):
     config = providers.Configuration()
 
-    duckdb_context = providers.Singleton(create_duckdb_context)
+    benchmark_configuration_service = providers.Singleton(
+        BenchmarkConfigurationService
+    )
+
+    duckdb_configuration_service = providers.Singleton(
+        DuckDBConfigurationService,
+        benchmark_configuration_service=benchmark_configuration_service
+    )
+
+    duckdb_settings = providers.Singleton(
+        duckdb_configuration_service.provided.resolve_settings.call(
+            script_id=config.script_id,
+            profile=providers.Factory(DuckDBProfile, config.duckdb_profile)
+        )
+    )
+
+    remote_io_backend = providers.Factory(RemoteIOBackend, config.remote_io_backend)
+
+    remote_io_metrics_collector = providers.Singleton(
+        RemoteIOMetricsCollector,
+        backend=remote_io_backend
+    )
+
+    azure_filesystem_context = providers.Singleton(
+        create_azure_filesystem_context,
+        metrics_collector=remote_io_metrics_collector
+    )
+
+    duckdb_context = providers.Singleton(
+        create_duckdb_context,
+        settings=duckdb_settings,
+        filesystem=providers.Selector(
+            config.remote_io_backend,
+            az=providers.Object(None),
+            abfs=azure_filesystem_context,
+            arrow=providers.Object(None)
+        )
+    )
     postgres_context = providers.Singleton(create_postgres_db_context)
 
     blob_storage_context = providers.Singleton(create_blob_storage_context)
@@ -28,8 +72,7 @@ class Containers(containers.DeclarativeContainer):
     )
 
     vector_service = providers.Singleton(
-        VectorService,
-        db_context=duckdb_context
+        VectorService
     )
 
     blob_storage_service = providers.Singleton(
@@ -46,7 +89,8 @@ class Containers(containers.DeclarativeContainer):
     )
 
     osm_file_service = providers.Singleton(
-        OpenStreetMapFileService
+        OpenStreetMapFileService,
+        filesystem=azure_filesystem_context
     )
 
     stac_io_service = providers.Singleton(
@@ -68,7 +112,7 @@ class Containers(containers.DeclarativeContainer):
 
     open_street_map_service = providers.Singleton(
         OpenStreetMapService,
-        blob_storage_service=blob_storage_service,
+        filesystem=azure_filesystem_context,
         bytes_service=bytes_service
     )
 
@@ -76,7 +120,7 @@ class Containers(containers.DeclarativeContainer):
         FKBService,
         db_context=duckdb_context,
         bytes_service=bytes_service,
-        blob_storage_service=blob_storage_service
+        filesystem=azure_filesystem_context
     )
 
     conflation_service = providers.Singleton(
@@ -98,21 +142,49 @@ class Containers(containers.DeclarativeContainer):
         duckdb_context=duckdb_context
     )
 
-    mvt_service = providers.Singleton(
-        MVTService,
-        db_context=postgres_context
+    mvt_service = providers.Selector(
+        config.vmt_db_driver,
+        sqlalchemy=providers.Singleton(
+            MVTService,
+            db_context=postgres_context
+        ),
+        asyncpg=providers.Singleton(
+            AsyncMVTService,
+            pool_factory=providers.Object(create_postgres_async_pool)
+        )
     )
 
     tile_api_service = providers.Singleton(
         TileApiService
     )
 
+    async_tile_client_service = providers.Singleton(
+        AsyncTileClientService
+    )
+
+    tile_cache_service = providers.Singleton(
+        TileCacheService,
+        mode=providers.Factory(TileCacheMode, config.vmt_tile_cache_mode)
+    )
+
     tile_service = providers.Singleton(
         TileService
     )
 
-    benchmark_configuration_service = providers.Singleton(
-        BenchmarkConfigurationService
+    tile_load_service = providers.Singleton(
+        TileLoadService,
+        tile_api_service=tile_api_service
+    )
+
+    tile_workload_service = providers.Singleton(
+        TileWorkloadService,
+        tile_service=tile_service
+    )
+
+    tile_builder_service = providers.Singleton(
+        TileBuilderService,
+        db_context=duckdb_context,
+        file_path_service=file_path_service
     )
 
     azure_pricing_service = providers.Singleton(
@@ -143,6 +215,7 @@ class Containers(containers.DeclarativeContainer):
         county_service=county_service,
         fkb_service=fkb_service,
         osm_service=open_street_map_service,
+        osm_file_service=osm_file_service,
     )
 
     dataset_synthesis_service = providers.Singleton(
@@ -158,4 +231,36 @@ class Containers(containers.DeclarativeContainer):
         DatabricksService
     )
 
+    spatial_join_service = providers.Singleton(
+        SpatialJoinService,
+        db_context=duckdb_context,
+        file_path_service=file_path_service
+    )
+
+    remote_io_service = providers.Singleton(
+        RemoteIOService,
+        db_context=duckdb_context,
+        backend=remote_io_backend,
+        filesystem=providers.Selector(
+            config.remote_io_backend,
+            az=providers.Object(None),
+            abfs=azure_filesystem_context,
+            arrow=azure_filesystem_context
+        )
+    )
+
+    postgres_seed_service = providers.Singleton(
+        PostgresSeedService,
+        db_context=duckdb_context,
+        postgres_context=postgres_context,
+        file_path_service=file_path_service
+    )
+
+    parallel_scan_service = providers.Singleton(
+        ParallelScanService,
+        db_context=duckdb_context,
+        blob_storage_service=blob_storage_service,
+        file_path_service=file_path_service
+    )
+
     StacIO.set_default(stac_io_service)
@@ -9,10 +9,16 @@ from .bytes_service import BytesService
 from .conflation_service import ConflationService
 from .county_service import CountyService
 from .dataset_synthesis_service import DatasetSynthesisService
+from .duckdb_configuration_service import DuckDBConfigurationService
+from .spatial_join_service import SpatialJoinService
+from .parallel_scan_service import ParallelScanService
+from .remote_io_service import RemoteIOService
+from .postgres_seed_service import PostgresSeedService
 from .file_path_service import FilePathService
 from .fkb_service import FKBService
 from .monitoring_storage_service import MonitoringStorageService
 from .mvt_service import MVTService
+from .async_mvt_service import AsyncMVTService
 from .open_street_map_file_service import OpenStreetMapFileService
 from .open_street_map_service import OpenStreetMapService
 from .release_service import ReleaseService
@@ -21,4 +27,9 @@ from .stac_service import StacService
 from .test_dataset_service import TestDatasetService
 from .tile_api_service import TileApiService
 from .tile_service import TileService
+from .tile_load_service import TileLoadService
+from .tile_cache_service import TileCacheService
+from .async_tile_client_service import AsyncTileClientService
+from .tile_builder_service import TileBuilderService
+from .tile_workload_service import TileWorkloadService
 from .vector_service import VectorService
@@ -0,0 +1,57 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from asyncpg import Pool
+
+from src.application.common import logger
+from src.application.contracts import IMVTService
+from src.infra.infrastructure.services.mvt_service import create_mvt_tile_query
+
+
+class AsyncMVTService(IMVTService):
+    __pool_factory: Callable[[], Awaitable[Pool]]
+    __pool: Pool | None
+    __pool_lock: asyncio.Lock
+    __queries: dict[int, str]
+
+    def __init__(self, pool_factory: Callable[[], Awaitable[Pool]]):
+        self.__pool_factory = pool_factory
+        self.__pool = None
+        self.__pool_lock = asyncio.Lock()
+        self.__queries = {}
+
+    async def get_mvt_tiles(self, z: int, x: int, y: int) -> bytes | None:
+        pool = await self.__get_pool()
+
+        query = self.__queries.get(z)
+        if query is None:
+            query = create_mvt_tile_query(z=z, z_param="$1", x_param="$2", y_param="$3")
+            self.__queries[z] = query
+
+        # fetchval goes through the per-connection statement cache, so each zoom band's tile query is
+        # prepared server-side once per pooled connection and reused afterwards
+        async with pool.acquire() as conn:
+            tile = await conn.fetchval(query, z, x, y)
+
+        if tile is None or len(tile) == 0:
+            return None
+
+        return bytes(tile)
+
+    async def close(self) -> None:
+        async with self.__pool_lock:
+            if self.__pool is not None:
+                await self.__pool.close()
+                self.__pool = None
+
+    async def __get_pool(self) -> Pool:
+        if self.__pool is not None:
+            return self.__pool
+
+        # The pool is bound to the event loop, so it is created on the first request rather than in the container
+        async with self.__pool_lock:
+            if self.__pool is None:
+                self.__pool = await self.__pool_factory()
+                logger.info(f"Created asyncpg pool with at most {self.__pool.get_max_size()} connections")
+
+        return self.__pool
@@ -0,0 +1,304 @@
+import asyncio
+import time
+from collections import Counter
+from dataclasses import replace
+from typing import Awaitable, Callable
+
+import httpx
+from pmtiles.tile import Entry, HeaderDict, deserialize_directory, deserialize_header, find_tile, zxy_to_tileid
+
+from src import Config
+from src.application.common import logger
+from src.application.contracts import IAsyncTileClientService
+from src.application.dtos import PMTilesReaderStats, TileLoadReport
+from src.infra.persistence.context import PMTilesDirectoryCache, merge_byte_ranges
+from src.infra.persistence.context.pmtiles_reader import PMTILES_HEADER_LENGTH, PMTILES_MAX_DIRECTORY_DEPTH
+
+
+class AsyncTileClientService(IAsyncTileClientService):
+    def fetch_vmt_tiles(
+            self,
+            tiles: list[tuple[int, int, int]],
+            concurrency: int,
+            http2: bool,
+            server_url: str | None = None,
+            revalidate: bool = False
+    ) -> TileLoadReport:
+        base_url = server_url or Config.AZURE_VMT_SERVER_URL
+        etags: dict[tuple[int, int, int], str] = {}
+        cache_statuses: Counter = Counter()
+
+        async def _fetch(client: httpx.AsyncClient, tile: tuple[int, int, int]) -> bool:
+            z, x, y = tile
+            headers = {"Cache-Control": "no-cache, no-store, max-age=0", "Pragma": "no-cache"}
+            if revalidate and tile in etags:
+                headers["If-None-Match"] = etags[tile]
+
+            response = await client.get(f"{base_url}/tiles/{z}/{x}/{y}", headers=headers)
+            if response.status_code not in (304, 404):
+                response.raise_for_status()
+
+            cache_statuses[response.headers.get("X-Cache", "NONE")] += 1
+            if revalidate and response.headers.get("ETag") is not None:
+                etags[tile] = response.headers["ETag"]
+
+            return response.status_code == 404
+
+        report = asyncio.run(self.__run(
+            url=base_url,
+            tiles=tiles,
+            concurrency=concurrency,
+            http2=http2,
+            fetch=self.__fetch_each(_fetch)
+        ))
+        return replace(report, cache_statuses=dict(cache_statuses))
+
+    def fetch_pmtiles_tiles(
+            self,
+            pmtiles_url: str,
+            tiles: list[tuple[int, int, int]],
+            concurrency: int,
+            http2: bool,
+            batch_size: int = 1,
+            prefetch: bool = False
+    ) -> TileLoadReport:
+        directory_cache = PMTilesDirectoryCache(max_entries=Config.PMTILES_DIRECTORY_CACHE_ENTRIES)
+        pmtiles_header: list[HeaderDict] = []
+        range_request_counter: Counter = Counter()
+
+        async def _get_range(client: httpx.AsyncClient, offset: int, length: int) -> bytes:
+            range_request_counter["requests"] += 1
+            data = await self.__get_range(client=client, url=pmtiles_url, offset=offset, length=length)
+            range_request_counter["bytes"] += len(data)
+            return data
+
+        async def _get_merged_ranges(
+                client: httpx.AsyncClient,
+                ranges: list[tuple[int, int]]
+        ) -> dict[tuple[int, int], bytes]:
+            merged_ranges = merge_byte_ranges(
+                ranges=ranges,
+                max_gap_bytes=Config.PMTILES_RANGE_MERGE_GAP_BYTES,
+                max_merged_bytes=Config.PMTILES_MAX_MERGED_RANGE_BYTES
+            )
+            merged_data = await asyncio.gather(
+                *(_get_range(client, offset, length) for offset, length, _ in merged_ranges)
+            )
+
+            data_by_range: dict[tuple[int, int], bytes] = {}
+            for (offset, _, members), data in zip(merged_ranges, merged_data):
+                if len(members) > 1:
+                    range_request_counter["merged"] += 1
+
+                for member_offset, member_length in members:
+                    start = member_offset - offset
+                    data_by_range[(member_offset, member_length)] = data[start:start + member_length]
+
+            return data_by_range
+
+        async def _get_header(client: httpx.AsyncClient) -> HeaderDict:
+            # The header is kept alongside the directories, unless directory caching is disabled
+            if not pmtiles_header or Config.PMTILES_DIRECTORY_CACHE_ENTRIES <= 0:
+                header = deserialize_header(await _get_range(client, 0, PMTILES_HEADER_LENGTH))
+                pmtiles_header[:] = [header]
+            return pmtiles_header[0]
+
+        async def _get_directory(client: httpx.AsyncClient, offset: int, length: int) -> list[Entry]:
+            directory = directory_cache.get(offset, length)
+            if directory is None:
+                directory = deserialize_directory(await _get_range(client, offset, length))
+                directory_cache.put(offset, length, directory)
+            return directory
+
+        async def _prefetch_leaf_directories(client: httpx.AsyncClient) -> None:
+            # Resolves the trace one directory level at a time and reads the missing leaf directories of
+            # each level with merged range requests
+            header = await _get_header(client)
+            tile_ids = sorted({zxy_to_tileid(z, x, y) for z, x, y in tiles})
+            directory_ranges = {tile_id: (header["root_offset"], header["root_length"]) for tile_id in tile_ids}
+
+            for _ in range(PMTILES_MAX_DIRECTORY_DEPTH):
+                leaf_ranges: dict[int, tuple[int, int]] = {}
+                for tile_id, (offset, length) in directory_ranges.items():
+                    entry = find_tile(await _get_directory(client, offset, length), tile_id)
+                    if entry is not None and entry.run_length == 0:
+                        leaf_ranges[tile_id] = (header["leaf_directory_offset"] + entry.offset, entry.length)
+
+                missing_ranges = [
+                    leaf_range for leaf_range in set(leaf_ranges.values())
+                    if not directory_cache.contains(*leaf_range)
+                ]
+                for (offset, length), data in (await _get_merged_ranges(client, missing_ranges)).items():
+                    directory_cache.put(offset, length, deserialize_directory(data))
+
+                if not leaf_ranges:
+                    break
+                directory_ranges = leaf_ranges
+
+        async def _fetch(client: httpx.AsyncClient, batch: list[tuple[int, int, int]]) -> int:
+            header = await _get_header(client)
+            entries = [
+                await self.__find_pmtiles_entry(
+                    client=client,
+                    header=header,
+                    tile_id=zxy_to_tileid(z, x, y),
+                    get_directory=_get_directory
+                )
+                for z, x, y in batch
+            ]
+
+            # Tile data of a batch that lies close together in the archive is read with one range request
+            await _get_merged_ranges(
+                client,
+                [(header["tile_data_offset"] + entry.offset, entry.length) for entry in entries if entry is not None]
+            )
+            return entries.count(None)
+
+        report = asyncio.run(self.__run(
+            url=pmtiles_url,
+            tiles=tiles,
+            concurrency=concurrency,
+            http2=http2,
+            fetch=_fetch,
+            batch_size=batch_size,
+            # Prefetched directories would be evicted right away from a disabled cache
+            prepare=_prefetch_leaf_directories if prefetch and Config.PMTILES_DIRECTORY_CACHE_ENTRIES > 0 else None
+        ))
+        reader_stats = PMTilesReaderStats(
+            tiles_read=report.requests,
+            range_requests=range_request_counter["requests"],
+            bytes_read=range_request_counter["bytes"],
+            merged_requests=range_request_counter["merged"],
+            directory_cache_hits=directory_cache.hits,
+            directory_cache_misses=directory_cache.misses,
+        )
+        return replace(report, pmtiles_reader=reader_stats.to_dict())
+
+    def fetch_static_mvt_tiles(
+            self,
+            base_url: str,
+            tiles: list[tuple[int, int, int]],
+            concurrency: int,
+            http2: bool
+    ) -> TileLoadReport:
+        async def _fetch(client: httpx.AsyncClient, tile: tuple[int, int, int]) -> bool:
+            z, x, y = tile
+            response = await client.get(f"{base_url}/{z}/{x}/{y}.pbf")
+            if response.status_code != 404:
+                response.raise_for_status()
+
+            return response.status_code == 404
+
+        return asyncio.run(self.__run(
+            url=base_url,
+            tiles=tiles,
+            concurrency=concurrency,
+            http2=http2,
+            fetch=self.__fetch_each(_fetch)
+        ))
+
+    @staticmethod
+    async def __run(
+            url: str,
+            tiles: list[tuple[int, int, int]],
+            concurrency: int,
+            http2: bool,
+            fetch: Callable[[httpx.AsyncClient, list[tuple[int, int, int]]], Awaitable[int]],
+            batch_size: int = 1,
+            prepare: Callable[[httpx.AsyncClient], Awaitable[None]] | None = None
+    ) -> TileLoadReport:
+        limits = httpx.Limits(
+            max_connections=concurrency,
+            max_keepalive_connections=concurrency if Config.TILE_CLIENT_KEEPALIVE else 0
+        )
+        latencies_seconds: list[float] = []
+        http_versions: Counter = Counter()
+        errors = 0
+        not_found = 0
+        pending = iter([tiles[i:i + batch_size] for i in range(0, len(tiles), batch_size)])
+
+        async def _worker(client: httpx.AsyncClient) -> None:
+            nonlocal errors, not_found
+            # Workers share one iterator, so at most `concurrency` batches are in flight
+            for batch in pending:
+                started_at = time.perf_counter()
+                try:
+                    not_found += await fetch(client, batch)
+                except (httpx.HTTPError, RuntimeError) as e:
+                    logger.debug(f"Tiles {batch} failed: {e}")
+                    errors += len(batch)
+                # A tile of a batch is only on screen once the whole batch has been read
+                latencies_seconds.extend([time.perf_counter() - started_at] * len(batch))
+
+        async def _record_http_version(response: httpx.Response) -> None:
+            http_versions[response.http_version] += 1
+
+        async with httpx.AsyncClient(
+                http2=http2,
+                limits=limits,
+                timeout=Config.TILE_CLIENT_TIMEOUT_SECONDS,
+                event_hooks={"response": [_record_http_version]}
+        ) as client:
+            started_at = time.perf_counter()
+            if prepare is not None:
+                await prepare(client)
+            await asyncio.gather(*(_worker(client) for _ in range(concurrency)))
+            elapsed_seconds = time.perf_counter() - started_at
+
+        report = TileLoadReport.from_latencies(
+            server_url=url,
+            concurrency=concurrency,
+            latencies_seconds=latencies_seconds,
+            errors=errors,
+            not_found=not_found,
+            elapsed_seconds=elapsed_seconds,
+            http_version=http_versions.most_common(1)[0][0] if http_versions else None,
+        )
+        logger.info(f"Fetched {len(tiles)} tiles from '{url}': {report.to_json()}")
+        return report
+
+    @staticmethod
+    async def __find_pmtiles_entry(
+            client: httpx.AsyncClient,
+            header: HeaderDict,
+            tile_id: int,
+            get_directory: Callable[[httpx.AsyncClient, int, int], Awaitable[list[Entry]]]
+    ) -> Entry | None:
+        directory_offset = header["root_offset"]
+        directory_length = header["root_length"]
+
+        for _ in range(PMTILES_MAX_DIRECTORY_DEPTH):
+            entry = find_tile(await get_directory(client, directory_offset, directory_length), tile_id)
+            if entry is None or entry.run_length > 0:
+                return entry
+
+            directory_offset = header["leaf_directory_offset"] + entry.offset
+            directory_length = entry.length
+
+        return None
+
+    @staticmethod
+    def __fetch_each(
+            fetch: Callable[[httpx.AsyncClient, tuple[int, int, int]], Awaitable[bool]]
+    ) -> Callable[[httpx.AsyncClient, list[tuple[int, int, int]]], Awaitable[int]]:
+        async def _fetch_batch(client: httpx.AsyncClient, batch: list[tuple[int, int, int]]) -> int:
+            return sum([await fetch(client, tile) for tile in batch])
+
+        return _fetch_batch
+
+    @staticmethod
+    async def __get_range(client: httpx.AsyncClient, url: str, offset: int, length: int) -> bytes:
+        response = await client.get(
+            url,
+            headers={"Range": f"bytes={offset}-{offset + length - 1}", "Accept-Encoding": "identity"}
+        )
+        if response.status_code != 206:
+            response.raise_for_status()
+            raise RuntimeError(f"Expected HTTP 206 Partial Content for range request, got {response.status_code}")
+
+        if len(response.content) != length:
+            raise RuntimeError(
+                f"Server returned {len(response.content)} bytes, expected {length} for offset={offset}"
+            )
+
+        return response.content
@@ -1,6 +1,11 @@
-﻿from io import BytesIO
+﻿import json
+from io import BytesIO
+from typing import Iterable
 
 import geopandas as gpd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from azure.core.exceptions import ResourceNotFoundError
 from azure.storage.blob import BlobServiceClient, ContainerClient, PublicAccess
 
@@ -118,11 +123,67 @@ class BlobStorageService(IBlobStorageService):
 
         return asset_paths
 
+    def upload_arrow_tables_as_geoparquet(
+            self,
+            container: StorageContainer,
+            release: str,
+            theme: Theme,
+            region: str,
+            partitions: Iterable[pa.Table],
+            dataset_size: DatasetSize | None = None,
+            row_group_size: int | None = None,
+            first_part_index: int = 0,
+            **kwargs: str
+    ) -> list[str]:
+        asset_paths = []
+
+        for index, partition in enumerate(partitions, start=first_part_index):
+            if partition.num_rows == 0:
+                logger.info(f"Partition {index} for region '{region}' is empty. Skipping upload.")
+                continue
+
+            storage_path = self.__file_path_service.create_dataset_blob_path(
+                release=release,
+                theme=theme,
+                region=region,
+                file_name=f"part_{index:05d}.parquet",
+                dataset_size=dataset_size,
+                **kwargs if kwargs else {}
+            )
+
+            partition = partition.replace_schema_metadata({
+                **(partition.schema.metadata or {}),
+                b"geo": BlobStorageService.__create_geo_metadata(partition),
+            })
+
+            with BytesIO() as buffer:
+                pq.write_table(partition, buffer, compression="snappy", row_group_size=row_group_size)
+
+                asset_file_path = self.upload_file(
+                    container_name=container,
+                    blob_name=storage_path,
+                    data=buffer.getvalue()
+                )
+
+                if asset_file_path:
+                    asset_paths.append(asset_file_path)
+
+        return asset_paths
+
     def has_files_under_blob_path_base(self, container: StorageContainer, path: str) -> bool:
         container_client = self.__blob_storage_context.get_container_client(container.value)
         blobs = list(container_client.list_blob_names(name_starts_with=path))
         return len(blobs) > 0
 
+    def list_parquet_blob_names(self, container: StorageContainer, path: str) -> list[str]:
+        base_path = self.__file_path_service.remove_blob_file_name_from_path(
+            file_path=path, file_name="region=*/*.parquet"
+        )
+        blob_names = self.__blob_storage_context.get_container_client(
+            container=container.value
+        ).list_blob_names(name_starts_with=base_path)
+        return sorted(name for name in blob_names if name.endswith(".parquet"))
+
     def get_blob_summary(self, container: StorageContainer, path: str) -> tuple[int, int]:
         base_path = self.__file_path_service.remove_blob_file_name_from_path(
             file_path=path, file_name="region=*/*.parquet"
@@ -135,3 +196,34 @@ class BlobStorageService(IBlobStorageService):
             count += 1
             total_size += blob.size
         return count, total_size
+
+    @staticmethod
+    def __create_geo_metadata(partition: pa.Table) -> bytes:
+        bbox = partition.column("bbox")
+        bounds = [
+            pc.min(pc.struct_field(bbox, "xmin")).as_py(),
+            pc.min(pc.struct_field(bbox, "ymin")).as_py(),
+            pc.max(pc.struct_field(bbox, "xmax")).as_py(),
+            pc.max(pc.struct_field(bbox, "ymax")).as_py(),
+        ]
+
+        # Without a "crs" entry GeoParquet readers default to OGC:CRS84, i.e. WGS84 in lon/lat order
+        return json.dumps({
+            "version": "1.1.0",
+            "primary_column": "geometry",
+            "columns": {
+                "geometry": {
+                    "encoding": "WKB",
+                    "geometry_types": [],
+                    "bbox": bounds,
+                    "covering": {
+                        "bbox": {
+                            "xmin": ["bbox", "xmin"],
+                            "ymin": ["bbox", "ymin"],
+                            "xmax": ["bbox", "xmax"],
+                            "ymax": ["bbox", "ymax"],
+                        }
+                    },
+                }
+            },
+        }).encode("utf-8")
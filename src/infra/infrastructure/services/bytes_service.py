@@ -1,8 +1,10 @@
 ﻿from io import BytesIO
 from pathlib import Path
+from typing import BinaryIO, Iterator
 
 import geopandas as gpd
 import pandas as pd
+import pyarrow.parquet as pq
 from shapely import from_wkb
 
 from src.application.common import logger
@@ -18,11 +20,28 @@ class BytesService(IBytesService):
     @staticmethod
     def convert_parquet_bytes_to_gdf(data: bytes, epsg_code: EPSGCode) -> gpd.GeoDataFrame:
         df = BytesService.convert_parquet_bytes_to_df(data)
-        df["geometry"] = df["geometry"].apply(from_wkb)
+        df["geometry"] = from_wkb(df["geometry"].to_numpy())
 
         gdf = gpd.GeoDataFrame(df, geometry="geometry", crs=f"EPSG:{epsg_code.value}")
         return gdf
 
+    @staticmethod
+    def convert_parquet_file_to_gdf_batches(
+            file: BinaryIO,
+            epsg_code: EPSGCode,
+            batch_rows: int
+    ) -> Iterator[gpd.GeoDataFrame]:
+        parquet_file = pq.ParquetFile(file)
+        logger.info(
+            f"Streaming {parquet_file.metadata.num_rows} rows from {parquet_file.num_row_groups} row groups "
+            f"in batches of {batch_rows}"
+        )
+
+        for batch in parquet_file.iter_batches(batch_size=batch_rows):
+            df = batch.to_pandas()
+            df["geometry"] = from_wkb(df["geometry"].to_numpy())
+            yield gpd.GeoDataFrame(df, geometry="geometry", crs=f"EPSG:{epsg_code.value}")
+
     @staticmethod
     def convert_fgb_bytes_to_gdf(
             layers: list[bytes],
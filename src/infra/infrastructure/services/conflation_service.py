@@ -1,12 +1,18 @@
-﻿import geopandas as gpd
+﻿from typing import Iterator
+
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 import shapely
 from duckdb import DuckDBPyConnection
 
+from src import Config
 from src.application.common import logger
 from src.application.contracts import IConflationService, IFilePathService, IBlobStorageService
-from src.domain.enums import Theme, StorageContainer, DataSource, EPSGCode
+from src.domain.enums import Theme, StorageContainer, DataSource, ConflationEngine
+
+FKB_IDS_TABLE: str = "conflation_fkb_ids"
+OSM_IDS_TABLE: str = "conflation_osm_ids"
 
 
 class ConflationService(IConflationService):
@@ -24,8 +30,16 @@ class ConflationService(IConflationService):
         self.__file_path_service = file_path_service
         self.__blob_storage_service = blob_storage_service
 
-    def get_fkb_osm_id_relations(self, release: str, theme: Theme, region: str) -> pd.DataFrame:
-        logger.info(f"Finding diff between the raw OSM- and FKB-datasets for region '{region}'.")
+    def get_fkb_osm_id_relations(
+            self,
+            release: str,
+            theme: Theme,
+            region: str,
+            engine: ConflationEngine = ConflationEngine.STRTREE
+    ) -> pd.DataFrame:
+        logger.info(
+            f"Finding diff between the raw OSM- and FKB-datasets for region '{region}' with the '{engine.value}' engine."
+        )
 
         osm_release = self.__file_path_service.create_release_virtual_filesystem_path(
             storage_scheme="az",
@@ -69,17 +83,186 @@ class ConflationService(IConflationService):
             path=fkb_path_base
         )
 
-        osm_count = self.__db_context.execute(
+        if engine == ConflationEngine.SQL:
+            ids_df = self.__get_id_relations_sql(
+                osm_release=osm_release,
+                fkb_release=fkb_release,
+                has_osm_files=has_osm_files,
+                has_fkb_files=has_fkb_files
+            )
+        else:
+            ids_df = self.__get_id_relations_strtree(
+                osm_release=osm_release,
+                fkb_release=fkb_release,
+                has_osm_files=has_osm_files,
+                has_fkb_files=has_fkb_files
+            )
+
+        osm_only_count = ids_df[ids_df["fkb_id"].isna()].shape[0]
+        fkb_only_count = ids_df[ids_df["osm_id"].isna()].shape[0]
+        overlapping_count = ids_df[ids_df["fkb_id"].notna() & ids_df["osm_id"].notna()].shape[0]
+
+        logger.info(
+            f"Conflation step for region '{region}' completed. Result: {osm_only_count} OSM-only buildings, {fkb_only_count} FKB-only buildings, and {overlapping_count} overlapping buildings."
+        )
+
+        return ids_df
+
+    def merge_fkb_osm(
+            self,
+            release: str,
+            region: str,
+            theme: Theme,
+            ids: pd.DataFrame
+    ) -> Iterator[pa.Table]:
+        logger.info(f"Merging OSM- and FKB-datasets for region '{region}'")
+        osm_release = self.__file_path_service.create_release_virtual_filesystem_path(
+            storage_scheme="az",
+            container=StorageContainer.RAW,
+            release=release,
+            theme=Theme.BUILDINGS,
+            region=region,
+            file_name="*.parquet",
+            dataset=DataSource.OSM.value
+        )
+
+        fkb_release = self.__file_path_service.create_release_virtual_filesystem_path(
+            storage_scheme="az",
+            container=StorageContainer.RAW,
+            release=release,
+            theme=Theme.BUILDINGS,
+            region=region,
+            file_name="*.parquet",
+            dataset=DataSource.FKB.value
+        )
+
+        # The selected IDs are semi-joined from Arrow tables instead of being spliced into the SQL text
+        id_tables = {
+            FKB_IDS_TABLE: pa.table({
+                "id": pa.array(ids.loc[ids["fkb_id"].notna(), "fkb_id"].astype(str), type=pa.string())
+            }),
+            OSM_IDS_TABLE: pa.table({
+                "id": pa.array(
+                    ids.loc[ids["fkb_id"].isna() & ids["osm_id"].notna(), "osm_id"].astype(str),
+                    type=pa.string()
+                )
+            }),
+        }
+
+        osm_path_base = self.__file_path_service.remove_blob_file_name_from_path(
+            file_path=osm_release,
+            file_name="*.parquet",
+            prefix="az://raw/"
+        )
+
+        fkb_path_base = self.__file_path_service.remove_blob_file_name_from_path(
+            file_path=fkb_release,
+            file_name="*.parquet",
+            prefix="az://raw/"
+        )
+
+        has_osm_files = self.__blob_storage_service.has_files_under_blob_path_base(
+            container=StorageContainer.RAW,
+            path=osm_path_base
+        )
+
+        has_fkb_files = self.__blob_storage_service.has_files_under_blob_path_base(
+            container=StorageContainer.RAW,
+            path=fkb_path_base
+        )
+
+        osm_cte, fkb_cte = ConflationService.__create_merge_cte(
+            has_osm_files=has_osm_files,
+            osm_release=osm_release,
+            has_fkb_files=has_fkb_files,
+            fkb_release=fkb_release
+        )
+
+        query = f'''
+                WITH {fkb_cte}, {osm_cte},
+                
+                conflated AS (
+                    SELECT * FROM fkb
+                    UNION ALL
+                    SELECT * FROM osm
+                )
+                
+                SELECT
+                    * EXCLUDE (geometry),
+                    ST_AsWKB(geometry) AS geometry,
+                    struct_pack(
+                        xmin := ST_XMin(geometry),
+                        ymin := ST_YMin(geometry),
+                        xmax := ST_XMax(geometry),
+                        ymax := ST_YMax(geometry)
+                    ) AS bbox
+                FROM conflated
+                ORDER BY partition_key
+                '''
+
+        return self.__stream_partitions(query=query, id_tables=id_tables, region=region)
+
+    def __stream_partitions(self, query: str, id_tables: dict[str, pa.Table], region: str) -> Iterator[pa.Table]:
+        cursor = self.__db_context.cursor()
+        for table_name, table in id_tables.items():
+            cursor.register(table_name, table)
+
+        merged_count = 0
+        try:
+            reader = cursor.execute(query).fetch_record_batch(Config.CONFLATION_MERGE_BATCH_ROWS)
+            pending_batches: list[pa.RecordBatch] = []
+            pending_key = None
+
+            # Rows arrive sorted by partition key, so a partition is complete as soon as the key changes
+            for batch in reader:
+                if batch.num_rows == 0:
+                    continue
+
+                keys = batch.column("partition_key").to_numpy(zero_copy_only=False)
+                if pending_batches and keys[0] != pending_key:
+                    yield pa.Table.from_batches(pending_batches)
+                    pending_batches = []
+
+                start = 0
+                for boundary in np.flatnonzero(keys[1:] != keys[:-1]) + 1:
+                    pending_batches.append(batch.slice(start, boundary - start))
+                    yield pa.Table.from_batches(pending_batches)
+                    pending_batches = []
+                    start = boundary
+
+                pending_batches.append(batch.slice(start))
+                pending_key = keys[-1]
+                merged_count += batch.num_rows
+
+            if pending_batches:
+                yield pa.Table.from_batches(pending_batches)
+        finally:
+            for table_name in id_tables:
+                cursor.unregister(table_name)
+            cursor.close()
+
+        logger.info(f"Merged dataset for region '{region}' contains {merged_count} entries")
+
+    def __get_id_relations_sql(
+            self,
+            osm_release: str,
+            fkb_release: str,
+            has_osm_files: bool,
+            has_fkb_files: bool
+    ) -> pd.DataFrame:
+        # A cursor per call lets the setup pipeline conflate on a worker thread
+        cursor = self.__db_context.cursor()
+        osm_count = cursor.execute(
             f"SELECT COUNT(*) AS count FROM '{osm_release}'"
         ).fetchone()[0] if has_osm_files else 0
 
-        fkb_count = self.__db_context.execute(
+        fkb_count = cursor.execute(
             f"SELECT COUNT(*) AS count FROM '{fkb_release}'"
         ).fetchone()[0] if has_fkb_files else 0
 
         logger.info(f"Total number of buildings: {osm_count} in OSM and {fkb_count} FKB")
 
-        osm_cte, fkb_cte = ConflationService.__create_relation_cte(
+        osm_cte, fkb_cte = self.__create_relation_cte(
             has_osm_files=has_osm_files,
             has_fkb_files=has_fkb_files,
             osm_release=osm_release,
@@ -162,125 +345,89 @@ class ConflationService(IConflationService):
                     fkb_id,
                     osm_id,
                 FROM fkb_osm_overlap
-                WHERE iou > 0.70
+                WHERE iou > {Config.CONFLATION_IOU_THRESHOLD}
             )
 
             SELECT * FROM merged
             '''
 
-        ids_df = self.__db_context.execute(query).fetchdf()
+        try:
+            return cursor.execute(query).fetchdf()
+        finally:
+            cursor.close()
 
-        osm_only_count = ids_df[ids_df["fkb_id"].isna()].shape[0]
-        fkb_only_count = ids_df[ids_df["osm_id"].isna()].shape[0]
-        overlapping_count = ids_df[ids_df["fkb_id"].notna() & ids_df["osm_id"].notna()].shape[0]
-
-        logger.info(
-            f"Conflation step for region '{region}' completed. Result: {osm_only_count} OSM-only buildings, {fkb_only_count} FKB-only buildings, and {overlapping_count} overlapping buildings."
-        )
-
-        return ids_df
-
-    def merge_fkb_osm(
+    def __get_id_relations_strtree(
             self,
-            release: str,
-            region: str,
-            theme: Theme,
-            ids: pd.DataFrame
-    ) -> list[gpd.GeoDataFrame]:
-        logger.info(f"Merging OSM- and FKB-datasets for region '{region}'")
-        osm_release = self.__file_path_service.create_release_virtual_filesystem_path(
-            storage_scheme="az",
-            container=StorageContainer.RAW,
-            release=release,
-            theme=Theme.BUILDINGS,
-            region=region,
-            file_name="*.parquet",
-            dataset=DataSource.OSM.value
-        )
-
-        fkb_release = self.__file_path_service.create_release_virtual_filesystem_path(
-            storage_scheme="az",
-            container=StorageContainer.RAW,
-            release=release,
-            theme=Theme.BUILDINGS,
-            region=region,
-            file_name="*.parquet",
-            dataset=DataSource.FKB.value
-        )
-
-        ids_fkb = ids[ids["fkb_id"].notna()]["fkb_id"].to_list()
-        ids_osm = ids[ids["fkb_id"].isna() & ids["osm_id"].notna()]["osm_id"].to_list()
-
-        ids_fkb_str = ", ".join(f"'{v}'" for v in ids_fkb)
-        ids_osm_str = ", ".join(f"'{v}'" for v in ids_osm)
+            osm_release: str,
+            fkb_release: str,
+            has_osm_files: bool,
+            has_fkb_files: bool
+    ) -> pd.DataFrame:
+        osm_ids, osm_geometries = self.__read_ids_and_geometries(path=osm_release, has_files=has_osm_files)
+        fkb_ids, fkb_geometries = self.__read_ids_and_geometries(path=fkb_release, has_files=has_fkb_files)
 
-        fkb_filter = "FALSE" if not ids_fkb else f"external_id IN ({ids_fkb_str})"
-        osm_filter = "FALSE" if not ids_osm else f"external_id IN ({ids_osm_str})"
+        logger.info(f"Total number of buildings: {len(osm_ids)} in OSM and {len(fkb_ids)} FKB")
 
-        osm_path_base = self.__file_path_service.remove_blob_file_name_from_path(
-            file_path=osm_release,
-            file_name="*.parquet",
-            prefix="az://raw/"
-        )
+        # Every intersecting pair is found once, regardless of where the buildings sit relative to each other
+        fkb_index, osm_index = shapely.STRtree(osm_geometries).query(fkb_geometries, predicate="intersects")
 
-        fkb_path_base = self.__file_path_service.remove_blob_file_name_from_path(
-            file_path=fkb_release,
-            file_name="*.parquet",
-            prefix="az://raw/"
+        intersection_areas = shapely.area(
+            shapely.intersection(fkb_geometries[fkb_index], osm_geometries[osm_index])
         )
-
-        has_osm_files = self.__blob_storage_service.has_files_under_blob_path_base(
-            container=StorageContainer.RAW,
-            path=osm_path_base
+        union_areas = shapely.area(fkb_geometries)[fkb_index] + shapely.area(osm_geometries)[osm_index] \
+            - intersection_areas
+        iou = np.divide(
+            intersection_areas,
+            union_areas,
+            out=np.zeros_like(intersection_areas),
+            where=union_areas > 0
         )
 
-        has_fkb_files = self.__blob_storage_service.has_files_under_blob_path_base(
-            container=StorageContainer.RAW,
-            path=fkb_path_base
-        )
-
-        osm_cte, fkb_cte = ConflationService.__create_merge_cte(
-            has_osm_files=has_osm_files,
-            osm_release=osm_release,
-            osm_filter=osm_filter,
-            has_fkb_files=has_fkb_files,
-            fkb_release=fkb_release,
-            fkb_filter=fkb_filter
-        )
-
-        query = f'''
-                WITH {fkb_cte}, {osm_cte},
-                
-                conflated AS (
-                    SELECT * FROM fkb
-                    UNION ALL
-                    SELECT * FROM osm
-                )
-                
-                SELECT * FROM conflated
-                '''
-
-        df = self.__db_context.execute(query).fetchdf()
-
-        geometry_array = df["geometry"].to_numpy()
-        geometry_array = np.array(
-            [bytes(g) if isinstance(g, (bytearray, memoryview)) else g for g in geometry_array],
-            dtype=object,
-        )
-        df["geometry"] = shapely.from_wkb(geometry_array)
-        gdf = gpd.GeoDataFrame(df, geometry="geometry", crs=f"EPSG:{EPSGCode.WGS84.value}")
-
-        merged_count = gdf.shape[0]
-        logger.info(f"Merged dataset for region '{region}' contains {merged_count} entries")
-
-        return [
-            gpd.GeoDataFrame(hash_partition, geometry="geometry", crs=gdf.crs)
-            for _, hash_partition in gdf.groupby("partition_key")
-        ]
+        fkb_only = np.ones(len(fkb_ids), dtype=bool)
+        fkb_only[fkb_index] = False
+        osm_only = np.ones(len(osm_ids), dtype=bool)
+        osm_only[osm_index] = False
+        overlap = iou > Config.CONFLATION_IOU_THRESHOLD
+
+        return pd.DataFrame({
+            "fkb_id": np.concatenate([
+                fkb_ids[fkb_only],
+                np.full(osm_only.sum(), None, dtype=object),
+                fkb_ids[fkb_index[overlap]],
+            ]),
+            "osm_id": np.concatenate([
+                np.full(fkb_only.sum(), None, dtype=object),
+                osm_ids[osm_only],
+                osm_ids[osm_index[overlap]],
+            ]),
+        })
+
+    def __read_ids_and_geometries(self, path: str, has_files: bool) -> tuple[np.ndarray, np.ndarray]:
+        if not has_files:
+            return np.empty(0, dtype=object), np.empty(0, dtype=object)
+
+        cursor = self.__db_context.cursor()
+        try:
+            table = cursor.execute(f"""
+                SELECT external_id, ST_AsWKB(ST_Force2D(geometry)) AS geometry
+                FROM read_parquet('{path}', union_by_name = true)
+            """).fetch_arrow_table()
+        finally:
+            cursor.close()
+
+        ids = np.array(table.column("external_id").to_pylist(), dtype=object)
+        geometries = shapely.from_wkb(table.column("geometry").to_numpy(zero_copy_only=False))
+
+        invalid = ~shapely.is_valid(geometries)
+        if invalid.any():
+            geometries[invalid] = shapely.make_valid(geometries[invalid])
+
+        return ids, geometries
 
     @staticmethod
     def __create_relation_cte(has_osm_files: bool, has_fkb_files: bool, osm_release: str, fkb_release: str) -> tuple[
         str, str]:
+        # Invalid geometries are repaired like in the STRtree engine, so both engines compute the same IoU
         if has_osm_files:
             osm_cte = f"""osm AS 
             (
@@ -289,7 +436,10 @@ class ConflationService(IConflationService):
                     TRY_CAST(building_id AS INTEGER) AS building_id,
                     CAST(FLOOR(ST_X(ST_Centroid(geometry)) * 100) AS INTEGER) AS grid_x,
                     CAST(FLOOR(ST_Y(ST_Centroid(geometry)) * 100) AS INTEGER) AS grid_y,
-                    ST_Force2D(geometry) AS geom
+                    CASE
+                        WHEN ST_IsValid(ST_Force2D(geometry)) THEN ST_Force2D(geometry)
+                        ELSE ST_MakeValid(ST_Force2D(geometry))
+                    END AS geom
                 FROM read_parquet('{osm_release}', union_by_name = true)
             )
             """
@@ -314,7 +464,10 @@ class ConflationService(IConflationService):
                     TRY_CAST(building_id AS INTEGER) AS building_id,
                     CAST(FLOOR(ST_X(ST_Centroid(geometry)) * 100) AS INTEGER) AS grid_x,
                     CAST(FLOOR(ST_Y(ST_Centroid(geometry)) * 100) AS INTEGER) AS grid_y,
-                    ST_Force2D(geometry) AS geom
+                    CASE
+                        WHEN ST_IsValid(ST_Force2D(geometry)) THEN ST_Force2D(geometry)
+                        ELSE ST_MakeValid(ST_Force2D(geometry))
+                    END AS geom
                 FROM read_parquet('{fkb_release}', union_by_name = true)
             )
             """
@@ -338,16 +491,14 @@ class ConflationService(IConflationService):
             has_osm_files: bool,
             has_fkb_files: bool,
             osm_release: str,
-            fkb_release: str,
-            osm_filter: str,
-            fkb_filter: str
+            fkb_release: str
     ) -> tuple[str, str]:
         if has_osm_files:
             osm_cte = f"""osm AS
             (
                 SELECT
                     external_id,
-                    ST_AsWKB(geometry) as geometry,
+                    geometry,
                     region,
                     partition_key,
                     building_type,
@@ -356,7 +507,8 @@ class ConflationService(IConflationService):
                     feature_capture_time,
                     'osm' AS source
                 FROM read_parquet('{osm_release}', union_by_name = true)
-                WHERE {osm_filter}
+                SEMI JOIN {OSM_IDS_TABLE} ids
+                    ON CAST(external_id AS VARCHAR) = ids.id
             )
             """
         else:
@@ -364,7 +516,7 @@ class ConflationService(IConflationService):
             osm AS (
                 SELECT
                     CAST(NULL AS INTEGER) AS external_id,
-                    CAST(NULL AS BLOB) AS geometry,
+                    CAST(NULL AS GEOMETRY) AS geometry,
                     CAST(NULL AS VARCHAR) AS region,
                     CAST(NULL AS VARCHAR) AS partition_key,
                     CAST(NULL AS VARCHAR) AS building_type,
@@ -381,7 +533,7 @@ class ConflationService(IConflationService):
             (
                 SELECT
                     external_id,
-                    ST_AsWKB(geometry) AS geometry,
+                    geometry,
                     region,
                     partition_key,
                     TRY_CAST(building_type AS VARCHAR) AS building_type,
@@ -390,7 +542,8 @@ class ConflationService(IConflationService):
                     NULL AS feature_capture_time,
                     'fkb' AS source
                 FROM read_parquet('{fkb_release}', union_by_name = true)
-                WHERE {fkb_filter}
+                SEMI JOIN {FKB_IDS_TABLE} ids
+                    ON CAST(external_id AS VARCHAR) = ids.id
             )
             """
         else:
@@ -398,7 +551,7 @@ class ConflationService(IConflationService):
             fkb AS (
                 SELECT
                     CAST(NULL AS VARCHAR) AS external_id,
-                    CAST(NULL AS BLOB) AS geometry,
+                    CAST(NULL AS GEOMETRY) AS geometry,
                     CAST(NULL AS VARCHAR) AS region,
                     CAST(NULL AS VARCHAR) AS partition_key,
                     CAST(NULL AS VARCHAR) AS building_type,
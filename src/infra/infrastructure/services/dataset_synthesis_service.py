@@ -1,8 +1,11 @@
 import math
+import zlib
+from typing import Iterator
 
 import geopandas as gpd
 import numpy as np
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import shapely
 from duckdb import DuckDBPyConnection
 
@@ -17,6 +20,13 @@ from src.application.contracts import (
 )
 from src.domain.enums import DatasetSize, EPSGCode, StorageContainer, Theme
 
+BBOX_TYPE: pa.StructType = pa.struct([
+    ("xmin", pa.float64()),
+    ("ymin", pa.float64()),
+    ("xmax", pa.float64()),
+    ("ymax", pa.float64()),
+])
+
 
 class DatasetSynthesisService(IDatasetSynthesisService):
     __db_context: DuckDBPyConnection
@@ -39,12 +49,15 @@ class DatasetSynthesisService(IDatasetSynthesisService):
         self.__county_service = county_service
         self.__vector_service = vector_service
 
-    def run_pipeline(self, release: str, target_size: DatasetSize) -> None:
-        clones_per_polygon = target_size.clones_per_polygon
-        if clones_per_polygon <= 0:
-            raise ValueError(
-                f"DatasetSynthesisService only supports sizes with a positive clones_per_polygon. Got '{target_size.value}' ({clones_per_polygon})."
-            )
+    def run_pipeline(self, release: str, target_sizes: list[DatasetSize]) -> None:
+        if not target_sizes:
+            raise ValueError("DatasetSynthesisService requires at least one target size.")
+
+        for target_size in target_sizes:
+            if target_size.clones_per_polygon <= 0:
+                raise ValueError(
+                    f"DatasetSynthesisService only supports sizes with a positive clones_per_polygon. Got '{target_size.value}' ({target_size.clones_per_polygon})."
+                )
 
         regions = self.__county_service.get_county_ids()
         if Config.SETUP_COUNTY_LIMIT is not None:
@@ -54,31 +67,33 @@ class DatasetSynthesisService(IDatasetSynthesisService):
             )
             regions = limited_regions
 
+        size_names = ", ".join(
+            f"'{target_size.value}' ({target_size.clones_per_polygon} clones per source polygon)"
+            for target_size in target_sizes
+        )
         logger.info(
-            f"Synthesizing '{target_size.value}' dataset for release '{release}' with {clones_per_polygon} clones per source polygon across {len(regions)} regions."
+            f"Synthesizing {size_names} for release '{release}' in one pass across {len(regions)} regions."
         )
 
         for region in regions:
             logger.info(
-                f"Synthesizing region '{region}' for size '{target_size.value}'..."
+                f"Synthesizing region '{region}' for sizes {[target_size.value for target_size in target_sizes]}..."
             )
             self.__synthesize_region(
                 release=release,
                 region=region,
-                target_size=target_size,
-                clones_per_polygon=clones_per_polygon,
+                target_sizes=target_sizes,
             )
 
         logger.info(
-            f"Synthesis of '{target_size.value}' dataset complete for release '{release}'."
+            f"Synthesis of {[target_size.value for target_size in target_sizes]} complete for release '{release}'."
         )
 
     def __synthesize_region(
         self,
         release: str,
         region: str,
-        target_size: DatasetSize,
-        clones_per_polygon: int,
+        target_sizes: list[DatasetSize],
     ) -> None:
         county_wkb, _ = self.__county_service.get_county_polygons_by_id(
             county_id=region, epsg_code=EPSGCode.WGS84
@@ -96,146 +111,180 @@ class DatasetSynthesisService(IDatasetSynthesisService):
             dataset_size=DatasetSize.SMALL,
         )
 
-        originals_geodataframe = self.__read_source_polygons(source_path=source_path)
-        if originals_geodataframe is None or originals_geodataframe.empty:
+        source_table = self.__read_source_table(source_path=source_path)
+        if source_table is None or source_table.num_rows == 0:
             logger.warning(
                 f"No source rows for region '{region}' at '{source_path}'. Skipping."
             )
             return
 
-        clones_geodataframe = self.__generate_clones(
-            originals_geodataframe=originals_geodataframe,
-            region=region,
-            clones_per_polygon=clones_per_polygon,
-            county_bounds=(county_minx, county_miny, county_maxx, county_maxy),
-        )
-
-        combined_geodataframe = self.__combine_and_finalize(
-            originals_geodataframe=originals_geodataframe,
-            clones_geodataframe=clones_geodataframe,
-        )
+        for target_size in target_sizes:
+            logger.info(
+                f"Region '{region}': streaming {source_table.num_rows * (target_size.clones_per_polygon + 1)} rows as size '{target_size.value}'"
+            )
 
-        logger.info(
-            f"Region '{region}': uploading {len(combined_geodataframe)} rows as size '{target_size.value}'"
-        )
-        self.__blob_storage_service.upload_blobs_as_parquet(
-            container=StorageContainer.DATA,
-            release=release,
-            theme=Theme.BUILDINGS,
+        chunks = self.__generate_chunks(
+            source_table=source_table,
             region=region,
-            partitions=[combined_geodataframe],
-            dataset_size=target_size,
-            row_group_size=Config.GEOPARQUET_ROW_GROUP_SIZE,
+            target_sizes=target_sizes,
+            county_bounds=(county_minx, county_miny, county_maxx, county_maxy),
         )
-
-    def __read_source_polygons(self, source_path: str) -> gpd.GeoDataFrame | None:
-        dataframe = self.__db_context.execute(
+        for part_index, tables_by_size in enumerate(chunks):
+            for target_size, table in tables_by_size.items():
+                self.__blob_storage_service.upload_arrow_tables_as_geoparquet(
+                    container=StorageContainer.DATA,
+                    release=release,
+                    theme=Theme.BUILDINGS,
+                    region=region,
+                    partitions=[table],
+                    dataset_size=target_size,
+                    row_group_size=Config.GEOPARQUET_ROW_GROUP_SIZE,
+                    first_part_index=part_index,
+                )
+
+    def __read_source_table(self, source_path: str) -> pa.Table | None:
+        # The chunks and their random draws follow the row order, which DuckDB does not preserve across
+        # threads when `preserve_insertion_order` is disabled, so the rows are sorted on a unique key
+        table = self.__db_context.execute(
             f"""
             SELECT
                 ST_AsWKB(geometry) AS geometry,
                 * EXCLUDE (geometry)
             FROM read_parquet('{source_path}', union_by_name = true)
+            ORDER BY partition_key, source, external_id
             """
-        ).fetchdf()
+        ).fetch_arrow_table()
 
-        if dataframe.empty:
+        if table.num_rows == 0:
             return None
 
-        dataframe = dataframe.drop(columns=["bbox", "size", "theme"], errors="ignore")
-
-        if "region" in dataframe.columns:
-            dataframe["region"] = dataframe["region"].astype(str)
-
-        geometry_array = dataframe["geometry"].to_numpy()
-        geometry_array = np.array(
-            [bytes(g) if isinstance(g, (bytearray, memoryview)) else g for g in geometry_array],
-            dtype=object,
-        )
-        dataframe["geometry"] = shapely.from_wkb(geometry_array)
+        table = table.drop_columns([name for name in ("bbox", "size", "theme") if name in table.column_names])
 
-        geodataframe = gpd.GeoDataFrame(
-            dataframe, geometry="geometry", crs=f"EPSG:{EPSGCode.WGS84.value}"
-        )
+        if "region" in table.column_names:
+            table = table.set_column(
+                table.schema.get_field_index("region"),
+                "region",
+                pc.cast(table.column("region"), pa.string()),
+            )
 
-        valid_mask = shapely.is_valid(geodataframe.geometry.to_numpy())
+        valid_mask = shapely.is_valid(shapely.from_wkb(table.column("geometry").to_numpy(zero_copy_only=False)))
         invalid_count = int((~valid_mask).sum())
         if invalid_count:
             logger.info(
                 f"Dropping {invalid_count} invalid source polygons before cloning"
             )
-            geodataframe = geodataframe.loc[valid_mask].reset_index(drop=True)
+            table = table.filter(pa.array(valid_mask))
 
-        return geodataframe
+        return table
 
-    def __generate_clones(
+    def __generate_chunks(
         self,
-        originals_geodataframe: gpd.GeoDataFrame,
+        source_table: pa.Table,
         region: str,
-        clones_per_polygon: int,
+        target_sizes: list[DatasetSize],
         county_bounds: tuple[float, float, float, float],
-    ) -> gpd.GeoDataFrame:
+    ) -> Iterator[dict[DatasetSize, pa.Table]]:
         county_minx, county_miny, county_maxx, county_maxy = county_bounds
-        source_geometries = originals_geodataframe.geometry.to_numpy()
+        source_geometries = shapely.from_wkb(source_table.column("geometry").to_numpy(zero_copy_only=False))
         source_count = len(source_geometries)
-        clone_count = source_count * clones_per_polygon
+        clones_per_polygon = max(target_size.clones_per_polygon for target_size in target_sizes)
+
+        # Chunks and random draws are sized for the largest dataset size, independent of the requested targets,
+        # so the clones of a size are the same whichever other sizes are synthesized with it
+        max_clones_per_polygon = max(size.clones_per_polygon for size in DatasetSize)
+        chunk_sources = max(1, Config.SYNTHESIS_CHUNK_ROWS // max_clones_per_polygon)
 
         logger.info(
-            f"Region '{region}': generating {clone_count} candidate clones from {source_count} source polygons"
+            f"Region '{region}': generating {source_count * clones_per_polygon} clones from {source_count} source "
+            f"polygons in {math.ceil(source_count / chunk_sources)} chunks of {chunk_sources} source polygons"
         )
 
+        schema = source_table.schema.append(pa.field("bbox", BBOX_TYPE))
+        originals_table = source_table.append_column(
+            "bbox", self.__get_bbox_array(source_geometries)
+        ).sort_by("partition_key")
+        yield {target_size: originals_table for target_size in target_sizes}
+
         centroids = shapely.centroid(source_geometries)
         source_centroid_x = shapely.get_x(centroids)
         source_centroid_y = shapely.get_y(centroids)
-
-        random_generator = np.random.default_rng()
-        target_centroid_x = random_generator.uniform(county_minx, county_maxx, clone_count)
-        target_centroid_y = random_generator.uniform(county_miny, county_maxy, clone_count)
-        rotation_radians = random_generator.uniform(0.0, 2.0 * math.pi, clone_count)
-        jitter_x = random_generator.uniform(-Config.SYNTHESIS_JITTER_DEGREES, Config.SYNTHESIS_JITTER_DEGREES, clone_count)
-        jitter_y = random_generator.uniform(-Config.SYNTHESIS_JITTER_DEGREES, Config.SYNTHESIS_JITTER_DEGREES, clone_count)
-
-        repeated_geometries = np.repeat(source_geometries, clones_per_polygon)
-        repeated_centroid_x = np.repeat(source_centroid_x, clones_per_polygon)
-        repeated_centroid_y = np.repeat(source_centroid_y, clones_per_polygon)
-
-        clone_geometries = self.__apply_affine_via_duckdb(
-            source_geometries=repeated_geometries,
-            source_centroid_x=repeated_centroid_x,
-            source_centroid_y=repeated_centroid_y,
-            target_centroid_x=target_centroid_x,
-            target_centroid_y=target_centroid_y,
-            rotation_radians=rotation_radians,
-            jitter_x=jitter_x,
-            jitter_y=jitter_y,
-        )
-
-        valid_mask = shapely.is_valid(clone_geometries)
-        dropped_count = int((~valid_mask).sum())
-        if dropped_count:
-            logger.info(
-                f"Region '{region}': dropped {dropped_count} invalid clones after transform"
+        region_seed = zlib.crc32(region.encode("utf-8"))
+
+        for chunk_index, chunk_start in enumerate(range(0, source_count, chunk_sources)):
+            source_indices = np.arange(chunk_start, min(chunk_start + chunk_sources, source_count))
+
+            # Clone k of a source polygon only depends on the seed, region and chunk, so every size is a
+            # superset of the smaller sizes and reruns reproduce the same datasets
+            random_generator = np.random.default_rng([Config.SYNTHESIS_SEED, region_seed, chunk_index])
+            draw_shape = (len(source_indices), max_clones_per_polygon)
+            target_centroid_x, target_centroid_y, rotation_radians, jitter_x, jitter_y = (
+                draws[:, :clones_per_polygon].ravel()
+                for draws in (
+                    random_generator.uniform(county_minx, county_maxx, draw_shape),
+                    random_generator.uniform(county_miny, county_maxy, draw_shape),
+                    random_generator.uniform(0.0, 2.0 * math.pi, draw_shape),
+                    random_generator.uniform(-Config.SYNTHESIS_JITTER_DEGREES, Config.SYNTHESIS_JITTER_DEGREES, draw_shape),
+                    random_generator.uniform(-Config.SYNTHESIS_JITTER_DEGREES, Config.SYNTHESIS_JITTER_DEGREES, draw_shape),
+                )
             )
-        clone_geometries = clone_geometries[valid_mask]
-
-        if len(clone_geometries) == 0:
-            return gpd.GeoDataFrame(
-                {
-                    "region": pd.Series([], dtype="object"),
-                    "partition_key": pd.Series([], dtype="object"),
-                },
-                geometry=gpd.GeoSeries([], crs=f"EPSG:{EPSGCode.WGS84.value}"),
+            clone_sources = np.repeat(source_indices, clones_per_polygon)
+            clone_slots = np.tile(np.arange(clones_per_polygon), len(source_indices))
+
+            clone_geometries = self.__apply_affine(
+                source_geometries=source_geometries[clone_sources],
+                source_centroid_x=source_centroid_x[clone_sources],
+                source_centroid_y=source_centroid_y[clone_sources],
+                target_centroid_x=target_centroid_x,
+                target_centroid_y=target_centroid_y,
+                rotation_radians=rotation_radians,
+                jitter_x=jitter_x,
+                jitter_y=jitter_y,
+            )
+            clone_table = self.__create_clone_table(
+                clone_geometries=clone_geometries,
+                region=region,
+                schema=schema,
             )
 
-        clones_geodataframe = gpd.GeoDataFrame(
-            {"region": [region] * len(clone_geometries)},
-            geometry=gpd.GeoSeries(clone_geometries),
-            crs=f"EPSG:{EPSGCode.WGS84.value}",
-        )
-
-        return self.__vector_service.compute_partition_key(clones_geodataframe)
+            yield {
+                target_size: clone_table.filter(
+                    pa.array(clone_slots < target_size.clones_per_polygon)
+                ).sort_by("partition_key")
+                for target_size in target_sizes
+            }
+            logger.debug(
+                f"Region '{region}': synthesized clones for {source_indices[-1] + 1} of {source_count} source polygons"
+            )
 
-    def __apply_affine_via_duckdb(
+    def __create_clone_table(
         self,
+        clone_geometries: np.ndarray,
+        region: str,
+        schema: pa.Schema,
+    ) -> pa.Table:
+        partition_keys = self.__vector_service.compute_partition_key(
+            gpd.GeoDataFrame(geometry=clone_geometries, crs=f"EPSG:{EPSGCode.WGS84.value}")
+        )["partition_key"].to_numpy(dtype=object)
+
+        clone_count = len(clone_geometries)
+        columns = {
+            "geometry": pa.array(shapely.to_wkb(clone_geometries), type=pa.binary()),
+            "region": pa.array([region] * clone_count, type=pa.string()),
+            "partition_key": pa.array(partition_keys, type=pa.string()),
+            "bbox": self.__get_bbox_array(clone_geometries),
+        }
+
+        # Clones only carry geometry, region and partition key, so the source attributes are left NULL
+        return pa.Table.from_arrays(
+            [
+                columns[field.name].cast(field.type) if field.name in columns else pa.nulls(clone_count, field.type)
+                for field in schema
+            ],
+            schema=schema,
+        )
+
+    @staticmethod
+    def __apply_affine(
         source_geometries: np.ndarray,
         source_centroid_x: np.ndarray,
         source_centroid_y: np.ndarray,
@@ -255,49 +304,27 @@ class DatasetSynthesisService(IDatasetSynthesisService):
         translation_x = (target_centroid_x + jitter_x) - (matrix_a * source_centroid_x + matrix_b * source_centroid_y)
         translation_y = (target_centroid_y + jitter_y) - (matrix_d * source_centroid_x + matrix_e * source_centroid_y)
 
-        affine_input = pd.DataFrame({
-            "source_wkb": shapely.to_wkb(source_geometries),
-            "matrix_a": matrix_a,
-            "matrix_b": matrix_b,
-            "matrix_d": matrix_d,
-            "matrix_e": matrix_e,
-            "translation_x": translation_x,
-            "translation_y": translation_y,
-        })
-
-        self.__db_context.register("dataset_synthesis_affine_input", affine_input)
-        try:
-            affine_result = self.__db_context.execute(
-                """
-                SELECT
-                    ST_AsWKB(
-                        ST_Affine(
-                            ST_GeomFromWKB(source_wkb),
-                            matrix_a, matrix_b, matrix_d, matrix_e,
-                            translation_x, translation_y
-                        )
-                    ) AS clone_wkb
-                FROM dataset_synthesis_affine_input
-                """
-            ).fetchdf()
-        finally:
-            self.__db_context.unregister("dataset_synthesis_affine_input")
-
-        clone_wkb_array = affine_result["clone_wkb"].to_numpy()
-        clone_wkb_array = np.array(
-            [bytes(g) if isinstance(g, (bytearray, memoryview)) else g for g in clone_wkb_array],
-            dtype=object,
+        # shapely.transform passes the coordinates of all geometries as one array in geometry order,
+        # so each matrix is repeated once per coordinate of its geometry
+        coordinate_counts = shapely.get_num_coordinates(source_geometries)
+        matrix_a, matrix_b, matrix_d, matrix_e, translation_x, translation_y = (
+            np.repeat(values, coordinate_counts)
+            for values in (matrix_a, matrix_b, matrix_d, matrix_e, translation_x, translation_y)
+        )
+
+        # A rotation and translation of a valid polygon is valid, so the clones are not validated again
+        return shapely.transform(
+            source_geometries,
+            lambda coordinates: np.column_stack((
+                matrix_a * coordinates[:, 0] + matrix_b * coordinates[:, 1] + translation_x,
+                matrix_d * coordinates[:, 0] + matrix_e * coordinates[:, 1] + translation_y,
+            )),
         )
-        return shapely.from_wkb(clone_wkb_array)
 
     @staticmethod
-    def __combine_and_finalize(
-        originals_geodataframe: gpd.GeoDataFrame,
-        clones_geodataframe: gpd.GeoDataFrame,
-    ) -> gpd.GeoDataFrame:
-        combined = pd.concat([originals_geodataframe, clones_geodataframe], ignore_index=True)
-        combined_geodataframe = gpd.GeoDataFrame(
-            combined, geometry="geometry", crs=originals_geodataframe.crs
+    def __get_bbox_array(geometries: np.ndarray) -> pa.StructArray:
+        bounds = shapely.bounds(geometries)
+        return pa.StructArray.from_arrays(
+            [pa.array(bounds[:, index]) for index in range(4)],
+            fields=list(BBOX_TYPE),
         )
-        combined_geodataframe = combined_geodataframe.sort_values("partition_key").reset_index(drop=True)
-        return combined_geodataframe
@@ -0,0 +1,86 @@
+import math
+
+import psutil
+
+from src import Config
+from src.application.common import logger
+from src.application.contracts import IDuckDBConfigurationService, IBenchmarkConfigurationService
+from src.application.dtos import DuckDBSettings
+from src.domain.enums import DuckDBProfile
+
+
+class DuckDBConfigurationService(IDuckDBConfigurationService):
+    __benchmark_configuration_service: IBenchmarkConfigurationService
+
+    def __init__(self, benchmark_configuration_service: IBenchmarkConfigurationService) -> None:
+        self.__benchmark_configuration_service = benchmark_configuration_service
+
+    def resolve_settings(self, script_id: str | None, profile: DuckDBProfile) -> DuckDBSettings:
+        if profile == DuckDBProfile.DEFAULT:
+            return DuckDBSettings(profile=profile.value)
+
+        cpu, memory_gb = self.__get_container_resources(script_id=script_id)
+        cores = max(1, math.floor(cpu))
+
+        match profile:
+            case DuckDBProfile.MATCHED:
+                settings = DuckDBSettings(
+                    profile=profile.value,
+                    threads=cores,
+                    memory_limit_gb=round(memory_gb * Config.DUCKDB_MEMORY_LIMIT_FRACTION, 2),
+                    preserve_insertion_order=False,
+                    azure_read_transfer_concurrency=Config.DUCKDB_AZURE_READ_TRANSFER_CONCURRENCY,
+                    azure_read_transfer_chunk_size=Config.DUCKDB_AZURE_READ_TRANSFER_CHUNK_SIZE,
+                )
+            case DuckDBProfile.IO_BOUND:
+                # Oversubscribe threads so that blob round trips overlap with decoding
+                settings = DuckDBSettings(
+                    profile=profile.value,
+                    threads=cores * 2,
+                    memory_limit_gb=round(memory_gb * Config.DUCKDB_MEMORY_LIMIT_FRACTION, 2),
+                    preserve_insertion_order=False,
+                    azure_read_transfer_concurrency=Config.DUCKDB_AZURE_READ_TRANSFER_CONCURRENCY * 3,
+                    azure_read_transfer_chunk_size=Config.DUCKDB_AZURE_READ_TRANSFER_CHUNK_SIZE * 4,
+                )
+            case DuckDBProfile.MEMORY_CONSERVATIVE:
+                settings = DuckDBSettings(
+                    profile=profile.value,
+                    threads=cores,
+                    memory_limit_gb=round(memory_gb * Config.DUCKDB_CONSERVATIVE_MEMORY_LIMIT_FRACTION, 2),
+                    preserve_insertion_order=False,
+                    azure_read_transfer_concurrency=1,
+                    azure_read_transfer_chunk_size=Config.DUCKDB_AZURE_READ_TRANSFER_CHUNK_SIZE,
+                )
+            case DuckDBProfile.OUT_OF_CORE:
+                # Leave headroom for the Python process so that DuckDB spills to disk before the container is OOM-killed
+                settings = DuckDBSettings(
+                    profile=profile.value,
+                    threads=cores,
+                    memory_limit_gb=round(memory_gb * Config.DUCKDB_OUT_OF_CORE_MEMORY_LIMIT_FRACTION, 2),
+                    preserve_insertion_order=False,
+                    azure_read_transfer_concurrency=Config.DUCKDB_AZURE_READ_TRANSFER_CONCURRENCY,
+                    azure_read_transfer_chunk_size=Config.DUCKDB_AZURE_READ_TRANSFER_CHUNK_SIZE,
+                    temp_directory=str(Config.DUCKDB_TEMP_DIRECTORY),
+                    max_temp_directory_size_gb=Config.DUCKDB_MAX_TEMP_DIRECTORY_SIZE_GB,
+                )
+            case _:
+                raise ValueError(f"Unsupported DuckDB profile '{profile.value}'")
+
+        logger.info(
+            f"Resolved DuckDB profile '{profile.value}' for {cpu} vCPU and {memory_gb} GB: {settings.to_json()}"
+        )
+        return settings
+
+    def __get_container_resources(self, script_id: str | None) -> tuple[float, float]:
+        if script_id is not None:
+            try:
+                experiment = self.__benchmark_configuration_service.get_experiment_configuration(
+                    script_id=script_id
+                )
+                return experiment.cpu, experiment.memory_gb
+            except ValueError:
+                logger.info(f"Script '{script_id}' has no experiment configuration. Using process resources.")
+
+        cpu = float(psutil.cpu_count(logical=True) or 1)
+        memory_gb = psutil.virtual_memory().total / 1024 ** 3
+        return cpu, memory_gb
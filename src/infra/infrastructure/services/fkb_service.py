@@ -1,41 +1,61 @@
-﻿import geopandas as gpd
+﻿import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+import geopandas as gpd
+import numpy as np
 import pandas as pd
 import pyarrow as pa
+import shapely
 from duckdb import DuckDBPyConnection
+from fsspec import AbstractFileSystem
 from shapely import from_wkb
 
-from src.domain.enums import StorageContainer, EPSGCode
+from src import Config
+from src.application.common import logger
+from src.domain.enums import StorageContainer, EPSGCode, PolygonizationStrategy
 from src.application.contracts import (
-    IFKBService, IBytesService, IBlobStorageService
+    IFKBService, IBytesService
 )
 
+BUILDING_EDGE_LAYERS: tuple[str, ...] = ("Takkant", "FiktivBygningsavgrensning", "Bygningsdelelinje")
+
 
 class FKBService(IFKBService):
     __db_context: DuckDBPyConnection
     __bytes_service: IBytesService
-    __blob_storage_service: IBlobStorageService
+    __filesystem: AbstractFileSystem
 
     def __init__(
             self,
             db_context: DuckDBPyConnection,
             bytes_service: IBytesService,
-            blob_storage_service: IBlobStorageService
+            filesystem: AbstractFileSystem
     ) -> None:
         self.__db_context = db_context
         self.__bytes_service = bytes_service
-        self.__blob_storage_service = blob_storage_service
-
-    def extract_fkb_data(self) -> gpd.GeoDataFrame:
-        fkb_bytes = self.__blob_storage_service.download_file(
-            container_name=StorageContainer.CONTRIBUTION,
-            blob_name="fkb.parquet"
-        )
+        self.__filesystem = filesystem
 
-        gdf = self.__bytes_service.convert_parquet_bytes_to_gdf(fkb_bytes, EPSGCode.WGS84)
-        return gdf
+    def extract_fkb_data(self) -> Iterator[gpd.GeoDataFrame]:
+        with self.__filesystem.open(f"{StorageContainer.CONTRIBUTION.value}/fkb.parquet", "rb") as file:
+            yield from self.__bytes_service.convert_parquet_file_to_gdf_batches(
+                file=file,
+                epsg_code=EPSGCode.WGS84,
+                batch_rows=Config.BUILDINGS_BATCH_SIZE
+            )
 
-    def create_building_polygons(self, gdf: gpd.GeoDataFrame, crs: EPSGCode) -> gpd.GeoDataFrame:
-        polygons_gdf, points_gdf = self.__create_polygon_and_point_datasets(fkb_dataset=gdf, crs=EPSGCode.WGS84)
+    def create_building_polygons(
+            self,
+            gdf: gpd.GeoDataFrame,
+            crs: EPSGCode,
+            strategy: PolygonizationStrategy = PolygonizationStrategy.GLOBAL
+    ) -> gpd.GeoDataFrame:
+        polygons_gdf, points_gdf = self.__create_polygon_and_point_datasets(
+            fkb_dataset=gdf,
+            crs=EPSGCode.WGS84,
+            strategy=strategy
+        )
         buildings_gdf = self.__find_overlapping_points(polygons=polygons_gdf, points=points_gdf)
         return buildings_gdf
 
@@ -64,13 +84,29 @@ class FKBService(IFKBService):
     def __create_polygon_and_point_datasets(
             self,
             fkb_dataset: gpd.GeoDataFrame,
-            crs: EPSGCode
+            crs: EPSGCode,
+            strategy: PolygonizationStrategy
     ) -> tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]:
         """
         Creates polygon and point datasets from the FKB dataset.
         :param fkb_dataset: FKB dataset as a GeoDataFrame.
+        :param strategy: Strategy used to polygonize the roof-edge lines.
         :return: Tuple containing polygon GeoDataFrame and point GeoDataFrame.
         """
+        match strategy:
+            case PolygonizationStrategy.GLOBAL:
+                polygons = self.__polygonize_global(fkb_dataset=fkb_dataset)
+            case PolygonizationStrategy.TILED:
+                polygons = self.__polygonize_tiled(fkb_dataset=fkb_dataset)
+            case _:
+                raise ValueError(f"Unsupported polygonization strategy '{strategy}'")
+
+        polygons_gdf = gpd.GeoDataFrame(geometry=polygons, crs=f"EPSG:{crs.value}")
+        points_gdf = fkb_dataset[fkb_dataset["layer"].isin(["Bygning", "AnnenBygning"])]
+
+        return polygons_gdf, points_gdf
+
+    def __polygonize_global(self, fkb_dataset: gpd.GeoDataFrame) -> list:
         df = pd.DataFrame(fkb_dataset.copy())
         df["geometry"] = fkb_dataset["geometry"].apply(lambda geom: geom.wkb if geom is not None else None)
         df["geometry"] = df["geometry"].astype("object")
@@ -78,12 +114,13 @@ class FKBService(IFKBService):
 
         table = pa.Table.from_pandas(df=df)
         self.__db_context.register("fkb", table)
+        layers = ", ".join(f"'{layer}'" for layer in BUILDING_EDGE_LAYERS)
         polygonized_df = self.__db_context.execute(
-            """
+            f"""
             WITH merged_lines
                      AS (SELECT ST_Union_Agg(ST_Force2D(ST_GeomFromWKB(geometry))) AS geom
                          FROM fkb
-                         WHERE layer IN ('Takkant', 'FiktivBygningsavgrensning', 'Bygningsdelelinje')
+                         WHERE layer IN ({layers})
                            AND geometry IS NOT NULL)
             SELECT ST_AsWKB(ST_Polygonize([geom])) AS geom
             FROM merged_lines;
@@ -91,12 +128,65 @@ class FKBService(IFKBService):
         ).fetchdf()
         geom = from_wkb(bytes(polygonized_df["geom"].iloc[0]))
         parts = list(geom.geoms)
-        polygons = [g for g in parts if g.geom_type in ("Polygon", "MultiPolygon")]
+        return [g for g in parts if g.geom_type in ("Polygon", "MultiPolygon")]
 
-        polygons_gdf = gpd.GeoDataFrame(geometry=polygons, crs=f"EPSG:{crs.value}")
-        points_gdf = fkb_dataset[fkb_dataset["layer"].isin(["Bygning", "AnnenBygning"])]
+    @staticmethod
+    def __polygonize_tiled(fkb_dataset: gpd.GeoDataFrame) -> list:
+        is_edge = fkb_dataset["layer"].isin(BUILDING_EDGE_LAYERS) & fkb_dataset.geometry.notna()
+        lines = shapely.force_2d(fkb_dataset.geometry[is_edge].to_numpy())
+        if len(lines) == 0:
+            return []
 
-        return polygons_gdf, points_gdf
+        started_at = time.perf_counter()
+        tile_boxes = FKBService.__create_tile_grid(bounds=shapely.total_bounds(lines))
+        margin = Config.FKB_POLYGONIZE_TILE_MARGIN_DEGREES
+        tree = shapely.STRtree(lines)
+
+        # A tile only sees the lines within the margin around it, so tiles without any such line are
+        # skipped. A polygon extending further than the margin beyond its owning tile is not built correctly
+        # either way, see IFKBService.create_building_polygons
+        buffered_tiles, line_indices = tree.query(
+            shapely.box(*(shapely.bounds(tile_boxes) + [-margin, -margin, margin, margin]).T),
+            predicate="intersects"
+        )
+        tile_indices = np.unique(buffered_tiles)
+        order = np.argsort(buffered_tiles, kind="stable")
+        boundaries = np.flatnonzero(np.diff(buffered_tiles[order])) + 1
+        line_wkbs = shapely.to_wkb(lines)
+
+        # DuckDB is not fork-safe, so workers are spawned
+        with ProcessPoolExecutor(
+                max_workers=Config.FKB_POLYGONIZE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _polygonize_tile,
+                    line_wkbs[line_indices[tile_order]],
+                    tuple(shapely.bounds(tile_boxes[buffered_tiles[tile_order[0]]]))
+                )
+                for tile_order in np.split(order, boundaries)
+            ]
+            polygon_wkbs = [wkb for future in futures for wkb in future.result()]
+
+        logger.info(
+            f"Polygonized {len(lines)} lines in {len(tile_indices)} tiles into {len(polygon_wkbs)} polygons "
+            f"in {time.perf_counter() - started_at:.1f} seconds"
+        )
+        return list(from_wkb(polygon_wkbs))
+
+    @staticmethod
+    def __create_tile_grid(bounds: np.ndarray) -> np.ndarray:
+        minx, miny, maxx, maxy = bounds
+        tile_size = Config.FKB_POLYGONIZE_TILE_SIZE_DEGREES
+
+        # One extra tile on each axis keeps the maximum coordinates inside the half-open tiles, and
+        # neighbouring tiles share the same edge values so every point is owned by exactly one tile
+        x_edges = minx + np.arange(int((maxx - minx) // tile_size) + 2) * tile_size
+        y_edges = miny + np.arange(int((maxy - miny) // tile_size) + 2) * tile_size
+        tile_minx, tile_miny = (axis.ravel() for axis in np.meshgrid(x_edges[:-1], y_edges[:-1]))
+        tile_maxx, tile_maxy = (axis.ravel() for axis in np.meshgrid(x_edges[1:], y_edges[1:]))
+        return shapely.box(tile_minx, tile_miny, tile_maxx, tile_maxy)
 
     @staticmethod
     def __cast_to_string(df: pd.DataFrame | gpd.GeoDataFrame) -> pd.DataFrame | gpd.GeoDataFrame:
@@ -105,3 +195,18 @@ class FKBService(IFKBService):
                 df[col] = df[col].astype(str)
 
         return df
+
+
+def _polygonize_tile(line_wkbs: np.ndarray, tile_bounds: tuple[float, float, float, float]) -> list[bytes]:
+    noded_lines = shapely.get_parts(shapely.union_all(shapely.from_wkb(line_wkbs)))
+    polygons = shapely.get_parts(shapely.polygonize(noded_lines))
+    if len(polygons) == 0:
+        return []
+
+    # Polygons crossing the tile border are also built by the neighbouring tiles, so each polygon is only
+    # kept by the tile containing its representative point
+    minx, miny, maxx, maxy = tile_bounds
+    points = shapely.point_on_surface(polygons)
+    x, y = shapely.get_x(points), shapely.get_y(points)
+    is_owned = (x >= minx) & (x < maxx) & (y >= miny) & (y < maxy)
+    return shapely.to_wkb(polygons[is_owned]).tolist()
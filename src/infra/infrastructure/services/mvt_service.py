@@ -1,8 +1,114 @@
 ﻿import asyncio
 from sqlalchemy import Engine, text
 
+from src import Config
 from src.application.contracts import IMVTService
 
+MVT_TABLE_NAME: str = "buildings_small"
+WEB_MERCATOR_CIRCUMFERENCE_METERS: float = 40_075_016.686
+
+# Parameter placeholders are filled in per driver: `:z` for SQLAlchemy and `$1` for asyncpg
+MVT_TILE_QUERY: str = """
+    WITH
+        tile_bounds AS (
+            SELECT ST_TileEnvelope({z}, {x}, {y}) AS geom_3857
+        ),
+        mvtgeom AS (
+            SELECT
+                ST_AsMVTGeom(
+                    source.geom_3857,
+                    tile_bounds.geom_3857,
+                    {extent},
+                    {buffer},
+                    true
+                ) AS geometry
+            FROM {table} AS source, tile_bounds
+            WHERE ST_Intersects(source.geom_3857, tile_bounds.geom_3857)
+        )
+    SELECT ST_AsMVT(mvtgeom, 'buildings', {extent}, 'geometry') AS tile
+    FROM mvtgeom
+"""
+
+# Untuned baseline, reprojecting every candidate building on each request
+MVT_TILE_QUERY_UNPREPARED: str = """
+    WITH
+        tile_bounds AS (
+            SELECT ST_TileEnvelope({z}, {x}, {y}) AS geom_3857
+        ),
+        bounds_4326 AS (
+            SELECT ST_Transform(geom_3857, 4326) AS geom
+            FROM tile_bounds
+        ),
+        mvtgeom AS (
+            SELECT
+                ST_AsMVTGeom(
+                    ST_Transform(source.geometry, 3857),
+                    tile_bounds.geom_3857,
+                    {extent},
+                    {buffer},
+                    true
+                ) AS geometry
+            FROM {table} AS source, tile_bounds, bounds_4326
+            WHERE ST_Intersects(source.geometry, bounds_4326.geom)
+        )
+    SELECT ST_AsMVT(mvtgeom, 'buildings', {extent}, 'geometry') AS tile
+    FROM mvtgeom
+"""
+
+
+def get_generalized_table_name(table_name: str, min_zoom: int, max_zoom: int) -> str:
+    """
+    Returns the name of the generalized copy of `table_name` serving zoom levels `min_zoom` to
+    `max_zoom`.
+    :param table_name: Name of the full-resolution table.
+    :param min_zoom: Lowest zoom level of the band.
+    :param max_zoom: Highest zoom level of the band.
+    :return: Table name on the form `<table_name>_mvt_z<min_zoom>_<max_zoom>`.
+    :rtype: str
+    """
+    return f"{table_name}_mvt_z{min_zoom}_{max_zoom}"
+
+
+def get_pixel_size_meters(z: int) -> float:
+    """
+    Returns the width in Web Mercator meters of one pixel of a 256 pixel tile at zoom level `z`.
+    :param z: Zoom level.
+    :return: Pixel width in EPSG:3857 meters.
+    :rtype: float
+    """
+    return WEB_MERCATOR_CIRCUMFERENCE_METERS / (256 * 2 ** z)
+
+
+def create_mvt_tile_query(z: int, z_param: str, x_param: str, y_param: str) -> str:
+    """
+    Creates the MVT tile query for zoom level `z`. With `Config.VMT_USE_TILE_TABLES` the query reads
+    the precomputed `geom_3857` column of the generalized table of the zoom band containing `z`, or
+    of the full table above the highest band. Otherwise it reprojects the EPSG:4326 geometries of the
+    full table on every request.
+    :param z: Zoom level the query is for. Only used to pick the table.
+    :param z_param: Driver-specific placeholder for the zoom level parameter.
+    :param x_param: Driver-specific placeholder for the tile X parameter.
+    :param y_param: Driver-specific placeholder for the tile Y parameter.
+    :return: SQL query returning a single `tile` column.
+    :rtype: str
+    """
+    if not Config.VMT_USE_TILE_TABLES:
+        return MVT_TILE_QUERY_UNPREPARED.format(
+            z=z_param, x=x_param, y=y_param,
+            table=MVT_TABLE_NAME, extent=Config.MVT_TILE_EXTENT, buffer=Config.MVT_TILE_BUFFER
+        )
+
+    table = MVT_TABLE_NAME
+    for min_zoom, max_zoom in Config.MVT_GENERALIZED_ZOOM_BANDS:
+        if min_zoom <= z <= max_zoom:
+            table = get_generalized_table_name(table_name=MVT_TABLE_NAME, min_zoom=min_zoom, max_zoom=max_zoom)
+            break
+
+    return MVT_TILE_QUERY.format(
+        z=z_param, x=x_param, y=y_param,
+        table=table, extent=Config.MVT_TILE_EXTENT, buffer=Config.MVT_TILE_BUFFER
+    )
+
 
 class MVTService(IMVTService):
     __db_context: Engine
@@ -11,32 +117,7 @@ class MVTService(IMVTService):
         self.__db_context = db_context
 
     async def get_mvt_tiles(self, z: int, x: int, y: int) -> bytes | None:
-        query = text(
-            """
-            WITH
-                tile_bounds AS (
-                    SELECT ST_TileEnvelope(:z, :x, :y) AS geom_3857
-                ),
-                bounds_4326 AS (
-                    SELECT ST_Transform(geom_3857, 4326) AS geom
-                    FROM tile_bounds
-                ),
-                mvtgeom AS (
-                    SELECT
-                        ST_AsMVTGeom(
-                            ST_Transform(buildings_small.geometry, 3857),
-                            tile_bounds.geom_3857,
-                            4096,
-                            256,
-                            true
-                        ) AS geometry
-                    FROM buildings_small, tile_bounds, bounds_4326
-                    WHERE ST_Intersects(buildings_small.geometry, bounds_4326.geom)
-                )
-            SELECT ST_AsMVT(mvtgeom, 'buildings', 4096, 'geometry') AS tile
-            FROM mvtgeom
-            """
-        )
+        query = text(create_mvt_tile_query(z=z, z_param=":z", x_param=":x", y_param=":y"))
 
         def _blocking_db_call():
             with self.__db_context.connect() as conn:
@@ -48,3 +129,6 @@ class MVTService(IMVTService):
             return bytes(result[0])
 
         return await asyncio.to_thread(_blocking_db_call)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self.__db_context.dispose)
@@ -1,33 +1,59 @@
-﻿import geopandas as gpd
-import pandas as pd
+﻿import binascii
+import json
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import requests
+from fsspec import AbstractFileSystem
 from osmium.geom import WKBFactory
 from osmium.osm import Area
 
 from src import Config
 from src.application.common import logger
 from src.application.contracts import IOpenStreetMapFileService
-from src.domain.enums import EPSGCode
+from src.domain.enums import StorageContainer
+
+OSM_SCHEMA: pa.Schema = pa.schema(
+    [
+        pa.field("external_id", pa.int64()),
+        *[pa.field(column, pa.string()) for _, column in Config.OSM_TAG_COLUMNS],
+        pa.field("feature_update_time", pa.timestamp("us", tz="UTC")),
+        pa.field("geometry", pa.binary()),
+    ],
+    metadata={
+        b"geo": json.dumps({
+            "version": "1.1.0",
+            "primary_column": "geometry",
+            "columns": {"geometry": {"encoding": "WKB", "geometry_types": ["MultiPolygon"]}},
+        }).encode("utf-8")
+    },
+)
 
 
 class OpenStreetMapFileService(IOpenStreetMapFileService):
+    __filesystem: AbstractFileSystem
     __geom_factory: WKBFactory
-    __buildings: list[dict]
-    __batches: list[gpd.GeoDataFrame]  # TODO: Rename this to `building_batches`
-
-    def __init__(self):
+    __columns: dict[str, list]
+    __encoder_pool: ThreadPoolExecutor | None
+    __writer_pool: ThreadPoolExecutor | None
+    __pending_writes: deque[Future]
+    __writer: pq.ParquetWriter | None
+    __batch_count: int
+
+    def __init__(self, filesystem: AbstractFileSystem):
         super().__init__()
+        self.__filesystem = filesystem
         self.__geom_factory = WKBFactory()
-        self.__buildings = []
-        self.__batches = []
-
-    @property
-    def batches(self) -> list[gpd.GeoDataFrame]:
-        return self.__batches
-
-    @batches.setter
-    def batches(self, batches: list[gpd.GeoDataFrame]) -> None:
-        self.__batches = batches
+        self.__columns = OpenStreetMapFileService.__create_empty_columns()
+        self.__encoder_pool = None
+        self.__writer_pool = None
+        self.__pending_writes = deque()
+        self.__writer = None
+        self.__batch_count = 0
 
     @staticmethod
     def download_pbf() -> None:
@@ -36,6 +62,7 @@ class OpenStreetMapFileService(IOpenStreetMapFileService):
             return
 
         logger.info(f"Downloading OSM-data from '{Config.OSM_PBF_URL}'")
+        Config.OSM_FILE_PATH.parent.mkdir(parents=True, exist_ok=True)
         response = requests.get(Config.OSM_PBF_URL, stream=True)
         response.raise_for_status()
 
@@ -46,68 +73,104 @@ class OpenStreetMapFileService(IOpenStreetMapFileService):
 
         logger.info("Download completed")
 
-    def area(self, area: Area) -> None:
+    def create_contribution_dataset(self) -> str:
+        self.download_pbf()
+
+        Config.OSM_GEOPARQUET_FILE.parent.mkdir(parents=True, exist_ok=True)
+        self.__writer = pq.ParquetWriter(Config.OSM_GEOPARQUET_FILE, OSM_SCHEMA, compression="snappy")
+        self.__encoder_pool = ThreadPoolExecutor(max_workers=Config.OSM_ENCODER_WORKERS)
+        self.__writer_pool = ThreadPoolExecutor(max_workers=1)
+
         try:
-            if "building" in area.tags:
-                logger.debug(f"Processing building {area.id}")
-                feature = self.__create_feature(area)
-                self.__buildings.append(feature)
+            # Area assembly runs in libosmium, and only the assembled areas are handed to Python
+            self.apply_file(str(Config.OSM_FILE_PATH), locations=True)
+            self.post_apply_file_cleanup()
+        finally:
+            self.__encoder_pool.shutdown(wait=True, cancel_futures=True)
+            self.__writer_pool.shutdown(wait=True, cancel_futures=True)
+            if self.__writer is not None:
+                self.__writer.close()
+                self.__writer = None
+
+        blob_path = f"{StorageContainer.CONTRIBUTION.value}/{Config.OSM_CONTRIBUTION_BLOB}"
+        logger.info(f"Uploading {self.__batch_count} OSM batches from '{Config.OSM_GEOPARQUET_FILE}' to '{blob_path}'")
+        self.__filesystem.put_file(str(Config.OSM_GEOPARQUET_FILE), blob_path)
+        return blob_path
 
-                if len(self.__buildings) >= Config.BUILDINGS_BATCH_SIZE:
-                    self.create_gdf_from_batch(self.__buildings)
-                    self.__buildings = []
-                    logger.info(f"Created batch #{len(self.batches)}")
+    def area(self, area: Area) -> None:
+        if "building" not in area.tags:
+            return
 
-                logger.debug(f"Building {area.id} was successfully processed")
+        logger.debug(f"Processing building {area.id}")
+        try:
+            wkb_hex = self.__geom_factory.create_multipolygon(area)
         except Exception as e:
             logger.warning(f"Skipping area {area.id} due to geometry error: {e}")
+            return
 
-    def __create_feature(self, area: Area) -> dict:
-        wkb_bytes = self.__geom_factory.create_multipolygon(area)
+        self.__columns["external_id"].append(area.id)
+        for tag, column in Config.OSM_TAG_COLUMNS:
+            self.__columns[column].append(area.tags.get(tag))
+        self.__columns["feature_update_time"].append(area.timestamp)
+        self.__columns["geometry"].append(wkb_hex)
 
-        props: dict[str, str | int | float] = dict(area.tags)
-        props["id"] = area.id
+        # Encoder and writer failures surface here and abort the conversion instead of dropping a batch
+        if len(self.__columns["external_id"]) >= Config.BUILDINGS_BATCH_SIZE:
+            self.__submit_batch()
 
-        return {
-            "geometry": wkb_bytes,
-            **props
-        }
+        logger.debug(f"Building {area.id} was successfully processed")
 
     def post_apply_file_cleanup(self):
-        if self.__buildings:
-            self.create_gdf_from_batch(self.__buildings)
-            self.__buildings = []
-            logger.info(f"Created batch #{len(self.batches)} in cleanup step")
-
-    def pop_batch_by_index(self, index: int) -> None:
-        self.batches.pop(index)
+        if self.__columns["external_id"]:
+            self.__submit_batch()
+            logger.info(f"Submitted batch #{self.__batch_count} in cleanup step")
 
-    def create_gdf_from_batch(self, batch: list[dict], epsg_code: EPSGCode = EPSGCode.WGS84) -> None:
-        dataframe = pd.DataFrame(batch)
+        while self.__pending_writes:
+            self.__pending_writes.popleft().result()
 
-        existing_columns = dataframe.columns.intersection(Config.OSM_COLUMNS_TO_KEEP)
-        dataframe = dataframe[list(existing_columns)]
+    def __submit_batch(self) -> None:
+        columns, self.__columns = self.__columns, OpenStreetMapFileService.__create_empty_columns()
+        encoded_batch = self.__encoder_pool.submit(OpenStreetMapFileService.__encode_batch, columns)
 
-        if "building" in dataframe.columns:
-            dataframe["building"] = dataframe["building"].where(
-                ~dataframe["building"].astype(str).str.lower().eq("yes"),
-                "unspecified"
-            )
+        # A single writer keeps the row groups in PBF order while several batches are encoded at once
+        self.__pending_writes.append(
+            self.__writer_pool.submit(lambda: self.__writer.write_table(encoded_batch.result()))
+        )
+        self.__batch_count += 1
+        logger.info(f"Submitted batch #{self.__batch_count}")
 
-        dataframe = dataframe.rename(columns={"building": "type"})
+        while len(self.__pending_writes) > Config.OSM_MAX_PENDING_BATCHES:
+            self.__pending_writes.popleft().result()
 
-        if "geometry" in dataframe.columns:
-            dataframe = dataframe.rename(columns={"geometry": "geom_wkb"})
+    @staticmethod
+    def __encode_batch(columns: dict[str, list]) -> pa.Table:
+        wkb_hex = columns.pop("geometry")
+        wkb_lengths = np.fromiter((len(value) // 2 for value in wkb_hex), dtype=np.int32, count=len(wkb_hex))
+        wkb_offsets = np.zeros(len(wkb_hex) + 1, dtype=np.int32)
+        np.cumsum(wkb_lengths, out=wkb_offsets[1:])
+
+        # One hex decode for the whole batch instead of one bytes.fromhex per building
+        geometry = pa.Array.from_buffers(
+            pa.binary(),
+            len(wkb_hex),
+            [None, pa.py_buffer(wkb_offsets), pa.py_buffer(binascii.unhexlify("".join(wkb_hex)))]
+        )
 
-            dataframe["geom_wkb"] = dataframe["geom_wkb"].apply(
-                lambda x: bytes.fromhex(x) if isinstance(x, str) and x[:4] == "0106" else x
-            )
+        arrays = {
+            field.name: pa.array(columns[field.name], type=field.type)
+            for field in OSM_SCHEMA
+            if field.name != "geometry"
+        }
 
-        geometries = gpd.GeoSeries.from_wkb(dataframe["geom_wkb"])
-        gdf = gpd.GeoDataFrame(
-            dataframe.drop(columns=["geom_wkb"]),
-            geometry=geometries,
-            crs=f"EPSG:{epsg_code.value}"
+        building_type = arrays["building_type"]
+        arrays["building_type"] = pc.if_else(
+            pc.equal(pc.utf8_lower(building_type), "yes"),
+            "unspecified",
+            building_type
         )
 
-        self.batches.append(gdf)
+        return pa.Table.from_arrays([*arrays.values(), geometry], schema=OSM_SCHEMA)
+
+    @staticmethod
+    def __create_empty_columns() -> dict[str, list]:
+        return {field.name: [] for field in OSM_SCHEMA}
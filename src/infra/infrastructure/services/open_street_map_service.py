@@ -1,29 +1,31 @@
-﻿import geopandas as gpd
+﻿from typing import Iterator
 
+import geopandas as gpd
+from fsspec import AbstractFileSystem
+
+from src import Config
 from src.application.contracts import (
-    IOpenStreetMapService, IBlobStorageService, IBytesService
+    IOpenStreetMapService, IBytesService
 )
 from src.domain.enums import StorageContainer, EPSGCode
 
 
 class OpenStreetMapService(IOpenStreetMapService):
-    __blob_storage_service: IBlobStorageService
+    __filesystem: AbstractFileSystem
     __bytes_service: IBytesService
 
     def __init__(
             self,
-            blob_storage_service: IBlobStorageService,
+            filesystem: AbstractFileSystem,
             bytes_service: IBytesService
     ):
-        self.__blob_storage_service = blob_storage_service
+        self.__filesystem = filesystem
         self.__bytes_service = bytes_service
 
-    def create_building_batches(self) -> list[gpd.GeoDataFrame]:
-        osm_bytes = self.__blob_storage_service.download_file(
-            container_name=StorageContainer.CONTRIBUTION,
-            blob_name="osm.parquet"
-        )
-
-        df = self.__bytes_service.convert_parquet_bytes_to_gdf(osm_bytes, EPSGCode.WGS84)
-        gdf = gpd.GeoDataFrame(df, geometry="geometry", crs=EPSGCode.WGS84.value)
-        return [gdf]
+    def create_building_batches(self) -> Iterator[gpd.GeoDataFrame]:
+        with self.__filesystem.open(f"{StorageContainer.CONTRIBUTION.value}/{Config.OSM_CONTRIBUTION_BLOB}", "rb") as file:
+            yield from self.__bytes_service.convert_parquet_file_to_gdf_batches(
+                file=file,
+                epsg_code=EPSGCode.WGS84,
+                batch_rows=Config.BUILDINGS_BATCH_SIZE
+            )
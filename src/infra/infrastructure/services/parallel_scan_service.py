@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pyarrow as pa
+from duckdb import DuckDBPyConnection
+
+from src.application.common import logger
+from src.application.contracts import IParallelScanService, IBlobStorageService, IFilePathService
+from src.domain.enums import DatasetSize, StorageContainer, Theme
+
+
+class ParallelScanService(IParallelScanService):
+    __db_context: DuckDBPyConnection
+    __blob_storage_service: IBlobStorageService
+    __file_path_service: IFilePathService
+
+    def __init__(
+            self,
+            db_context: DuckDBPyConnection,
+            blob_storage_service: IBlobStorageService,
+            file_path_service: IFilePathService
+    ) -> None:
+        self.__db_context = db_context
+        self.__blob_storage_service = blob_storage_service
+        self.__file_path_service = file_path_service
+
+    def get_release_manifest(self, release: str, theme: Theme, dataset_size: DatasetSize) -> list[str]:
+        path = self.__file_path_service.create_dataset_blob_path(
+            release=release,
+            theme=theme,
+            region="*",
+            file_name="*.parquet",
+            dataset_size=dataset_size,
+        )
+
+        blob_names = self.__blob_storage_service.list_parquet_blob_names(
+            container=StorageContainer.DATA,
+            path=path
+        )
+
+        logger.info(f"Release manifest for '{release}' ({dataset_size.value}) contains {len(blob_names)} files")
+        return [f"az://{StorageContainer.DATA.value}/{blob_name}" for blob_name in blob_names]
+
+    def scan_to_arrow(
+            self,
+            files: list[str],
+            partial_sql: str,
+            parameters: list[Any] | None = None,
+            max_workers: int = 8,
+            files_per_task: int = 1
+    ) -> pa.Table:
+        if not files:
+            raise ValueError("Cannot scan an empty list of files")
+
+        if "{source}" not in partial_sql:
+            raise ValueError("Partial query must read from the '{source}' placeholder")
+
+        file_groups = [files[i:i + files_per_task] for i in range(0, len(files), files_per_task)]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            partials = list(pool.map(
+                lambda file_group: self.__scan_file_group(
+                    file_group=file_group,
+                    partial_sql=partial_sql,
+                    parameters=parameters
+                ),
+                file_groups
+            ))
+
+        return pa.concat_tables(partials)
+
+    def scan_and_merge(
+            self,
+            files: list[str],
+            partial_sql: str,
+            merge_sql: str,
+            parameters: list[Any] | None = None,
+            max_workers: int = 8,
+            files_per_task: int = 1
+    ) -> list[tuple]:
+        partials = self.scan_to_arrow(
+            files=files,
+            partial_sql=partial_sql,
+            parameters=parameters,
+            max_workers=max_workers,
+            files_per_task=files_per_task
+        )
+
+        cursor = self.__db_context.cursor()
+        try:
+            cursor.register("partials", partials)
+            return cursor.execute(merge_sql).fetchall()
+        finally:
+            cursor.close()
+
+    def __scan_file_group(
+            self,
+            file_group: list[str],
+            partial_sql: str,
+            parameters: list[Any] | None
+    ) -> pa.Table:
+        file_list = ", ".join(f"'{file}'" for file in file_group)
+        source = f"read_parquet([{file_list}], hive_partitioning = true)"
+
+        cursor = self.__db_context.cursor()
+        try:
+            return cursor.execute(partial_sql.replace("{source}", source), parameters or []).fetch_arrow_table()
+        finally:
+            cursor.close()
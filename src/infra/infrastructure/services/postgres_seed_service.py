@@ -0,0 +1,251 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pyarrow.csv as pa_csv
+from duckdb import DuckDBPyConnection
+from sqlalchemy import Engine, text
+
+from src import Config
+from src.application.common import logger
+from src.application.contracts import IPostgresSeedService, IFilePathService
+from src.application.dtos import PostgresSeedReport
+from src.domain.enums import DatasetSize, StorageContainer, Theme, EPSGCode
+from src.infra.infrastructure.services.mvt_service import get_generalized_table_name, get_pixel_size_meters
+
+POSTGRES_TYPES_BY_DUCKDB_TYPE: dict[str, str] = {
+    "VARCHAR": "text",
+    "BOOLEAN": "boolean",
+    "TINYINT": "smallint",
+    "SMALLINT": "smallint",
+    "INTEGER": "integer",
+    "BIGINT": "bigint",
+    "HUGEINT": "numeric",
+    "UTINYINT": "smallint",
+    "USMALLINT": "integer",
+    "UINTEGER": "bigint",
+    "UBIGINT": "numeric",
+    "FLOAT": "real",
+    "DOUBLE": "double precision",
+    "DATE": "date",
+    "TIMESTAMP": "timestamp",
+    "TIMESTAMP WITH TIME ZONE": "timestamptz",
+}
+
+
+class PostgresSeedService(IPostgresSeedService):
+    __db_context: DuckDBPyConnection
+    __postgres_context: Engine
+    __file_path_service: IFilePathService
+
+    def __init__(
+            self,
+            db_context: DuckDBPyConnection,
+            postgres_context: Engine,
+            file_path_service: IFilePathService
+    ) -> None:
+        self.__db_context = db_context
+        self.__postgres_context = postgres_context
+        self.__file_path_service = file_path_service
+
+    def seed_buildings(self, release: str, dataset_size: DatasetSize, loader_count: int) -> PostgresSeedReport | None:
+        table_name = f"buildings_{dataset_size.value}"
+        staging_table_name = f"{table_name}_staging"
+        new_table_name = f"{table_name}_new"
+
+        path = self.__file_path_service.create_release_virtual_filesystem_path(
+            storage_scheme="az",
+            release=release,
+            container=StorageContainer.DATA,
+            theme=Theme.BUILDINGS,
+            dataset_size=dataset_size,
+            region="*",
+            file_name="*.parquet",
+        )
+
+        files = [row[0] for row in self.__db_context.execute(f"SELECT file FROM glob('{path}')").fetchall()]
+        if not files:
+            logger.warning(f"No buildings found at blob storage path '{path}'. Skipping table '{table_name}'.")
+            return None
+
+        columns = self.__get_attribute_columns(path=path)
+        column_names = [name for name, _ in columns]
+        phase_seconds: dict[str, float] = {}
+
+        self.__execute_autocommit(f"DROP TABLE IF EXISTS {staging_table_name}")
+        self.__execute_autocommit(
+            f"CREATE UNLOGGED TABLE {staging_table_name} ("
+            + ", ".join(f'"{name}" {postgres_type}' for name, postgres_type in columns)
+            + ", geometry geometry)"
+        )
+
+        logger.info(
+            f"Copying {len(files)} files into '{staging_table_name}' with {loader_count} parallel loaders..."
+        )
+        started_at = time.perf_counter()
+        file_groups = [files[i::loader_count] for i in range(loader_count) if files[i::loader_count]]
+        with ThreadPoolExecutor(max_workers=len(file_groups)) as pool:
+            copied_rows = sum(pool.map(
+                lambda file_group: self.__copy_files(
+                    files=file_group,
+                    column_names=column_names,
+                    staging_table_name=staging_table_name
+                ),
+                file_groups
+            ))
+        phase_seconds["copy"] = time.perf_counter() - started_at
+        logger.info(f"Copied {copied_rows} rows into '{staging_table_name}' in {phase_seconds['copy']:.1f} seconds")
+
+        quoted_columns = ", ".join(f'"{name}"' for name in column_names)
+        phase_seconds["insert_select"] = self.__timed_autocommit(
+            f"DROP TABLE IF EXISTS {new_table_name}",
+            f"CREATE TABLE {new_table_name} ("
+            + ", ".join(f'"{name}" {postgres_type}' for name, postgres_type in columns)
+            + f", geometry geometry(Geometry, {EPSGCode.WGS84.value}))",
+            f"INSERT INTO {new_table_name} ({quoted_columns}, geometry) "
+            f"SELECT {quoted_columns}, ST_SetSRID(geometry, {EPSGCode.WGS84.value}) FROM {staging_table_name}",
+        )
+
+        started_at = time.perf_counter()
+        with self.__postgres_context.begin() as conn:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS {table_name}")
+            conn.exec_driver_sql(f"ALTER TABLE {new_table_name} RENAME TO {table_name}")
+        phase_seconds["swap"] = time.perf_counter() - started_at
+        self.__execute_autocommit(f"DROP TABLE IF EXISTS {staging_table_name}")
+
+        index_name = f"{table_name}_geometry_idx"
+        phase_seconds["gist_index"] = self.__timed_autocommit(
+            f"CREATE INDEX {index_name} ON {table_name} USING GIST (geometry)"
+        )
+        phase_seconds["cluster"] = self.__timed_autocommit(f"CLUSTER {table_name} USING {index_name}")
+        phase_seconds["vacuum_analyze"] = self.__timed_autocommit(f"VACUUM ANALYZE {table_name}")
+        phase_seconds["total"] = sum(phase_seconds.values())
+
+        report = PostgresSeedReport(
+            table_name=table_name,
+            rows=copied_rows,
+            loader_count=len(file_groups),
+            phase_seconds=phase_seconds,
+        )
+        logger.info(f"Seeded '{table_name}': {report.to_json()}")
+        return report
+
+    def prepare_tile_tables(self, dataset_size: DatasetSize) -> dict[str, float]:
+        table_name = f"buildings_{dataset_size.value}"
+        web_mercator = EPSGCode.WEB_MERCATOR.value
+        phase_seconds: dict[str, float] = {}
+
+        logger.info(f"Adding EPSG:{web_mercator} geometry column to '{table_name}'...")
+        phase_seconds["geom_3857"] = self.__timed_autocommit(
+            f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS geom_3857 geometry(Geometry, {web_mercator})",
+            f"UPDATE {table_name} SET geom_3857 = ST_Transform(geometry, {web_mercator})",
+        )
+        phase_seconds["geom_3857_index"] = self.__timed_autocommit(
+            f"DROP INDEX IF EXISTS {table_name}_geom_3857_idx",
+            f"CREATE INDEX {table_name}_geom_3857_idx ON {table_name} USING GIST (geom_3857)",
+            f"VACUUM ANALYZE {table_name}",
+        )
+
+        for min_zoom, max_zoom in Config.MVT_GENERALIZED_ZOOM_BANDS:
+            generalized_table_name = get_generalized_table_name(
+                table_name=table_name,
+                min_zoom=min_zoom,
+                max_zoom=max_zoom
+            )
+            min_size = get_pixel_size_meters(z=max_zoom) * Config.TILE_BUILDER_MIN_FEATURE_PIXELS
+
+            logger.info(f"Creating '{generalized_table_name}' with minimum feature size {min_size:.2f} m...")
+            phase_seconds[generalized_table_name] = self.__timed_autocommit(
+                f"DROP TABLE IF EXISTS {generalized_table_name}",
+                f"""
+                CREATE TABLE {generalized_table_name} AS
+                SELECT geom_3857
+                FROM {table_name}
+                WHERE GREATEST(ST_XMax(geom_3857) - ST_XMin(geom_3857), ST_YMax(geom_3857) - ST_YMin(geom_3857))
+                    >= {min_size}
+                """,
+                f"CREATE INDEX {generalized_table_name}_geom_3857_idx "
+                f"ON {generalized_table_name} USING GIST (geom_3857)",
+                f"CLUSTER {generalized_table_name} USING {generalized_table_name}_geom_3857_idx",
+                f"VACUUM ANALYZE {generalized_table_name}",
+            )
+
+        phase_seconds["total"] = sum(phase_seconds.values())
+        logger.info(f"Prepared tile tables for '{table_name}': {phase_seconds}")
+        return phase_seconds
+
+    def get_tile_tables_bytes(self, dataset_size: DatasetSize) -> int:
+        table_name = f"buildings_{dataset_size.value}"
+        table_names = [table_name] + [
+            get_generalized_table_name(table_name=table_name, min_zoom=min_zoom, max_zoom=max_zoom)
+            for min_zoom, max_zoom in Config.MVT_GENERALIZED_ZOOM_BANDS
+        ]
+
+        with self.__postgres_context.connect() as conn:
+            total_bytes = conn.execute(
+                text(
+                    "SELECT COALESCE(SUM(pg_total_relation_size(to_regclass(name))), 0) "
+                    "FROM unnest(CAST(:table_names AS text[])) AS name"
+                ),
+                {"table_names": table_names}
+            ).scalar_one()
+
+        return int(total_bytes)
+
+    def __get_attribute_columns(self, path: str) -> list[tuple[str, str]]:
+        described_columns = self.__db_context.execute(
+            f"DESCRIBE SELECT * EXCLUDE (geometry, bbox) FROM read_parquet('{path}', union_by_name = true)"
+        ).fetchall()
+
+        return [
+            (column_name, POSTGRES_TYPES_BY_DUCKDB_TYPE.get(column_type, "text"))
+            for column_name, column_type, *_ in described_columns
+        ]
+
+    def __copy_files(self, files: list[str], column_names: list[str], staging_table_name: str) -> int:
+        file_list = ", ".join(f"'{file}'" for file in files)
+        selected_columns = ", ".join(f'"{name}"' for name in column_names)
+        copy_sql = (
+            f"COPY {staging_table_name} ({selected_columns}, geometry) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '')"
+        )
+
+        cursor = self.__db_context.cursor()
+        connection = self.__postgres_context.raw_connection()
+        copied_rows = 0
+        try:
+            reader = cursor.execute(f"""
+                SELECT {selected_columns}, ST_AsHEXWKB(geometry) AS geometry
+                FROM read_parquet([{file_list}], union_by_name = true)
+            """).fetch_record_batch(Config.POSTGRES_SEED_BATCH_ROWS)
+
+            with connection.cursor() as postgres_cursor:
+                for batch in reader:
+                    buffer = BytesIO()
+                    pa_csv.write_csv(
+                        batch,
+                        buffer,
+                        write_options=pa_csv.WriteOptions(include_header=False, quoting_style="needed"),
+                    )
+                    buffer.seek(0)
+                    postgres_cursor.copy_expert(copy_sql, buffer)
+                    copied_rows += batch.num_rows
+
+            connection.commit()
+        finally:
+            connection.close()
+            cursor.close()
+
+        return copied_rows
+
+    def __timed_autocommit(self, *statements: str) -> float:
+        started_at = time.perf_counter()
+        self.__execute_autocommit(*statements)
+        return time.perf_counter() - started_at
+
+    def __execute_autocommit(self, *statements: str) -> None:
+        # CLUSTER and VACUUM cannot run inside a transaction block
+        with self.__postgres_context.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for statement in statements:
+                logger.debug(f"Executing '{statement}'")
+                conn.exec_driver_sql(statement)
@@ -0,0 +1,62 @@
+import hashlib
+
+import pyarrow.dataset as ds
+from duckdb import DuckDBPyConnection
+from fsspec import AbstractFileSystem
+
+from src.application.contracts import IRemoteIOService
+from src.domain.enums import RemoteIOBackend
+
+
+class RemoteIOService(IRemoteIOService):
+    __db_context: DuckDBPyConnection
+    __backend: RemoteIOBackend
+    __filesystem: AbstractFileSystem | None
+
+    def __init__(
+            self,
+            db_context: DuckDBPyConnection,
+            backend: RemoteIOBackend,
+            filesystem: AbstractFileSystem | None
+    ) -> None:
+        self.__db_context = db_context
+        self.__backend = backend
+        self.__filesystem = filesystem
+
+    def create_parquet_source(self, path: str) -> str:
+        if not path.startswith("az://"):
+            raise ValueError(f"Path '{path}' is invalid. Path must use the 'az://' scheme.")
+
+        match self.__backend:
+            case RemoteIOBackend.AZURE_EXTENSION:
+                return f"read_parquet('{path}')"
+            case RemoteIOBackend.FSSPEC_ADLFS:
+                abfs_path = f"{RemoteIOBackend.FSSPEC_ADLFS.value}://{path.removeprefix('az://')}"
+                return f"read_parquet('{abfs_path}', hive_partitioning = true)"
+            case RemoteIOBackend.ARROW_DATASET:
+                return self.__create_arrow_source(path=path)
+            case _:
+                raise ValueError(f"Unsupported remote I/O backend '{self.__backend.value}'")
+
+    def __create_arrow_source(self, path: str) -> str:
+        if self.__filesystem is None:
+            raise ValueError("The Arrow remote I/O backend requires a filesystem")
+
+        blob_path = path.removeprefix("az://")
+        files = sorted(self.__filesystem.glob(blob_path))
+        if not files:
+            raise ValueError(f"No files found at '{path}'")
+
+        # Hive segments start after the last plain directory, e.g. 'data/release/2026-04-02.0'
+        partition_base_dir = blob_path.split("=")[0].rsplit("/", 1)[0]
+        dataset = ds.dataset(
+            files,
+            filesystem=self.__filesystem,
+            format="parquet",
+            partitioning="hive",
+            partition_base_dir=partition_base_dir,
+        )
+
+        view_name = f"arrow_source_{hashlib.md5(path.encode()).hexdigest()[:12]}"
+        self.__db_context.register(view_name, dataset)
+        return f"(SELECT * REPLACE (ST_GeomFromWKB(geometry) AS geometry) FROM {view_name})"
@@ -0,0 +1,236 @@
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import shapely
+from duckdb import DuckDBPyConnection
+from shapely.geometry.base import BaseGeometry
+
+from src import Config
+from src.application.common import logger
+from src.application.contracts import ISpatialJoinService, IFilePathService
+from src.domain.enums import DatasetSize, StorageContainer, Theme
+
+COUNTY_PIECES_TABLE: str = "spatial_join_county_pieces"
+MAX_SUBDIVIDE_DEPTH: int = 32
+
+
+class SpatialJoinService(ISpatialJoinService):
+    __db_context: DuckDBPyConnection
+    __file_path_service: IFilePathService
+    __county_bounds: dict[str, tuple[float, float, float, float]]
+
+    def __init__(self, db_context: DuckDBPyConnection, file_path_service: IFilePathService) -> None:
+        self.__db_context = db_context
+        self.__file_path_service = file_path_service
+        self.__county_bounds = {}
+
+    def prepare_county_pieces(self, max_vertices: int) -> int:
+        counties = self.__db_context.execute(f"""
+            SELECT region, wkb
+            FROM read_parquet('{self.__get_counties_path()}')
+        """).fetchall()
+
+        county_ids: list[str] = []
+        piece_wkbs: list[bytes] = []
+        self.__county_bounds = {}
+
+        for region, wkb in counties:
+            county_polygon = shapely.from_wkb(bytes(wkb))
+            self.__county_bounds[region] = county_polygon.bounds
+
+            pieces = self.__subdivide(geometry=county_polygon, max_vertices=max_vertices)
+            county_ids.extend([region] * len(pieces))
+            piece_wkbs.extend(shapely.to_wkb(pieces))
+
+        pieces_dataframe = pd.DataFrame({"county_name": county_ids, "wkb": piece_wkbs})
+        self.__db_context.register("spatial_join_county_pieces_input", pieces_dataframe)
+        try:
+            self.__db_context.execute(f"""
+                CREATE OR REPLACE TABLE {COUNTY_PIECES_TABLE} AS
+                SELECT county_name, ST_GeomFromWKB(wkb) AS geometry
+                FROM spatial_join_county_pieces_input
+            """)
+        finally:
+            self.__db_context.unregister("spatial_join_county_pieces_input")
+
+        logger.info(
+            f"Subdivided {len(counties)} counties into {len(piece_wkbs)} pieces with at most {max_vertices} vertices"
+        )
+        return len(piece_wkbs)
+
+    def count_buildings_per_county(
+            self,
+            release: str,
+            dataset_size: DatasetSize,
+            max_workers: int
+    ) -> list[tuple[str, int]]:
+        if not self.__county_bounds:
+            raise ValueError("County pieces are not prepared. Call 'prepare_county_pieces' first.")
+
+        file_bounds = self.__get_file_bounds(release=release, dataset_size=dataset_size)
+
+        candidate_files_by_county = {
+            county_id: self.__get_candidate_files(
+                county_id=county_id,
+                county_bounds=county_bounds,
+                file_bounds=file_bounds
+            )
+            for county_id, county_bounds in self.__county_bounds.items()
+        }
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            rows = list(pool.map(
+                lambda county: self.__count_buildings_in_county(
+                    county_id=county[0],
+                    county_bounds=self.__county_bounds[county[0]],
+                    candidate_files=county[1]
+                ),
+                candidate_files_by_county.items()
+            ))
+
+        return sorted(
+            [row for row in rows if row[1] > 0],
+            key=lambda row: row[1],
+            reverse=True
+        )
+
+    def count_buildings_per_county_naive(self, release: str, dataset_size: DatasetSize) -> list[tuple[str, int]]:
+        buildings_path = self.__get_buildings_path(release=release, dataset_size=dataset_size, region="*")
+
+        return self.__db_context.execute(f"""
+            WITH counties AS (
+                SELECT
+                    region AS county_name,
+                    ST_GeomFromWKB(wkb) AS geometry
+                FROM read_parquet('{self.__get_counties_path()}')
+            )
+            SELECT
+                c.county_name,
+                COUNT(*) AS building_count
+            FROM counties c
+            JOIN read_parquet('{buildings_path}') b
+              ON ST_Intersects(c.geometry, b.geometry)
+            GROUP BY c.county_name
+            ORDER BY building_count DESC
+        """).fetchall()
+
+    def __count_buildings_in_county(
+            self,
+            county_id: str,
+            county_bounds: tuple[float, float, float, float],
+            candidate_files: list[str]
+    ) -> tuple[str, int]:
+        if not candidate_files:
+            return county_id, 0
+
+        minx, miny, maxx, maxy = county_bounds
+        file_list = ", ".join(f"'{file}'" for file in candidate_files)
+
+        # A building intersecting several pieces of the same county must only be counted once
+        cursor = self.__db_context.cursor()
+        try:
+            building_count = cursor.execute(f"""
+                WITH buildings AS (
+                    SELECT filename, file_row_number, geometry
+                    FROM read_parquet([{file_list}], filename = true, file_row_number = true)
+                    WHERE bbox.xmin <= ? AND bbox.xmax >= ? AND bbox.ymin <= ? AND bbox.ymax >= ?
+                )
+                SELECT COUNT(DISTINCT (b.filename, b.file_row_number))
+                FROM {COUNTY_PIECES_TABLE} p
+                JOIN buildings b
+                  ON ST_Intersects(p.geometry, b.geometry)
+                WHERE p.county_name = ?
+            """, [maxx, minx, maxy, miny, county_id]).fetchone()[0]
+        finally:
+            cursor.close()
+
+        logger.debug(f"County '{county_id}': {building_count} buildings from {len(candidate_files)} files")
+        return county_id, int(building_count)
+
+    def __get_file_bounds(
+            self,
+            release: str,
+            dataset_size: DatasetSize
+    ) -> dict[str, tuple[float, float, float, float] | None]:
+        buildings_path = self.__get_buildings_path(release=release, dataset_size=dataset_size, region="*")
+
+        rows = self.__db_context.execute(f"""
+            SELECT file_name, decode(value)
+            FROM parquet_kv_metadata('{buildings_path}')
+            WHERE decode(key) = 'geo'
+        """).fetchall()
+
+        file_bounds: dict[str, tuple[float, float, float, float] | None] = {}
+        for file_name, geo_metadata in rows:
+            bbox = json.loads(geo_metadata).get("columns", {}).get("geometry", {}).get("bbox")
+            file_bounds[file_name] = tuple(bbox) if bbox and len(bbox) == 4 else None
+
+        return file_bounds
+
+    @staticmethod
+    def __get_candidate_files(
+            county_id: str,
+            county_bounds: tuple[float, float, float, float],
+            file_bounds: dict[str, tuple[float, float, float, float] | None]
+    ) -> list[str]:
+        minx, miny, maxx, maxy = county_bounds
+        candidate_files: list[str] = []
+
+        for file_name, bounds in file_bounds.items():
+            region_match = re.search(r"region=([^/]+)/", file_name)
+            if region_match is not None and region_match.group(1) == county_id:
+                candidate_files.append(file_name)
+                continue
+
+            # Files without bbox metadata cannot be pruned
+            if bounds is None:
+                candidate_files.append(file_name)
+                continue
+
+            file_minx, file_miny, file_maxx, file_maxy = bounds
+            if file_minx <= maxx and file_maxx >= minx and file_miny <= maxy and file_maxy >= miny:
+                candidate_files.append(file_name)
+
+        return candidate_files
+
+    @staticmethod
+    def __subdivide(geometry: BaseGeometry, max_vertices: int, depth: int = 0) -> list[BaseGeometry]:
+        if geometry.is_empty:
+            return []
+
+        if shapely.get_num_coordinates(geometry) <= max_vertices or depth >= MAX_SUBDIVIDE_DEPTH:
+            return [geometry]
+
+        minx, miny, maxx, maxy = geometry.bounds
+        if (maxx - minx) >= (maxy - miny):
+            split_x = (minx + maxx) / 2
+            halves = [shapely.box(minx, miny, split_x, maxy), shapely.box(split_x, miny, maxx, maxy)]
+        else:
+            split_y = (miny + maxy) / 2
+            halves = [shapely.box(minx, miny, maxx, split_y), shapely.box(minx, split_y, maxx, maxy)]
+
+        pieces: list[BaseGeometry] = []
+        for half in halves:
+            clipped = shapely.intersection(geometry, half)
+            for part in shapely.get_parts(clipped):
+                if part.geom_type in ("Polygon", "MultiPolygon"):
+                    pieces.extend(SpatialJoinService.__subdivide(part, max_vertices=max_vertices, depth=depth + 1))
+
+        return pieces
+
+    def __get_buildings_path(self, release: str, dataset_size: DatasetSize, region: str) -> str:
+        return self.__file_path_service.create_release_virtual_filesystem_path(
+            storage_scheme="az",
+            release=release,
+            container=StorageContainer.DATA,
+            theme=Theme.BUILDINGS,
+            dataset_size=dataset_size,
+            region=region,
+            file_name="*.parquet",
+        )
+
+    @staticmethod
+    def __get_counties_path() -> str:
+        return f"az://{StorageContainer.METADATA.value}/{Config.DATABRICKS_MUNICIPALITIES_FILE}"
@@ -1,6 +1,14 @@
-﻿from typing import Any
+﻿import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Iterator
 
 import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import shapely
 from pystac import Catalog, Collection, Item
 
 from src import Config
@@ -23,6 +31,7 @@ class TestDatasetService(ITestDatasetService):
     __county_service: ICountyService
     __fkb_service: IFKBService
     __osm_service: IOpenStreetMapService
+    __osm_file_service: IOpenStreetMapFileService
 
     def __init__(
             self,
@@ -35,6 +44,7 @@ class TestDatasetService(ITestDatasetService):
             county_service: ICountyService,
             fkb_service: IFKBService,
             osm_service: IOpenStreetMapService,
+            osm_file_service: IOpenStreetMapFileService,
     ):
         self.__stac_service = stac_service
         self.__release_service = release_service
@@ -45,6 +55,7 @@ class TestDatasetService(ITestDatasetService):
         self.__county_service = county_service
         self.__fkb_service = fkb_service
         self.__osm_service = osm_service
+        self.__osm_file_service = osm_file_service
 
     def run_pipeline(self) -> str:
         latest_release, root_catalog, release_catalog = self.__create_release()
@@ -54,22 +65,85 @@ class TestDatasetService(ITestDatasetService):
         fkb_buildings = self.__download_and_format_fkb_dataset()
 
         building_collection = self.__create_theme_collection(release_catalog, latest_release, Theme.BUILDINGS)
-        region_polygons: dict[str, Any] = {}
-
+        empty_frames, region_polygons = self.__spill_datasets_to_regions(
+            osm_building_batches,
+            fkb_buildings,
+            regions
+        )
+        del osm_building_batches, fkb_buildings
+
+        raw_uploads: dict[tuple[str, DataSource], Future] = {}
+        conflated_uploads: dict[str, Future] = {}
+        stage_seconds: dict[str, dict[str, float]] = {region: {} for region in regions}
+        memory_budget = _MemoryBudget(limit_bytes=int(Config.SETUP_MEMORY_BUDGET_GB * 1024 ** 3))
+
+        # Partitioning runs on this thread so only one county is read back from the spill files at a time and
+        # the next county waits on the memory budget, while uploads and conflation of earlier regions run in the
+        # background. The budget covers the county being partitioned and the partitions waiting for upload.
+        # Conflation is not counted: it handles one county at a time and streams its output in batches of
+        # CONFLATION_MERGE_BATCH_ROWS rows.
+        with ThreadPoolExecutor(max_workers=Config.SETUP_UPLOAD_WORKERS) as upload_pool, \
+                ThreadPoolExecutor(max_workers=1) as conflation_pool:
+            for region in regions:
+                osm_county_dataset = self.__read_spilled_region(
+                    data_source=DataSource.OSM,
+                    region=region,
+                    empty_frames=empty_frames
+                )
+                fkb_county_dataset = self.__read_spilled_region(
+                    data_source=DataSource.FKB,
+                    region=region,
+                    empty_frames=empty_frames
+                )
+                region_bytes = self.__estimate_partition_bytes([osm_county_dataset, fkb_county_dataset])
+                started_at = time.perf_counter()
+                memory_budget.acquire(region_bytes)
+                stage_seconds[region]["memory_wait_region"] = time.perf_counter() - started_at
+
+                started_at = time.perf_counter()
+                osm_partitions, fkb_partitions = self.__partition_region(osm_county_dataset, fkb_county_dataset, region)
+                stage_seconds[region]["partition"] = time.perf_counter() - started_at
+
+                # The partitions take over the county's rows, so its reservation is handed over to them below
+                del osm_county_dataset, fkb_county_dataset
+                memory_budget.release(region_bytes)
+
+                for data_source, partitions in ((DataSource.OSM, osm_partitions), (DataSource.FKB, fkb_partitions)):
+                    reserved_bytes = self.__estimate_partition_bytes(partitions)
+                    started_at = time.perf_counter()
+                    memory_budget.acquire(reserved_bytes)
+                    stage_seconds[region][f"memory_wait_{data_source.value}"] = time.perf_counter() - started_at
+
+                    raw_uploads[(region, data_source)] = upload_pool.submit(
+                        self.__upload_raw_partitions,
+                        release=latest_release,
+                        region=region,
+                        partitions=partitions,
+                        data_source=data_source,
+                        memory_budget=memory_budget,
+                        reserved_bytes=reserved_bytes,
+                        timings=stage_seconds[region],
+                    )
+
+                del osm_partitions, fkb_partitions
+
+                conflated_uploads[region] = conflation_pool.submit(
+                    self.__conflate_and_upload_region,
+                    release=latest_release,
+                    region=region,
+                    raw_uploads=[raw_uploads[(region, DataSource.OSM)], raw_uploads[(region, DataSource.FKB)]],
+                    timings=stage_seconds[region],
+                )
+
+        shutil.rmtree(Config.SETUP_SPILL_DIR, ignore_errors=True)
+
+        # STAC items are created in county order once every upload has finished, independent of completion order
         for region in regions:
-            osm_partitions, fkb_partitions, region_geojson = self.__clip_and_partition_dataset_to_region(
-                osm_building_batches,
-                fkb_buildings,
-                region
-            )
-
-            region_polygons[region] = region_geojson
-
             osm_region_item = self.__create_region_items(
                 theme_collection=building_collection,
                 data_source=DataSource.OSM,
                 region=region,
-                geometry=region_geojson,
+                geometry=region_polygons[region],
                 bbox=None,
                 epsg_code=EPSGCode.WGS84
             )
@@ -78,42 +152,13 @@ class TestDatasetService(ITestDatasetService):
                 theme_collection=building_collection,
                 data_source=DataSource.FKB,
                 region=region,
-                geometry=region_geojson,
+                geometry=region_polygons[region],
                 bbox=None,
                 epsg_code=EPSGCode.WGS84
             )
 
-            osm_blob_paths = self.__upload_assets_to_blob_storage(
-                container=StorageContainer.RAW,
-                release=latest_release,
-                theme=Theme.BUILDINGS,
-                region=region,
-                partitions=osm_partitions,
-                dataset=DataSource.OSM
-            )
-
-            fkb_blob_paths = self.__upload_assets_to_blob_storage(
-                container=StorageContainer.RAW,
-                release=latest_release,
-                theme=Theme.BUILDINGS,
-                region=region,
-                partitions=fkb_partitions,
-                dataset=DataSource.FKB
-            )
-
-            self.__add_assets_to_item(osm_region_item, osm_blob_paths)
-            self.__add_assets_to_item(fkb_region_item, fkb_blob_paths)
-
-            partitions = self.__conflate_fkb_and_osm_dataset(release=latest_release, region=region)
-
-            conflated_blob_paths = self.__upload_assets_to_blob_storage(
-                container=StorageContainer.DATA,
-                release=latest_release,
-                theme=Theme.BUILDINGS,
-                region=region,
-                partitions=partitions,
-                dataset_size=DatasetSize.SMALL,
-            )
+            self.__add_assets_to_item(osm_region_item, raw_uploads[(region, DataSource.OSM)].result())
+            self.__add_assets_to_item(fkb_region_item, raw_uploads[(region, DataSource.FKB)].result())
 
             conflated_region_item = self.__create_region_items(
                 theme_collection=building_collection,
@@ -124,8 +169,9 @@ class TestDatasetService(ITestDatasetService):
                 epsg_code=EPSGCode.WGS84
             )
 
-            self.__add_assets_to_item(conflated_region_item, conflated_blob_paths)
+            self.__add_assets_to_item(conflated_region_item, conflated_uploads[region].result())
 
+        self.__log_stage_seconds(stage_seconds=stage_seconds)
         self.__save_catalog(catalog=root_catalog, release=latest_release)
         return latest_release
 
@@ -145,7 +191,14 @@ class TestDatasetService(ITestDatasetService):
             return limited_ids
         return county_ids
 
-    def __download_and_format_osm_dataset(self) -> list[gpd.GeoDataFrame]:
+    def __download_and_format_osm_dataset(self) -> Iterator[gpd.GeoDataFrame]:
+        if not self.__blob_storage_service.is_blob_in_storage_container(
+                container_name=StorageContainer.CONTRIBUTION,
+                blob_name=Config.OSM_CONTRIBUTION_BLOB
+        ):
+            logger.info("OSM contribution dataset not found. Converting the OSM PBF file...")
+            self.__osm_file_service.create_contribution_dataset()
+
         return self.__osm_service.create_building_batches()
 
     def __create_theme_collection(
@@ -163,31 +216,71 @@ class TestDatasetService(ITestDatasetService):
         release_catalog.add_child(theme_collection)
         return theme_collection
 
-    def __download_and_format_fkb_dataset(self) -> list[gpd.GeoDataFrame]:
-        fkb_dataset = self.__fkb_service.extract_fkb_data()
-        return [fkb_dataset]
+    def __download_and_format_fkb_dataset(self) -> Iterator[gpd.GeoDataFrame]:
+        return self.__fkb_service.extract_fkb_data()
 
-    def __clip_and_partition_dataset_to_region(
+    def __spill_datasets_to_regions(
             self,
-            osm_batches: list[gpd.GeoDataFrame],
-            fkb_batches: list[gpd.GeoDataFrame],
-            region: str,
-    ) -> tuple[list[gpd.GeoDataFrame], list[gpd.GeoDataFrame], dict[str, Any]]:
-        polygon_wkb, polygon_geojson = self.__county_service.get_county_polygons_by_id(
-            county_id=region,
-            epsg_code=EPSGCode.WGS84
-        )
+            osm_batches: Iterator[gpd.GeoDataFrame],
+            fkb_batches: Iterator[gpd.GeoDataFrame],
+            regions: list[str],
+    ) -> tuple[dict[DataSource, gpd.GeoDataFrame], dict[str, dict[str, Any]]]:
+        region_wkbs: dict[str, bytes] = {}
+        region_polygons: dict[str, dict[str, Any]] = {}
+        for region in regions:
+            region_wkbs[region], region_polygons[region] = self.__county_service.get_county_polygons_by_id(
+                county_id=region,
+                epsg_code=EPSGCode.WGS84
+            )
+
+        # Each batch's share of a county goes to a local GeoParquet file as soon as it is assigned, so only
+        # one batch is in memory during the national pass and the counties are read back one at a time
+        shutil.rmtree(Config.SETUP_SPILL_DIR, ignore_errors=True)
+        empty_frames: dict[DataSource, gpd.GeoDataFrame] = {}
 
-        osm_county_dataset = self.__vector_service.clip_dataframes_to_wkb(
-            osm_batches, polygon_wkb,
-            epsg_code=EPSGCode.WGS84
+        started_at = time.perf_counter()
+        for data_source, batches in ((DataSource.OSM, osm_batches), (DataSource.FKB, fkb_batches)):
+            region_pieces = self.__vector_service.assign_dataframes_to_regions(
+                batches, region_wkbs,
+                epsg_code=EPSGCode.WGS84
+            )
+            for piece_index, (region, dataframe) in enumerate(region_pieces):
+                region_dir = Config.SETUP_SPILL_DIR / data_source.value / region
+                region_dir.mkdir(parents=True, exist_ok=True)
+                dataframe.to_parquet(region_dir / f"part-{piece_index:06d}.parquet", index=False)
+                empty_frames.setdefault(data_source, dataframe.iloc[:0])
+
+        logger.info(
+            f"Assigned OSM- and FKB-features to {len(regions)} regions in {time.perf_counter() - started_at:.1f} seconds"
         )
 
-        fkb_county_dataset = self.__vector_service.clip_dataframes_to_wkb(
-            fkb_batches, polygon_wkb,
-            epsg_code=EPSGCode.WGS84
+        return empty_frames, region_polygons
+
+    @staticmethod
+    def __read_spilled_region(
+            data_source: DataSource,
+            region: str,
+            empty_frames: dict[DataSource, gpd.GeoDataFrame],
+    ) -> gpd.GeoDataFrame:
+        region_dir = Config.SETUP_SPILL_DIR / data_source.value / region
+        paths = sorted(region_dir.glob("*.parquet"))
+        if not paths:
+            return empty_frames.get(data_source, gpd.GeoDataFrame(geometry=[], crs=f"EPSG:{EPSGCode.WGS84.value}"))
+
+        dataframe = gpd.GeoDataFrame(
+            pd.concat([gpd.read_parquet(path) for path in paths], ignore_index=True),
+            geometry="geometry",
+            crs=f"EPSG:{EPSGCode.WGS84.value}"
         )
+        shutil.rmtree(region_dir)
+        return dataframe
 
+    def __partition_region(
+            self,
+            osm_county_dataset: gpd.GeoDataFrame,
+            fkb_county_dataset: gpd.GeoDataFrame,
+            region: str,
+    ) -> tuple[list[gpd.GeoDataFrame], list[gpd.GeoDataFrame]]:
         logger.info(
             f"Region '{region}' has {len(osm_county_dataset)} and {len(fkb_county_dataset)} features from the OSM- and FKB-datasets"
         )
@@ -195,13 +288,13 @@ class TestDatasetService(ITestDatasetService):
         osm_partitions = self.__vector_service.partition_dataframe(osm_county_dataset)
         fkb_partitions = self.__vector_service.partition_dataframe(fkb_county_dataset)
 
-        return osm_partitions, fkb_partitions, polygon_geojson
+        return osm_partitions, fkb_partitions
 
     def __conflate_fkb_and_osm_dataset(
             self,
             release: str,
             region: str,
-    ) -> list[gpd.GeoDataFrame]:
+    ) -> Iterator[pa.Table]:
         relation_ids = self.__conflation_service.get_fkb_osm_id_relations(
             release=release,
             theme=Theme.BUILDINGS,
@@ -216,6 +309,86 @@ class TestDatasetService(ITestDatasetService):
         )
         return conflated_partitions
 
+    def __upload_raw_partitions(
+            self,
+            release: str,
+            region: str,
+            partitions: list[gpd.GeoDataFrame],
+            data_source: DataSource,
+            memory_budget: "_MemoryBudget",
+            reserved_bytes: int,
+            timings: dict[str, float],
+    ) -> list[str]:
+        started_at = time.perf_counter()
+        try:
+            blob_paths = self.__upload_assets_to_blob_storage(
+                container=StorageContainer.RAW,
+                release=release,
+                theme=Theme.BUILDINGS,
+                region=region,
+                partitions=partitions,
+                dataset=data_source
+            )
+        finally:
+            memory_budget.release(reserved_bytes)
+
+        timings[f"upload_{data_source.value}"] = time.perf_counter() - started_at
+        return blob_paths
+
+    def __conflate_and_upload_region(
+            self,
+            release: str,
+            region: str,
+            raw_uploads: list[Future],
+            timings: dict[str, float],
+    ) -> list[str]:
+        # Conflation reads the raw partitions back from blob storage
+        for raw_upload in raw_uploads:
+            raw_upload.result()
+
+        started_at = time.perf_counter()
+        partitions = self.__conflate_fkb_and_osm_dataset(release=release, region=region)
+
+        conflated_blob_paths = self.__blob_storage_service.upload_arrow_tables_as_geoparquet(
+            container=StorageContainer.DATA,
+            release=release,
+            theme=Theme.BUILDINGS,
+            region=region,
+            partitions=partitions,
+            dataset_size=DatasetSize.SMALL,
+            row_group_size=Config.GEOPARQUET_ROW_GROUP_SIZE,
+        )
+
+        timings["conflate_and_upload"] = time.perf_counter() - started_at
+        return conflated_blob_paths
+
+    @staticmethod
+    def __estimate_partition_bytes(partitions: list[gpd.GeoDataFrame]) -> int:
+        # pandas only counts the geometry pointers, so coordinates are added at 16 bytes per xy pair
+        return sum(
+            int(partition.memory_usage(deep=True).sum())
+            + int(shapely.get_num_coordinates(np.asarray(partition.geometry)).sum()) * 16
+            for partition in partitions
+        )
+
+    @staticmethod
+    def __log_stage_seconds(stage_seconds: dict[str, dict[str, float]]) -> None:
+        busy_seconds = {
+            region: sum(seconds for stage, seconds in stages.items() if not stage.startswith("memory_wait"))
+            for region, stages in stage_seconds.items()
+        }
+
+        for region, stages in stage_seconds.items():
+            logger.info(
+                f"Region '{region}' stage timings: "
+                + ", ".join(f"{stage}={seconds:.1f}s" for stage, seconds in stages.items())
+                + f" (total {busy_seconds[region]:.1f}s)"
+            )
+
+        if busy_seconds:
+            slowest_region = max(busy_seconds, key=busy_seconds.get)
+            logger.info(f"Slowest region is '{slowest_region}' with {busy_seconds[slowest_region]:.1f}s of work")
+
     def __create_region_items(
             self,
             theme_collection: Collection,
@@ -281,3 +454,26 @@ class TestDatasetService(ITestDatasetService):
             release: str,
     ) -> None:
         self.__stac_service.save_catalog(catalog, release)
+
+
+class _MemoryBudget:
+    __limit_bytes: int
+    __reserved_bytes: int
+    __condition: threading.Condition
+
+    def __init__(self, limit_bytes: int) -> None:
+        self.__limit_bytes = limit_bytes
+        self.__reserved_bytes = 0
+        self.__condition = threading.Condition()
+
+    def acquire(self, size_bytes: int) -> None:
+        # A region larger than the whole budget is let through once nothing else is reserved
+        with self.__condition:
+            while self.__reserved_bytes > 0 and self.__reserved_bytes + size_bytes > self.__limit_bytes:
+                self.__condition.wait()
+            self.__reserved_bytes += size_bytes
+
+    def release(self, size_bytes: int) -> None:
+        with self.__condition:
+            self.__reserved_bytes -= size_bytes
+            self.__condition.notify_all()
@@ -2,9 +2,12 @@
 
 from pmtiles.reader import Reader
 from requests import Session, session, RequestException
+from requests.adapters import HTTPAdapter
 
 from src import Config
 from src.application.contracts import ITileApiService
+from src.application.dtos import PMTilesReaderStats
+from src.infra.persistence.context import CachedPMTilesReader
 
 
 class TileApiService(ITileApiService):
@@ -13,11 +16,15 @@ class TileApiService(ITileApiService):
     def __init__(self):
         self.__session = session()
 
-    def fetch_vmt_tile(self, z: int, x: int, y: int) -> bytes | None:
+        adapter = HTTPAdapter(pool_maxsize=Config.TILE_CLIENT_MAX_CONNECTIONS)
+        self.__session.mount("http://", adapter)
+        self.__session.mount("https://", adapter)
+
+    def fetch_vmt_tile(self, z: int, x: int, y: int, server_url: str | None = None) -> bytes | None:
         try:
             tile_response = self.__session.get(
-                f"{Config.AZURE_VMT_SERVER_URL}/tiles/{z}/{x}/{y}",
-                timeout=10,
+                f"{server_url or Config.AZURE_VMT_SERVER_URL}/tiles/{z}/{x}/{y}",
+                timeout=Config.TILE_CLIENT_TIMEOUT_SECONDS,
                 headers={
                     "Cache-Control": "no-cache, no-store, max-age=0",
                     "Pragma": "no-cache"
@@ -39,11 +46,48 @@ class TileApiService(ITileApiService):
 
         return tile_response.content
 
+    def fetch_vmt_cache_stats(self, server_url: str | None = None, reset: bool = False) -> dict:
+        stats_url = f"{server_url or Config.AZURE_VMT_SERVER_URL}/tiles/stats"
+
+        try:
+            if reset:
+                stats_response = self.__session.post(f"{stats_url}/reset", timeout=Config.TILE_CLIENT_TIMEOUT_SECONDS)
+            else:
+                stats_response = self.__session.get(stats_url, timeout=Config.TILE_CLIENT_TIMEOUT_SECONDS)
+            stats_response.raise_for_status()
+        except RequestException as e:
+            raise RuntimeError("Failed to fetch tile cache statistics from VMT server") from e
+
+        return stats_response.json()
+
+    def fetch_static_mvt_tile(self, base_url: str, z: int, x: int, y: int) -> bytes | None:
+        try:
+            tile_response = self.__session.get(
+                f"{base_url}/{z}/{x}/{y}.pbf",
+                timeout=Config.TILE_CLIENT_TIMEOUT_SECONDS
+            )
+            if tile_response.status_code == 404:
+                return None
+            tile_response.raise_for_status()
+        except RequestException as e:
+            raise RuntimeError("Failed to fetch static MVT tile from blob storage") from e
+
+        return tile_response.content or None
+
     def fetch_pmtiles_tile(self, reader: Reader, z: int, x: int, y: int) -> bytes | None:
         return reader.get(z, x, y)
 
+    def get_pmtiles_reader_stats(self, reader: Reader) -> PMTilesReaderStats | None:
+        if not isinstance(reader, CachedPMTilesReader):
+            return None
+
+        return reader.get_stats()
+
     def create_pmtiles_reader(self, pmtiles_url: str) -> Reader:
-        return Reader(self.__http_range_source(url=pmtiles_url))
+        return CachedPMTilesReader(
+            get_bytes=self.__http_range_source(url=pmtiles_url),
+            directory_cache_entries=Config.PMTILES_DIRECTORY_CACHE_ENTRIES
+        )
 
     def __http_range_source(self, url: str) -> Callable:
         def _get_bytes(offset: int, length: int) -> bytes:
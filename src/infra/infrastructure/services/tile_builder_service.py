@@ -0,0 +1,437 @@
+import gzip
+import multiprocessing
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from duckdb import DuckDBPyConnection
+from pmtiles.tile import Compression, TileType, zxy_to_tileid
+from pmtiles.writer import Writer
+
+from src import Config
+from src.application.common import logger
+from src.application.common.resource_sampler import ResourceSampler
+from src.application.contracts import ITileBuilderService, IFilePathService
+from src.application.dtos import TileBuildReport
+from src.domain.enums import DatasetSize, StorageContainer, Theme
+
+MAX_LATITUDE: float = 85.05112878
+TILE_SIZE_PIXELS: int = 256
+TILE_ASSIGNMENT_SCHEMA: pa.Schema = pa.schema([
+    ("z", pa.int8()),
+    ("x", pa.int32()),
+    ("y", pa.int32()),
+    ("geometry", pa.binary()),
+])
+
+# Set once per worker process by `_initialize_tile_encoder`
+_encoder_context: DuckDBPyConnection | None = None
+
+
+class TileBuilderService(ITileBuilderService):
+    __db_context: DuckDBPyConnection
+    __file_path_service: IFilePathService
+
+    def __init__(self, db_context: DuckDBPyConnection, file_path_service: IFilePathService) -> None:
+        self.__db_context = db_context
+        self.__file_path_service = file_path_service
+
+    def build_tiles(
+            self,
+            release: str,
+            dataset_size: DatasetSize,
+            min_zoom: int,
+            max_zoom: int,
+            pmtiles_path: Path,
+            mvt_dir: Path
+    ) -> TileBuildReport:
+        path = self.__get_buildings_path(release=release, dataset_size=dataset_size)
+
+        Config.TILE_BUILDER_WORK_DIR.mkdir(parents=True, exist_ok=True)
+        pmtiles_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.rmtree(mvt_dir, ignore_errors=True)
+        mvt_dir.mkdir(parents=True, exist_ok=True)
+
+        unsorted_path = Config.TILE_BUILDER_WORK_DIR / f"assignments_{dataset_size.value}_unsorted.parquet"
+        sorted_path = Config.TILE_BUILDER_WORK_DIR / f"assignments_{dataset_size.value}.parquet"
+        phase_seconds: dict[str, float] = {}
+
+        try:
+            with ResourceSampler(include_children=True) as sampler:
+                started_at = time.perf_counter()
+                features, tile_assignments = self.__assign_tiles(
+                    path=path,
+                    min_zoom=min_zoom,
+                    max_zoom=max_zoom,
+                    assignments_path=unsorted_path
+                )
+                phase_seconds["assign"] = time.perf_counter() - started_at
+                logger.info(
+                    f"Assigned {features} features to {tile_assignments} tile slots "
+                    f"in {phase_seconds['assign']:.1f} seconds"
+                )
+
+                started_at = time.perf_counter()
+                spans = self.__sort_assignments(unsorted_path=unsorted_path, sorted_path=sorted_path)
+                phase_seconds["sort"] = time.perf_counter() - started_at
+
+                started_at = time.perf_counter()
+                tiles, mvt_bytes = self.__encode_tiles(assignments_path=sorted_path, spans=spans, mvt_dir=mvt_dir)
+                phase_seconds["encode"] = time.perf_counter() - started_at
+                logger.info(f"Encoded {len(tiles)} tiles in {phase_seconds['encode']:.1f} seconds")
+
+                started_at = time.perf_counter()
+                self.__write_pmtiles(
+                    tiles=tiles,
+                    mvt_dir=mvt_dir,
+                    pmtiles_path=pmtiles_path,
+                    min_zoom=min_zoom,
+                    max_zoom=max_zoom
+                )
+                phase_seconds["pmtiles"] = time.perf_counter() - started_at
+        finally:
+            unsorted_path.unlink(missing_ok=True)
+            sorted_path.unlink(missing_ok=True)
+
+        phase_seconds["total"] = sum(phase_seconds.values())
+
+        report = TileBuildReport(
+            dataset_size=dataset_size.value,
+            min_zoom=min_zoom,
+            max_zoom=max_zoom,
+            features=features,
+            tile_assignments=tile_assignments,
+            tiles=len(tiles),
+            pmtiles_bytes=pmtiles_path.stat().st_size,
+            mvt_bytes=mvt_bytes,
+            workers=Config.TILE_BUILDER_WORKERS,
+            peak_rss_bytes=sampler.peak_rss_bytes,
+            phase_seconds=phase_seconds,
+        )
+        logger.info(f"Built tile pyramid: {report.to_json()}")
+        return report
+
+    def count_features_per_tile(
+            self,
+            release: str,
+            dataset_size: DatasetSize,
+            zoom: int
+    ) -> list[tuple[int, int, int, int]]:
+        path = self.__get_buildings_path(release=release, dataset_size=dataset_size)
+        batch_keys: list[np.ndarray] = []
+        batch_counts: list[np.ndarray] = []
+
+        cursor = self.__db_context.cursor()
+        try:
+            reader = cursor.execute(f"""
+                SELECT bbox.xmin AS xmin, bbox.ymin AS ymin, bbox.xmax AS xmax, bbox.ymax AS ymax
+                FROM read_parquet('{path}')
+            """).fetch_record_batch(Config.TILE_BUILDER_BATCH_ROWS)
+
+            for batch in reader:
+                _, tile_x, tile_y = self.__expand_tile_ranges(z=zoom, bounds=self.__get_tile_bounds(batch), buffer=0.0)
+                keys, counts = np.unique((tile_x << 32) | tile_y, return_counts=True)
+                batch_keys.append(keys)
+                batch_counts.append(counts)
+        finally:
+            cursor.close()
+
+        if not batch_keys:
+            return []
+
+        keys, inverse = np.unique(np.concatenate(batch_keys), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate(batch_counts)).astype(np.int64)
+
+        logger.info(f"Found {len(keys)} occupied tiles at zoom {zoom} from '{path}'")
+        return [(zoom, int(key >> 32), int(key & 0xFFFFFFFF), int(count)) for key, count in zip(keys, counts)]
+
+    def __assign_tiles(self, path: str, min_zoom: int, max_zoom: int, assignments_path: Path) -> tuple[int, int]:
+        features = 0
+        tile_assignments = 0
+
+        cursor = self.__db_context.cursor()
+        try:
+            reader = cursor.execute(f"""
+                SELECT
+                    bbox.xmin AS xmin,
+                    bbox.ymin AS ymin,
+                    bbox.xmax AS xmax,
+                    bbox.ymax AS ymax,
+                    ST_AsWKB(ST_Transform(geometry, 'EPSG:4326', 'EPSG:3857', always_xy := true)) AS geometry
+                FROM read_parquet('{path}')
+            """).fetch_record_batch(Config.TILE_BUILDER_BATCH_ROWS)
+
+            with pq.ParquetWriter(assignments_path, TILE_ASSIGNMENT_SCHEMA) as writer:
+                for batch in reader:
+                    features += batch.num_rows
+                    bounds = self.__get_tile_bounds(batch)
+
+                    for z in range(min_zoom, max_zoom + 1):
+                        assignments = self.__assign_batch_to_zoom(
+                            z=z,
+                            keep_all=z == max_zoom,
+                            bounds=bounds,
+                            geometry=batch.column("geometry")
+                        )
+                        if assignments.num_rows > 0:
+                            writer.write_table(assignments)
+                            tile_assignments += assignments.num_rows
+        finally:
+            cursor.close()
+
+        return features, tile_assignments
+
+    @staticmethod
+    def __assign_batch_to_zoom(
+            z: int,
+            keep_all: bool,
+            bounds: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+            geometry: pa.Array
+    ) -> pa.Table:
+        tile_x_min, tile_y_min, tile_x_max, tile_y_max = bounds
+
+        if keep_all:
+            rows = np.arange(len(tile_x_min))
+        else:
+            size_pixels = np.maximum(tile_x_max - tile_x_min, tile_y_max - tile_y_min) * (1 << z) * TILE_SIZE_PIXELS
+            rows = np.flatnonzero(size_pixels >= Config.TILE_BUILDER_MIN_FEATURE_PIXELS)
+
+        features, tile_x, tile_y = TileBuilderService.__expand_tile_ranges(
+            z=z,
+            bounds=(tile_x_min[rows], tile_y_min[rows], tile_x_max[rows], tile_y_max[rows]),
+            buffer=Config.MVT_TILE_BUFFER / Config.MVT_TILE_EXTENT
+        )
+
+        return pa.table(
+            {
+                "z": np.full(len(features), z, dtype=np.int8),
+                "x": tile_x.astype(np.int32),
+                "y": tile_y.astype(np.int32),
+                "geometry": geometry.take(pa.array(rows[features])),
+            },
+            schema=TILE_ASSIGNMENT_SCHEMA
+        )
+
+    @staticmethod
+    def __expand_tile_ranges(
+            z: int,
+            bounds: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+            buffer: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        tile_x_min, tile_y_min, tile_x_max, tile_y_max = bounds
+        tile_count = 1 << z
+
+        x_min = np.clip(np.floor(tile_x_min * tile_count - buffer), 0, tile_count - 1).astype(np.int64)
+        x_max = np.clip(np.floor(tile_x_max * tile_count + buffer), 0, tile_count - 1).astype(np.int64)
+        y_min = np.clip(np.floor(tile_y_min * tile_count - buffer), 0, tile_count - 1).astype(np.int64)
+        y_max = np.clip(np.floor(tile_y_max * tile_count + buffer), 0, tile_count - 1).astype(np.int64)
+
+        # Expand every feature into one row per covered tile, walking its tile range row by row
+        widths = x_max - x_min + 1
+        counts = widths * (y_max - y_min + 1)
+        total = int(counts.sum())
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        row_widths = np.repeat(widths, counts)
+
+        features = np.repeat(np.arange(len(x_min)), counts)
+        tile_x = np.repeat(x_min, counts) + offsets % row_widths
+        tile_y = np.repeat(y_min, counts) + offsets // row_widths
+        return features, tile_x, tile_y
+
+    @staticmethod
+    def __get_tile_bounds(batch: pa.RecordBatch) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Tile space runs from 0 to 1 with y growing southwards, so the north edge is the minimum
+        return (
+            TileBuilderService.__lon_to_tile_fraction(batch.column("xmin").to_numpy(zero_copy_only=False)),
+            TileBuilderService.__lat_to_tile_fraction(batch.column("ymax").to_numpy(zero_copy_only=False)),
+            TileBuilderService.__lon_to_tile_fraction(batch.column("xmax").to_numpy(zero_copy_only=False)),
+            TileBuilderService.__lat_to_tile_fraction(batch.column("ymin").to_numpy(zero_copy_only=False)),
+        )
+
+    def __sort_assignments(self, unsorted_path: Path, sorted_path: Path) -> list[tuple[int, int, int]]:
+        cursor = self.__db_context.cursor()
+        try:
+            # Sorting by tile lets each worker read a contiguous run of row groups for its span
+            cursor.execute(f"""
+                COPY (
+                    SELECT * FROM read_parquet('{unsorted_path.as_posix()}')
+                    ORDER BY z, x, y
+                ) TO '{sorted_path.as_posix()}' (FORMAT parquet, ROW_GROUP_SIZE {Config.GEOPARQUET_ROW_GROUP_SIZE})
+            """)
+            columns = cursor.execute(f"""
+                SELECT z, x, COUNT(*)
+                FROM read_parquet('{sorted_path.as_posix()}')
+                GROUP BY z, x
+                ORDER BY z, x
+            """).fetchall()
+        finally:
+            cursor.close()
+        unsorted_path.unlink(missing_ok=True)
+
+        spans: list[tuple[int, int, int]] = []
+        span_features = 0
+        for z, x, count in columns:
+            if spans and spans[-1][0] == z and span_features + count <= Config.TILE_BUILDER_FEATURES_PER_TASK:
+                spans[-1] = (z, spans[-1][1], x)
+                span_features += count
+            else:
+                spans.append((z, x, x))
+                span_features = count
+
+        logger.info(f"Split {len(columns)} tile columns into {len(spans)} encoding tasks")
+        return spans
+
+    @staticmethod
+    def __encode_tiles(
+            assignments_path: Path,
+            spans: list[tuple[int, int, int]],
+            mvt_dir: Path
+    ) -> tuple[list[tuple[int, int, int, int]], int]:
+        tiles: list[tuple[int, int, int, int]] = []
+        mvt_bytes = 0
+
+        # DuckDB is not fork-safe, so workers are spawned and open their own connection
+        with ProcessPoolExecutor(
+                max_workers=Config.TILE_BUILDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_initialize_tile_encoder,
+                initargs=(Config.TILE_BUILDER_WORKER_MEMORY_LIMIT,)
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _encode_tile_span,
+                    assignments_path.as_posix(),
+                    z,
+                    x_min,
+                    x_max,
+                    Config.TILE_BUILDER_LAYER_NAME,
+                    Config.MVT_TILE_EXTENT,
+                    Config.MVT_TILE_BUFFER
+                )
+                for z, x_min, x_max in spans
+            ]
+
+            for future in as_completed(futures):
+                for z, x, y, content in future.result():
+                    tile_path = mvt_dir / str(z) / str(x) / f"{y}.pbf"
+                    tile_path.parent.mkdir(parents=True, exist_ok=True)
+                    tile_path.write_bytes(content)
+
+                    tiles.append((zxy_to_tileid(z, x, y), z, x, y))
+                    mvt_bytes += len(content)
+
+        return tiles, mvt_bytes
+
+    @staticmethod
+    def __write_pmtiles(
+            tiles: list[tuple[int, int, int, int]],
+            mvt_dir: Path,
+            pmtiles_path: Path,
+            min_zoom: int,
+            max_zoom: int
+    ) -> None:
+        if not tiles:
+            raise ValueError("No tiles were encoded. Cannot write an empty PMTiles archive.")
+
+        min_lat, min_lon, max_lat, max_lon = Config.BUILDINGS_SPATIAL_EXTENT
+
+        # Writing in tile id order keeps the archive clustered, so neighbouring tiles are adjacent on disk
+        with open(pmtiles_path, "wb") as f:
+            writer = Writer(f)
+            for tile_id, z, x, y in sorted(tiles):
+                # A fixed gzip mtime keeps the archive byte-identical across builds
+                tile_data = (mvt_dir / str(z) / str(x) / f"{y}.pbf").read_bytes()
+                writer.write_tile(tile_id, gzip.compress(tile_data, mtime=0))
+
+            writer.finalize(
+                {
+                    "tile_type": TileType.MVT,
+                    "tile_compression": Compression.GZIP,
+                    "min_lon_e7": int(min_lon * 10_000_000),
+                    "min_lat_e7": int(min_lat * 10_000_000),
+                    "max_lon_e7": int(max_lon * 10_000_000),
+                    "max_lat_e7": int(max_lat * 10_000_000),
+                    "center_zoom": min_zoom,
+                },
+                {
+                    "name": Config.TILE_BUILDER_LAYER_NAME,
+                    "format": "pbf",
+                    "vector_layers": [
+                        {
+                            "id": Config.TILE_BUILDER_LAYER_NAME,
+                            "fields": {},
+                            "minzoom": min_zoom,
+                            "maxzoom": max_zoom,
+                        }
+                    ],
+                },
+            )
+
+        logger.info(f"PMTiles with {len(tiles)} tiles saved to '{pmtiles_path}'")
+
+    def __get_buildings_path(self, release: str, dataset_size: DatasetSize) -> str:
+        return self.__file_path_service.create_release_virtual_filesystem_path(
+            storage_scheme="az",
+            release=release,
+            container=StorageContainer.DATA,
+            theme=Theme.BUILDINGS,
+            dataset_size=dataset_size,
+            region="*",
+            file_name="*.parquet",
+        )
+
+    @staticmethod
+    def __lon_to_tile_fraction(lon: np.ndarray) -> np.ndarray:
+        return (lon + 180.0) / 360.0
+
+    @staticmethod
+    def __lat_to_tile_fraction(lat: np.ndarray) -> np.ndarray:
+        sin_lat = np.sin(np.radians(np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE)))
+        return 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)
+
+
+def _initialize_tile_encoder(memory_limit: str) -> None:
+    global _encoder_context
+    _encoder_context = duckdb.connect()
+    _encoder_context.install_extension("spatial")
+    _encoder_context.load_extension("spatial")
+    _encoder_context.execute("SET threads = 1")
+    _encoder_context.execute(f"SET memory_limit = '{memory_limit}'")
+
+
+def _encode_tile_span(
+        assignments_path: str,
+        z: int,
+        x_min: int,
+        x_max: int,
+        layer_name: str,
+        extent: int,
+        buffer: int
+) -> list[tuple[int, int, int, bytes]]:
+    rows = _encoder_context.execute(f"""
+        SELECT z, x, y, ST_AsMVT({{'geometry': geometry}}, '{layer_name}', {extent}, 'geometry') AS tile
+        FROM (
+            SELECT
+                z,
+                x,
+                y,
+                ST_AsMVTGeom(
+                    ST_GeomFromWKB(geometry),
+                    ST_Extent(ST_TileEnvelope(z, x, y)),
+                    {extent},
+                    {buffer},
+                    true
+                ) AS geometry
+            FROM read_parquet('{assignments_path}')
+            WHERE z = ? AND x BETWEEN ? AND ?
+        ) AS clipped
+        WHERE geometry IS NOT NULL AND NOT ST_IsEmpty(geometry)
+        GROUP BY z, x, y
+    """, [z, x_min, x_max]).fetchall()
+
+    return [(int(z), int(x), int(y), bytes(tile)) for z, x, y, tile in rows if tile]
@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import numpy as np
+
+from src import Config
+from src.application.common import logger
+from src.application.contracts import ITileCacheService
+from src.application.dtos import CachedTile, TileCacheStats
+from src.domain.enums import TileCacheMode
+
+CACHE_STATUS_HIT: str = "HIT"
+CACHE_STATUS_MISS: str = "MISS"
+CACHE_STATUS_COALESCED: str = "COALESCED"
+# Slots of the per-worker counter file. Entries and size are only tracked there for the per-worker memory cache
+STATS_SLOTS: dict[str, int] = {
+    name: index for index, name in enumerate((
+        "hits",
+        "misses",
+        "coalesced",
+        "not_modified",
+        "hit_latency_seconds",
+        "miss_latency_seconds",
+        "miss_latency_max_seconds",
+        "entries",
+        "size_bytes",
+    ))
+}
+COUNTER_SLOTS: tuple[int, ...] = tuple(
+    index for name, index in STATS_SLOTS.items() if name not in ("entries", "size_bytes")
+)
+
+
+class TileCacheService(ITileCacheService):
+    __mode: TileCacheMode
+    __dataset_version: str
+    __max_bytes: int
+    __cache_dir: Path
+    __memory_cache: OrderedDict[tuple[int, int, int], bytes]
+    __memory_cache_bytes: int
+    __in_flight: dict[tuple[int, int, int], asyncio.Future]
+    __stats_dir: Path
+    __counters: np.memmap
+
+    def __init__(self, mode: TileCacheMode):
+        self.__mode = mode
+        self.__dataset_version = Config.VMT_DATASET_VERSION
+        self.__max_bytes = Config.VMT_TILE_CACHE_MAX_BYTES
+        self.__cache_dir = Config.VMT_TILE_CACHE_DIR / Config.VMT_DATASET_VERSION
+        self.__memory_cache = OrderedDict()
+        self.__memory_cache_bytes = 0
+        self.__in_flight = {}
+
+        # uvicorn workers are separate processes, so each worker keeps its counters in a memory-mapped file
+        # under a directory shared by all workers of the same server process
+        self.__stats_dir = Config.VMT_TILE_CACHE_STATS_DIR / str(os.getppid())
+        self.__stats_dir.mkdir(parents=True, exist_ok=True)
+        self.__counters = np.memmap(
+            self.__stats_dir / f"{os.getpid()}.stats",
+            dtype=np.float64,
+            mode="w+",
+            shape=(len(STATS_SLOTS),)
+        )
+
+        logger.info(f"Tile cache mode '{mode.value}' for dataset version '{self.__dataset_version}'")
+
+    async def get_tile(self, z: int, x: int, y: int, render: Callable[[], Awaitable[bytes | None]]) -> CachedTile:
+        key = (z, x, y)
+        started_at = time.perf_counter()
+
+        if key not in self.__in_flight:
+            content = await self.__read(key)
+            if content is not None:
+                self.__counters[STATS_SLOTS["hits"]] += 1
+                self.__counters[STATS_SLOTS["hit_latency_seconds"]] += time.perf_counter() - started_at
+                return self.__to_cached_tile(content=content, cache_status=CACHE_STATUS_HIT)
+
+        # Checked again after the read, since a disk read yields to the event loop
+        in_flight = self.__in_flight.get(key)
+        if in_flight is not None:
+            content = await asyncio.shield(in_flight)
+            self.__counters[STATS_SLOTS["coalesced"]] += 1
+            return self.__to_cached_tile(content=content, cache_status=CACHE_STATUS_COALESCED)
+
+        future = asyncio.get_running_loop().create_future()
+        self.__in_flight[key] = future
+        try:
+            content = await render() or b""
+            await self.__write(key, content)
+            future.set_result(content)
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise the exception; retrieve it here so an unawaited future does not log it
+            future.exception()
+            raise
+        finally:
+            del self.__in_flight[key]
+
+        miss_latency = time.perf_counter() - started_at
+        self.__counters[STATS_SLOTS["misses"]] += 1
+        self.__counters[STATS_SLOTS["miss_latency_seconds"]] += miss_latency
+        self.__counters[STATS_SLOTS["miss_latency_max_seconds"]] = max(
+            self.__counters[STATS_SLOTS["miss_latency_max_seconds"]], miss_latency
+        )
+        return self.__to_cached_tile(content=content, cache_status=CACHE_STATUS_MISS)
+
+    def is_not_modified(self, tile: CachedTile, if_none_match: str | None) -> bool:
+        if not if_none_match:
+            return False
+
+        etags = [etag.strip().removeprefix("W/") for etag in if_none_match.split(",")]
+        if "*" not in etags and tile.etag not in etags:
+            return False
+
+        self.__counters[STATS_SLOTS["not_modified"]] += 1
+        return True
+
+    def get_stats(self) -> TileCacheStats:
+        worker_counters = np.stack([
+            np.fromfile(stats_path, dtype=np.float64, count=len(STATS_SLOTS))
+            for stats_path in self.__get_stats_paths()
+        ])
+        totals = worker_counters.sum(axis=0)
+        hits, misses = int(totals[STATS_SLOTS["hits"]]), int(totals[STATS_SLOTS["misses"]])
+        entries, size_bytes = self.__get_cache_size(totals=totals)
+
+        return TileCacheStats(
+            mode=self.__mode.value,
+            dataset_version=self.__dataset_version,
+            workers=len(worker_counters),
+            hits=hits,
+            misses=misses,
+            coalesced=int(totals[STATS_SLOTS["coalesced"]]),
+            not_modified=int(totals[STATS_SLOTS["not_modified"]]),
+            entries=entries,
+            size_bytes=size_bytes,
+            hit_latency_ms_mean=totals[STATS_SLOTS["hit_latency_seconds"]] * 1000 / hits if hits else 0.0,
+            miss_latency_ms_mean=totals[STATS_SLOTS["miss_latency_seconds"]] * 1000 / misses if misses else 0.0,
+            miss_latency_ms_max=float(worker_counters[:, STATS_SLOTS["miss_latency_max_seconds"]].max()) * 1000,
+        )
+
+    def reset_stats(self) -> None:
+        for stats_path in self.__get_stats_paths():
+            counters = np.memmap(stats_path, dtype=np.float64, mode="r+", shape=(len(STATS_SLOTS),))
+            counters[list(COUNTER_SLOTS)] = 0.0
+            counters.flush()
+
+    def __get_stats_paths(self) -> list[Path]:
+        self.__counters.flush()
+        return sorted(self.__stats_dir.glob("*.stats"))
+
+    async def __read(self, key: tuple[int, int, int]) -> bytes | None:
+        match self.__mode:
+            case TileCacheMode.MEMORY:
+                content = self.__memory_cache.get(key)
+                if content is not None:
+                    self.__memory_cache.move_to_end(key)
+                return content
+            case TileCacheMode.DISK:
+                return await asyncio.to_thread(self.__read_from_disk, key)
+            case _:
+                return None
+
+    async def __write(self, key: tuple[int, int, int], content: bytes) -> None:
+        match self.__mode:
+            case TileCacheMode.MEMORY:
+                self.__write_to_memory(key, content)
+            case TileCacheMode.DISK:
+                await asyncio.to_thread(self.__write_to_disk, key, content)
+
+    def __write_to_memory(self, key: tuple[int, int, int], content: bytes) -> None:
+        if len(content) > self.__max_bytes:
+            return
+
+        previous = self.__memory_cache.pop(key, None)
+        if previous is not None:
+            self.__memory_cache_bytes -= len(previous)
+
+        self.__memory_cache[key] = content
+        self.__memory_cache_bytes += len(content)
+
+        while self.__memory_cache_bytes > self.__max_bytes:
+            _, evicted = self.__memory_cache.popitem(last=False)
+            self.__memory_cache_bytes -= len(evicted)
+
+        self.__counters[STATS_SLOTS["entries"]] = len(self.__memory_cache)
+        self.__counters[STATS_SLOTS["size_bytes"]] = self.__memory_cache_bytes
+
+    def __read_from_disk(self, key: tuple[int, int, int]) -> bytes | None:
+        try:
+            return self.__get_tile_path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def __write_to_disk(self, key: tuple[int, int, int], content: bytes) -> None:
+        tile_path = self.__get_tile_path(key)
+        tile_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Several uvicorn workers share the directory, so write to a temporary file and rename atomically
+        temporary_path = tile_path.with_suffix(f".{os.getpid()}.tmp")
+        temporary_path.write_bytes(content)
+        os.replace(temporary_path, tile_path)
+
+    def __get_tile_path(self, key: tuple[int, int, int]) -> Path:
+        z, x, y = key
+        return self.__cache_dir / str(z) / str(x) / f"{y}.mvt"
+
+    def __get_cache_size(self, totals: np.ndarray) -> tuple[int, int]:
+        match self.__mode:
+            case TileCacheMode.MEMORY:
+                return int(totals[STATS_SLOTS["entries"]]), int(totals[STATS_SLOTS["size_bytes"]])
+            case TileCacheMode.DISK:
+                tile_paths = list(self.__cache_dir.rglob("*.mvt")) if self.__cache_dir.exists() else []
+                return len(tile_paths), sum(tile_path.stat().st_size for tile_path in tile_paths)
+            case _:
+                return 0, 0
+
+    def __to_cached_tile(self, content: bytes, cache_status: str) -> CachedTile:
+        digest = hashlib.blake2b(content, digest_size=8).hexdigest()
+        return CachedTile(content=content, etag=f'"{self.__dataset_version}-{digest}"', cache_status=cache_status)
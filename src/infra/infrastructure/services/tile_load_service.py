@@ -0,0 +1,41 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.application.common import logger
+from src.application.contracts import ITileLoadService, ITileApiService
+from src.application.dtos import TileLoadReport
+
+
+class TileLoadService(ITileLoadService):
+    __tile_api_service: ITileApiService
+
+    def __init__(self, tile_api_service: ITileApiService):
+        self.__tile_api_service = tile_api_service
+
+    def run_vmt_load(self, tiles: list[tuple[int, int, int]], server_url: str, concurrency: int) -> TileLoadReport:
+        def _timed_fetch(tile: tuple[int, int, int]) -> tuple[float, bool, bool]:
+            z, x, y = tile
+            started_at = time.perf_counter()
+            try:
+                tile_bytes = self.__tile_api_service.fetch_vmt_tile(z=z, x=x, y=y, server_url=server_url)
+            except RuntimeError as e:
+                logger.debug(f"Tile {z}/{x}/{y} failed: {e}")
+                return time.perf_counter() - started_at, True, False
+
+            return time.perf_counter() - started_at, False, tile_bytes is None
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(_timed_fetch, tiles))
+        elapsed_seconds = time.perf_counter() - started_at
+
+        report = TileLoadReport.from_latencies(
+            server_url=server_url,
+            concurrency=concurrency,
+            latencies_seconds=[latency for latency, _, _ in results],
+            errors=sum(1 for _, failed, _ in results if failed),
+            not_found=sum(1 for _, _, missing in results if missing),
+            elapsed_seconds=elapsed_seconds,
+        )
+        logger.info(f"VMT load against '{server_url}' at concurrency {concurrency}: {report.to_json()}")
+        return report
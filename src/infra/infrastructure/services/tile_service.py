@@ -63,6 +63,10 @@ class TileService(ITileService):
         ]
 
     def load_tiles(self, number_of_tiles: int) -> list[tuple[int, int, int]]:
+        tiles = [(z, x, y) for z, x, y, _ in self.load_tile_counts()]
+        return (tiles * ((number_of_tiles // len(tiles)) + 1))[:number_of_tiles]
+
+    def load_tile_counts(self) -> list[tuple[int, int, int, int]]:
         with Config.MVT_TILES_PATH.open("r", encoding="utf-8") as f:
             raw = f.read()
 
@@ -83,14 +87,18 @@ class TileService(ITileService):
         if not isinstance(data, list):
             raise ValueError(f"Tiles JSON must be a list, got {type(data).__name__}")
 
-        tiles: list[tuple[int, int, int]] = []
+        if not data:
+            raise ValueError(f"Tiles JSON at {Config.MVT_TILES_PATH} contains no tiles")
+
+        tiles: list[tuple[int, int, int, int]] = []
         for idx, item in enumerate(data):
-            if not isinstance(item, (list, tuple)) or len(item) != 3:
-                raise ValueError(f"Tile at index {idx} must be a 3-element list/tuple, got: {item}")
+            if not isinstance(item, (list, tuple)) or len(item) not in (3, 4):
+                raise ValueError(f"Tile at index {idx} must be a 3- or 4-element list/tuple, got: {item}")
             try:
                 z, x, y = int(item[0]), int(item[1]), int(item[2])
+                feature_count = int(item[3]) if len(item) == 4 else 1
             except Exception as exc:
                 raise ValueError(f"Tile at index {idx} contains non-integer values: {item}") from exc
-            tiles.append((z, x, y))
+            tiles.append((z, x, y, feature_count))
 
-        return (tiles * ((number_of_tiles // len(tiles)) + 1))[:number_of_tiles]
+        return tiles
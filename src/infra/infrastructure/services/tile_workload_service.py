@@ -0,0 +1,164 @@
+import hashlib
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from src import Config
+from src.application.common import logger
+from src.application.contracts import ITileWorkloadService, ITileService
+from src.application.dtos import TileTrace
+
+TRACE_MAGIC: bytes = b"DTWT"
+TRACE_VERSION: int = 1
+TRACE_HEADER: struct.Struct = struct.Struct("<4sHqI")
+TRACE_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("session_ids", "<u4"),
+    ("z", "u1"),
+    ("x", "<u4"),
+    ("y", "<u4"),
+)
+PAN_DIRECTIONS: tuple[tuple[int, int], ...] = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class TileWorkloadService(ITileWorkloadService):
+    __tile_service: ITileService
+
+    def __init__(self, tile_service: ITileService) -> None:
+        self.__tile_service = tile_service
+
+    def generate_trace(self, number_of_requests: int, seed: int) -> TileTrace:
+        tile_counts = self.__tile_service.load_tile_counts()
+        weights = self.__get_zipf_weights(
+            counts=np.array([count for *_, count in tile_counts], dtype=np.float64),
+            exponent=Config.TILE_WORKLOAD_ZIPF_EXPONENT
+        )
+
+        rng = np.random.default_rng(seed)
+        zoom_levels = Config.TILE_WORKLOAD_ZOOM_LEVELS
+        min_zoom, max_zoom = min(zoom_levels), max(zoom_levels)
+
+        session_ids: list[int] = []
+        requested_tiles: list[tuple[int, int, int]] = []
+        session_id = 0
+
+        while len(requested_tiles) < number_of_requests:
+            start_z, start_x, start_y, _ = tile_counts[rng.choice(len(tile_counts), p=weights)]
+            center_x = (start_x + 0.5) / (1 << start_z)
+            center_y = (start_y + 0.5) / (1 << start_z)
+            z = int(rng.choice(zoom_levels))
+            visible_tiles: set[tuple[int, int, int]] = set()
+
+            for _ in range(int(rng.geometric(1 / Config.TILE_WORKLOAD_MEAN_SESSION_VIEWS))):
+                viewport_tiles = self.__get_viewport_tiles(z=z, center_x=center_x, center_y=center_y)
+
+                # Tiles still on screen from the previous view are not requested again
+                new_tiles = [tile for tile in viewport_tiles if tile not in visible_tiles]
+                requested_tiles.extend(new_tiles)
+                session_ids.extend([session_id] * len(new_tiles))
+                visible_tiles = set(viewport_tiles)
+
+                if rng.random() < Config.TILE_WORKLOAD_PAN_PROBABILITY:
+                    dx, dy = PAN_DIRECTIONS[rng.integers(len(PAN_DIRECTIONS))]
+                    center_x = min(max(center_x + dx / (1 << z), 0.0), np.nextafter(1.0, 0.0))
+                    center_y = min(max(center_y + dy / (1 << z), 0.0), np.nextafter(1.0, 0.0))
+                else:
+                    z = min(max(z + int(rng.choice((-1, 1))), min_zoom), max_zoom)
+
+            session_id += 1
+
+        tiles = np.array(requested_tiles[:number_of_requests], dtype=np.int64).reshape(-1, 3)
+        trace = TileTrace(
+            seed=seed,
+            session_ids=np.array(session_ids[:number_of_requests], dtype=np.uint32),
+            z=tiles[:, 0].astype(np.uint8),
+            x=tiles[:, 1].astype(np.uint32),
+            y=tiles[:, 2].astype(np.uint32),
+        )
+        logger.info(f"Generated tile trace: {trace.to_json()}")
+        return trace
+
+    def write_trace(self, trace: TileTrace, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, "wb") as f:
+            f.write(TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, trace.seed, trace.requests))
+            for column_name, dtype in TRACE_COLUMNS:
+                f.write(np.asarray(getattr(trace, column_name), dtype=dtype).tobytes())
+
+        logger.info(f"Tile trace with {trace.requests} requests saved to '{path}'")
+
+    def read_trace(self, path: Path) -> TileTrace:
+        data = path.read_bytes()
+        if len(data) < TRACE_HEADER.size:
+            raise ValueError(f"Tile trace at '{path}' is truncated: {len(data)} bytes")
+
+        magic, version, seed, requests = TRACE_HEADER.unpack_from(data)
+        if magic != TRACE_MAGIC:
+            raise ValueError(f"File at '{path}' is not a tile trace")
+        if version != TRACE_VERSION:
+            raise ValueError(f"Tile trace at '{path}' has unsupported version {version}")
+
+        expected_length = TRACE_HEADER.size + requests * sum(np.dtype(dtype).itemsize for _, dtype in TRACE_COLUMNS)
+        if len(data) != expected_length:
+            raise ValueError(f"Tile trace at '{path}' has {len(data)} bytes, expected {expected_length}")
+
+        columns: dict[str, np.ndarray] = {}
+        offset = TRACE_HEADER.size
+        for column_name, dtype in TRACE_COLUMNS:
+            columns[column_name] = np.frombuffer(data, dtype=dtype, count=requests, offset=offset)
+            offset += requests * np.dtype(dtype).itemsize
+
+        return TileTrace(seed=seed, **columns)
+
+    def load_trace(self, number_of_requests: int, seed: int) -> TileTrace:
+        # The file name carries a digest of the inputs, so a changed tile list or workload config
+        # generates a new trace instead of replaying a stale one
+        input_digest = self.__get_input_digest()
+        path = Config.TILE_WORKLOAD_TRACE_DIR / f"trace_seed{seed}_{number_of_requests}_{input_digest}.bin"
+        if path.exists():
+            logger.info(f"Replaying tile trace from '{path}'")
+            return self.read_trace(path=path)
+
+        trace = self.generate_trace(number_of_requests=number_of_requests, seed=seed)
+        self.write_trace(trace=trace, path=path)
+        return trace
+
+    @staticmethod
+    def __get_input_digest() -> str:
+        workload_config = (
+            TRACE_VERSION,
+            Config.TILE_WORKLOAD_ZIPF_EXPONENT,
+            Config.TILE_WORKLOAD_ZOOM_LEVELS,
+            Config.TILE_WORKLOAD_VIEWPORT_TILES,
+            Config.TILE_WORKLOAD_MEAN_SESSION_VIEWS,
+            Config.TILE_WORKLOAD_PAN_PROBABILITY,
+        )
+
+        digest = hashlib.sha256(Config.MVT_TILES_PATH.read_bytes())
+        digest.update(repr(workload_config).encode("utf-8"))
+        return digest.hexdigest()[:12]
+
+    @staticmethod
+    def __get_zipf_weights(counts: np.ndarray, exponent: float) -> np.ndarray:
+        ranks = np.empty(len(counts), dtype=np.float64)
+        ranks[np.argsort(-counts, kind="stable")] = np.arange(1, len(counts) + 1)
+        weights = 1.0 / ranks ** exponent
+        return weights / weights.sum()
+
+    @staticmethod
+    def __get_viewport_tiles(z: int, center_x: float, center_y: float) -> list[tuple[int, int, int]]:
+        columns, rows = Config.TILE_WORKLOAD_VIEWPORT_TILES
+        tile_count = 1 << z
+        center_tile_x = int(center_x * tile_count)
+        center_tile_y = int(center_y * tile_count)
+
+        tiles = [
+            (z, x, y)
+            for x in range(center_tile_x - columns // 2, center_tile_x - columns // 2 + columns)
+            for y in range(center_tile_y - rows // 2, center_tile_y - rows // 2 + rows)
+            if 0 <= x < tile_count and 0 <= y < tile_count
+        ]
+
+        # Map clients load the tiles closest to the center of the viewport first
+        return sorted(tiles, key=lambda tile: (tile[1] - center_tile_x) ** 2 + (tile[2] - center_tile_y) ** 2)
@@ -1,35 +1,79 @@
-﻿import geopandas as gpd
-import pandas as pd
-import pygeohash as phg
-from duckdb import DuckDBPyConnection
+﻿from functools import reduce
+from typing import Iterable, Iterator
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from pyproj import Transformer
 
 from src import Config
 from src.application.contracts import IVectorService
 from src.domain.enums import EPSGCode
 
+OPTIONAL_COLUMNS: tuple[str, ...] = ("feature_update_time", "feature_capture_time")
+LEADING_COLUMNS: tuple[str, ...] = ("external_id", "geometry", "building_id")
+GEOHASH_ALPHABET: np.ndarray = np.array(list("0123456789bcdefghjkmnpqrstuvwxyz"))
 
-class VectorService(IVectorService):
-    __db_context: DuckDBPyConnection
 
-    def __init__(self, db_context: DuckDBPyConnection):
-        self.__db_context = db_context
+def encode_geohash(latitudes: np.ndarray, longitudes: np.ndarray, precision: int) -> np.ndarray:
+    total_bits = 5 * precision
+    longitude_bits = (total_bits + 1) // 2
+    latitude_bits = total_bits // 2
+    longitude_cells = _get_geohash_cells(values=longitudes, lower=-180.0, upper=180.0, bits=longitude_bits)
+    latitude_cells = _get_geohash_cells(values=latitudes, lower=-90.0, upper=90.0, bits=latitude_bits)
+
+    # Geohash interleaves the bits starting with longitude, most significant first
+    code = np.zeros(len(longitude_cells), dtype=np.int64)
+    for bit in range(total_bits):
+        if bit % 2 == 0:
+            code = (code << 1) | ((longitude_cells >> (longitude_bits - 1 - bit // 2)) & 1)
+        else:
+            code = (code << 1) | ((latitude_cells >> (latitude_bits - 1 - bit // 2)) & 1)
+
+    characters = [GEOHASH_ALPHABET[(code >> (5 * (precision - 1 - i))) & 31] for i in range(precision)]
+    return reduce(np.char.add, characters)
+
+
+def _get_geohash_cells(values: np.ndarray, lower: float, upper: float, bits: int) -> np.ndarray:
+    # Values on a cell edge belong to the upper cell like in pygeohash, and the upper bound to the last cell
+    cell_count = 1 << bits
+    cell_size = (upper - lower) / cell_count
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=lower)
+    cells = np.clip(np.floor((values - lower) / cell_size), 0, cell_count - 1)
+
+    # The edges are exact binary fractions, so comparing against them undoes rounding across an edge
+    cells -= values < lower + cells * cell_size
+    cells += (cells < cell_count - 1) & (values >= lower + (cells + 1) * cell_size)
+    return cells.astype(np.int64)
 
+
+class VectorService(IVectorService):
     def compute_partition_key(self, dataframe: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
         dataframe = dataframe.copy()
-        centroids = (
-            dataframe.geometry
-            .to_crs(epsg=EPSGCode.LAEA_EUROPE.value)
-            .centroid
-            .to_crs(epsg=EPSGCode.WGS84.value)
-        )
+        longitudes, latitudes = VectorService.__get_equal_area_centroids(dataframe.geometry)
 
-        dataframe["partition_key"] = [
-            phg.encode(lat, lon, precision=Config.PARTITION_RESOLUTION)
-            for lat, lon in zip(centroids.y.values, centroids.x.values)
-        ]
+        dataframe["partition_key"] = encode_geohash(
+            latitudes=latitudes,
+            longitudes=longitudes,
+            precision=Config.PARTITION_RESOLUTION
+        )
 
         return dataframe
 
+    @staticmethod
+    def __get_equal_area_centroids(geometries: gpd.GeoSeries) -> tuple[np.ndarray, np.ndarray]:
+        to_equal_area = Transformer.from_crs(geometries.crs, EPSGCode.LAEA_EUROPE.value, always_xy=True)
+        to_wgs84 = Transformer.from_crs(EPSGCode.LAEA_EUROPE.value, EPSGCode.WGS84.value, always_xy=True)
+
+        # Only the vertex arrays are projected to LAEA, and only the centroids are projected back
+        projected = shapely.transform(
+            np.asarray(geometries),
+            lambda coordinates: np.column_stack(to_equal_area.transform(coordinates[:, 0], coordinates[:, 1]))
+        )
+        centroids = shapely.centroid(projected)
+
+        return to_wgs84.transform(shapely.get_x(centroids), shapely.get_y(centroids))
+
     def partition_dataframe(self, dataframe: gpd.GeoDataFrame) -> list[gpd.GeoDataFrame]:
         dataframe = self.compute_partition_key(dataframe)
 
@@ -40,65 +84,50 @@ class VectorService(IVectorService):
 
         return partitions
 
-    def clip_dataframes_to_wkb(
+    def assign_dataframes_to_regions(
             self,
-            dataframes: list[gpd.GeoDataFrame],
-            wkb: bytes,
+            dataframes: Iterable[gpd.GeoDataFrame],
+            region_wkbs: dict[str, bytes],
             epsg_code: EPSGCode
-    ) -> gpd.GeoDataFrame:
-        clipped_dataframes: list[pd.DataFrame] = []
+    ) -> Iterator[tuple[str, gpd.GeoDataFrame]]:
+        region_ids = list(region_wkbs.keys())
+        region_geometries = shapely.from_wkb([region_wkbs[region_id] for region_id in region_ids])
 
-        OPTIONAL_COLS = ["feature_update_time", "feature_capture_time"]
-
-        for i, gdf in enumerate(dataframes):
-            if gdf.empty:
+        for dataframe in dataframes:
+            if dataframe.empty:
                 continue
 
-            gdf = gdf.copy()
-            gdf["geometry"] = gdf["geometry"].to_wkb()
-            view_name = f"gdf_{i}"
-            self.__db_context.register(view_name, gdf)
-
-            table_info = self.__db_context.execute(
-                f"PRAGMA table_info('{view_name}')"
-            ).fetchdf()
-
-            cols = set(table_info["name"].tolist())
-
-            select_parts = [
-                "external_id",
-                "geometry",
-                "building_id",
-                "* EXCLUDE(external_id, geometry, building_id)"
-            ]
-
-            for col in OPTIONAL_COLS:
-                if col in cols:
-                    select_parts.append(f"{col} AS {col}")
-                else:
-                    select_parts.append(f"NULL AS {col}")
-
-            select_clause = ",\n".join(select_parts)
-
-            sql = f"""
-                SELECT
-                    {select_clause}
-                FROM {view_name}
-                WHERE ST_Intersects(
-                    ST_GeomFromWKB(geometry),
-                    ST_GeomFromWKB(?)
-                )
-            """
+            dataframe = VectorService.__align_columns(dataframe)
+
+            # The features are indexed rather than the regions, so each large region polygon is the query
+            # geometry and gets prepared once per batch instead of being tested unprepared per feature
+            region_index, feature_index = shapely.STRtree(np.asarray(dataframe.geometry)).query(
+                region_geometries,
+                predicate="intersects"
+            )
 
-            clipped_gdf = self.__db_context.execute(sql, [wkb]).fetchdf()
+            if len(region_index) == 0:
+                continue
 
-            clipped_dataframes.append(clipped_gdf)
-            self.__db_context.unregister(view_name)
+            order = np.argsort(region_index, kind="stable")
+            region_index, feature_index = region_index[order], feature_index[order]
+            boundaries = np.flatnonzero(np.diff(region_index)) + 1
 
-        df = pd.concat(clipped_dataframes, ignore_index=True)
-        df["geometry"] = df["geometry"].apply(
-            lambda x: bytes(x) if isinstance(x, (bytearray, memoryview)) else x
-        )
-        df["geometry"] = gpd.GeoSeries.from_wkb(df["geometry"])
+            for start, region_features in zip(np.r_[0, boundaries], np.split(feature_index, boundaries)):
+                yield region_ids[region_index[start]], dataframe.iloc[np.sort(region_features)].set_crs(
+                    epsg=epsg_code.value,
+                    allow_override=True
+                )
 
-        return gpd.GeoDataFrame(df, geometry="geometry", crs=f"EPSG:{epsg_code.value}")
+    @staticmethod
+    def __align_columns(dataframe: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        dataframe = dataframe.copy()
+        for column in OPTIONAL_COLUMNS:
+            if column not in dataframe.columns:
+                dataframe[column] = None
+
+        other_columns = [
+            column for column in dataframe.columns
+            if column not in LEADING_COLUMNS and column not in OPTIONAL_COLUMNS
+        ]
+        return dataframe[[*LEADING_COLUMNS, *other_columns, *OPTIONAL_COLUMNS]]
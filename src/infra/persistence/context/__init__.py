@@ -1,3 +1,6 @@
-﻿from .duckdb import create_duckdb_context
+﻿from .duckdb import create_duckdb_context, apply_duckdb_settings
 from .azure_blob_storage import create_blob_storage_context
 from .postgres_db_context import create_postgres_db_context
+from .postgres_async_pool import create_postgres_async_pool
+from .azure_filesystem import create_azure_filesystem_context
+from .pmtiles_reader import CachedPMTilesReader, PMTilesDirectoryCache, merge_byte_ranges
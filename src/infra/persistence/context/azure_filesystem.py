@@ -0,0 +1,57 @@
+import time
+
+from adlfs import AzureBlobFileSystem
+
+from src import Config
+from src.application.common.remote_io_metrics_collector import RemoteIOMetricsCollector
+
+
+class InstrumentedAzureBlobFileSystem(AzureBlobFileSystem):
+    """
+    `adlfs` filesystem that reports every range request to a `RemoteIOMetricsCollector`.
+    """
+    protocol = "abfs"
+
+    def __init__(self, metrics_collector: RemoteIOMetricsCollector, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.metrics_collector = metrics_collector
+
+    def _open(self, path, mode="rb", **kwargs):
+        file = super()._open(path, mode=mode, **kwargs)
+        if "r" not in mode:
+            return file
+
+        fetch_range = file._fetch_range
+        metrics_collector = self.metrics_collector
+
+        def instrumented_fetch_range(start, end, *args, **fetch_kwargs):
+            started_at = time.perf_counter()
+            data = fetch_range(start, end, *args, **fetch_kwargs)
+            metrics_collector.record(bytes_read=len(data), latency_seconds=time.perf_counter() - started_at)
+            return data
+
+        # The read cache captures the bound fetcher on construction, so both references are replaced
+        file._fetch_range = instrumented_fetch_range
+        if getattr(file, "cache", None) is not None:
+            file.cache.fetcher = instrumented_fetch_range
+
+        return file
+
+
+def create_azure_filesystem_context(metrics_collector: RemoteIOMetricsCollector) -> InstrumentedAzureBlobFileSystem:
+    """
+    Creates an `adlfs` filesystem for the configured storage account, used by the fsspec and Arrow
+    remote I/O backends. Block size and concurrency are taken from `Config.ADLFS_BLOCK_SIZE` and
+    `Config.ADLFS_MAX_CONCURRENCY`, and every range request is reported to `metrics_collector`.
+    :param metrics_collector: Collector receiving request count, bytes and latency per range request.
+    :return: An instrumented `AzureBlobFileSystem` registered under the `abfs` protocol.
+    :rtype: InstrumentedAzureBlobFileSystem
+    """
+    return InstrumentedAzureBlobFileSystem(
+        metrics_collector=metrics_collector,
+        account_name=Config.AZURE_BLOB_STORAGE_ACCOUNT_NAME,
+        connection_string=Config.AZURE_BLOB_STORAGE_CONNECTION_STRING,
+        blocksize=Config.ADLFS_BLOCK_SIZE,
+        max_concurrency=Config.ADLFS_MAX_CONCURRENCY,
+        skip_instance_cache=True,
+    )
@@ -1,16 +1,26 @@
 ﻿import platform
+from pathlib import Path
 
 import duckdb
+from fsspec import AbstractFileSystem
 
 from src import Config
+from src.application.dtos import DuckDBSettings
 
 
-def create_duckdb_context() -> duckdb.DuckDBPyConnection:
+def create_duckdb_context(
+        settings: DuckDBSettings | None = None,
+        filesystem: AbstractFileSystem | None = None
+) -> duckdb.DuckDBPyConnection:
     """
     Creates an in-memory DuckDB connection configured for the project. Installs and loads the
     `spatial` and `azure` extensions, registers an Azure secret bound to the configured storage
     account name, and switches the Azure transport to curl on Linux to avoid the default HTTP client
-    issues.
+    issues. If `settings` is given, the resource settings of the DuckDB profile are applied last. If
+    `filesystem` is given, it is registered with DuckDB so that paths using its protocol (e.g.
+    `abfs://`) are read through it instead of the azure extension.
+    :param settings: Optional DuckDB resource settings resolved for the current run.
+    :param filesystem: Optional fsspec filesystem to register on the connection.
     :return: A DuckDB connection ready for spatial queries against Azure Blob Storage.
     :rtype: duckdb.DuckDBPyConnection
     """
@@ -31,4 +41,46 @@ def create_duckdb_context() -> duckdb.DuckDBPyConnection:
     if platform.system() == "Linux":
         db_context.execute("SET azure_transport_option_type = curl")
 
+    if filesystem is not None:
+        db_context.register_filesystem(filesystem)
+
+    if settings is not None:
+        apply_duckdb_settings(db_context=db_context, settings=settings)
+
     return db_context
+
+
+def apply_duckdb_settings(db_context: duckdb.DuckDBPyConnection, settings: DuckDBSettings) -> None:
+    """
+    Applies the resource settings of a DuckDB profile to an existing connection. Settings that are
+    None are left untouched so DuckDB keeps its own defaults for them.
+    :param db_context: DuckDB connection to configure.
+    :param settings: DuckDB resource settings resolved for the current run.
+    :return: None
+    """
+    if settings.threads is not None:
+        db_context.execute(f"SET threads = {int(settings.threads)}")
+
+    if settings.memory_limit_gb is not None:
+        db_context.execute(f"SET memory_limit = '{float(settings.memory_limit_gb)}GB'")
+
+    if settings.preserve_insertion_order is not None:
+        db_context.execute(f"SET preserve_insertion_order = {str(bool(settings.preserve_insertion_order)).lower()}")
+
+    if settings.temp_directory is not None:
+        Path(settings.temp_directory).mkdir(parents=True, exist_ok=True)
+        temp_directory = settings.temp_directory.replace("'", "''")
+        db_context.execute(f"SET temp_directory = '{temp_directory}'")
+
+    if settings.max_temp_directory_size_gb is not None:
+        db_context.execute(f"SET max_temp_directory_size = '{float(settings.max_temp_directory_size_gb)}GB'")
+
+    if settings.azure_read_transfer_concurrency is not None:
+        db_context.execute(
+            f"SET azure_read_transfer_concurrency = {int(settings.azure_read_transfer_concurrency)}"
+        )
+
+    if settings.azure_read_transfer_chunk_size is not None:
+        db_context.execute(
+            f"SET azure_read_transfer_chunk_size = {int(settings.azure_read_transfer_chunk_size)}"
+        )
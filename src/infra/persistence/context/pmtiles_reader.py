@@ -0,0 +1,167 @@
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from pmtiles.reader import Reader
+from pmtiles.tile import Entry, HeaderDict, deserialize_directory, deserialize_header, find_tile, zxy_to_tileid
+
+from src.application.dtos import PMTilesReaderStats
+
+PMTILES_HEADER_LENGTH: int = 127
+PMTILES_MAX_DIRECTORY_DEPTH: int = 4
+
+
+class PMTilesDirectoryCache:
+    """
+    Thread-safe LRU cache of deserialized PMTiles directories keyed by their byte range. A cache with
+    `max_entries` set to 0 stores nothing, which reproduces a client that re-reads every directory.
+    """
+    __max_entries: int
+    __directories: OrderedDict[tuple[int, int], list[Entry]]
+    __lock: threading.Lock
+
+    def __init__(self, max_entries: int) -> None:
+        self.__max_entries = max_entries
+        self.__directories = OrderedDict()
+        self.__lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, offset: int, length: int) -> list[Entry] | None:
+        with self.__lock:
+            directory = self.__directories.get((offset, length))
+            if directory is None:
+                self.misses += 1
+                return None
+
+            self.__directories.move_to_end((offset, length))
+            self.hits += 1
+            return directory
+
+    def contains(self, offset: int, length: int) -> bool:
+        with self.__lock:
+            return (offset, length) in self.__directories
+
+    def put(self, offset: int, length: int, directory: list[Entry]) -> None:
+        if self.__max_entries <= 0:
+            return
+
+        with self.__lock:
+            self.__directories[(offset, length)] = directory
+            self.__directories.move_to_end((offset, length))
+            while len(self.__directories) > self.__max_entries:
+                self.__directories.popitem(last=False)
+
+
+def merge_byte_ranges(
+        ranges: list[tuple[int, int]],
+        max_gap_bytes: int,
+        max_merged_bytes: int
+) -> list[tuple[int, int, list[tuple[int, int]]]]:
+    """
+    Merges byte ranges that are adjacent, or separated by at most `max_gap_bytes`, into larger
+    ranges of at most `max_merged_bytes`. Duplicate ranges are read once.
+    :param ranges: Byte ranges as (offset, length) tuples.
+    :param max_gap_bytes: Largest gap between two ranges that is read instead of splitting the request.
+    :param max_merged_bytes: Largest length of a merged range. A single range longer than this is kept as is.
+    :return: Merged ranges as (offset, length, member ranges) tuples, ordered by offset.
+    :rtype: list[tuple[int, int, list[tuple[int, int]]]]
+    """
+    merged: list[tuple[int, int, list[tuple[int, int]]]] = []
+
+    for offset, length in sorted(set(ranges)):
+        if merged:
+            merged_offset, merged_length, members = merged[-1]
+            merged_end = merged_offset + merged_length
+            new_end = max(merged_end, offset + length)
+            if offset <= merged_end + max_gap_bytes and new_end - merged_offset <= max_merged_bytes:
+                members.append((offset, length))
+                merged[-1] = (merged_offset, new_end - merged_offset, members)
+                continue
+
+        merged.append((offset, length, [(offset, length)]))
+
+    return merged
+
+
+class CachedPMTilesReader(Reader):
+    """
+    PMTiles reader that keeps the header and an LRU cache of deserialized directories, so repeated
+    reads only fetch tile data. With `directory_cache_entries` set to 0 neither the header nor any
+    directory is kept. Range requests, bytes and cache hits are counted.
+    """
+    __fetch_bytes: Callable[[int, int], bytes]
+    __directory_cache: PMTilesDirectoryCache
+    __cache_header: bool
+    __header: HeaderDict | None
+    __lock: threading.Lock
+
+    def __init__(self, get_bytes: Callable[[int, int], bytes], directory_cache_entries: int) -> None:
+        super().__init__(self.__get_counted_bytes)
+        self.__fetch_bytes = get_bytes
+        self.__directory_cache = PMTilesDirectoryCache(max_entries=directory_cache_entries)
+        self.__cache_header = directory_cache_entries > 0
+        self.__header = None
+        self.__lock = threading.Lock()
+
+        self.__tiles_read = 0
+        self.__range_requests = 0
+        self.__bytes_read = 0
+
+    def header(self) -> HeaderDict:
+        if self.__header is not None:
+            return self.__header
+
+        header = deserialize_header(self.get_bytes(0, PMTILES_HEADER_LENGTH))
+        if self.__cache_header:
+            self.__header = header
+        return header
+
+    def get(self, z: int, x: int, y: int) -> bytes | None:
+        with self.__lock:
+            self.__tiles_read += 1
+
+        header = self.header()
+        entry = self.__find_entry(header=header, tile_id=zxy_to_tileid(z, x, y))
+        if entry is None:
+            return None
+
+        return self.get_bytes(header["tile_data_offset"] + entry.offset, entry.length)
+
+    def get_stats(self) -> PMTilesReaderStats:
+        return PMTilesReaderStats(
+            tiles_read=self.__tiles_read,
+            range_requests=self.__range_requests,
+            bytes_read=self.__bytes_read,
+            merged_requests=0,
+            directory_cache_hits=self.__directory_cache.hits,
+            directory_cache_misses=self.__directory_cache.misses,
+        )
+
+    def __find_entry(self, header: HeaderDict, tile_id: int) -> Entry | None:
+        offset, length = header["root_offset"], header["root_length"]
+
+        for _ in range(PMTILES_MAX_DIRECTORY_DEPTH):
+            entry = find_tile(self.__get_directory(offset, length), tile_id)
+            if entry is None:
+                return None
+            if entry.run_length > 0:
+                return entry
+            offset, length = header["leaf_directory_offset"] + entry.offset, entry.length
+
+        return None
+
+    def __get_directory(self, offset: int, length: int) -> list[Entry]:
+        directory = self.__directory_cache.get(offset, length)
+        if directory is None:
+            directory = deserialize_directory(self.get_bytes(offset, length))
+            self.__directory_cache.put(offset, length, directory)
+        return directory
+
+    def __get_counted_bytes(self, offset: int, length: int) -> bytes:
+        data = self.__fetch_bytes(offset, length)
+        with self.__lock:
+            self.__range_requests += 1
+            self.__bytes_read += len(data)
+        return data
@@ -0,0 +1,28 @@
+import asyncpg
+
+from src import Config
+
+
+async def create_postgres_async_pool() -> asyncpg.Pool:
+    """
+    Creates an asyncpg connection pool for the configured PostgreSQL Flexible Server using SSL. The
+    pool keeps between `Config.POSTGRES_ASYNC_POOL_MIN_SIZE` and `Config.POSTGRES_ASYNC_POOL_MAX_SIZE`
+    connections open. Every connection keeps a statement cache of
+    `Config.POSTGRES_ASYNC_STATEMENT_CACHE_SIZE` entries, so repeated queries run as server-side
+    prepared statements after their first execution. Must be awaited from the event loop that will
+    use the pool.
+    :return: asyncpg pool connected to the PostgreSQL/PostGIS database.
+    :rtype: asyncpg.Pool
+    """
+    return await asyncpg.create_pool(
+        user=Config.POSTGRES_USERNAME,
+        password=Config.POSTGRES_PASSWORD,
+        host=Config.POSTGRES_HOST,
+        port=Config.POSTGRES_PORT,
+        database=Config.POSTGRES_DB,
+        ssl="require",
+        min_size=Config.POSTGRES_ASYNC_POOL_MIN_SIZE,
+        max_size=Config.POSTGRES_ASYNC_POOL_MAX_SIZE,
+        statement_cache_size=Config.POSTGRES_ASYNC_STATEMENT_CACHE_SIZE,
+        command_timeout=Config.POSTGRES_ASYNC_COMMAND_TIMEOUT_SECONDS,
+    )
@@ -7,7 +7,8 @@ def create_postgres_db_context() -> Engine:
     """
     Creates a SQLAlchemy engine for the configured PostgreSQL Flexible Server using SSL. Ensures
     the `postgis` extension exists in the target database before returning the engine. The engine
-    enables `pool_pre_ping` so stale connections are detected before use.
+    enables `pool_pre_ping` so stale connections are detected before use, and its pool is sized by
+    `Config.POSTGRES_POOL_SIZE` and `Config.POSTGRES_MAX_OVERFLOW`.
     :return: SQLAlchemy engine connected to the PostgreSQL/PostGIS database.
     :rtype: Engine
     """
@@ -21,6 +22,8 @@ def create_postgres_db_context() -> Engine:
         conn_str,
         future=True,
         pool_pre_ping=True,
+        pool_size=Config.POSTGRES_POOL_SIZE,
+        max_overflow=Config.POSTGRES_MAX_OVERFLOW,
     )
 
     with engine.connect() as conn:
@@ -1,19 +1,41 @@
-﻿from src.infra.infrastructure import Containers
-
-
-def initialize_dependencies(run_id: str, benchmark_run: int) -> None:
+﻿from src import Config
+from src.infra.infrastructure import Containers
+
+
+def initialize_dependencies(
+        run_id: str,
+        benchmark_run: int,
+        script_id: str | None = None,
+        duckdb_profile: str | None = None,
+        remote_io_backend: str | None = None,
+        vmt_db_driver: str | None = None,
+        vmt_tile_cache_mode: str | None = None
+) -> None:
     """
     Initializes the dependency-injection container and wires it into every module that resolves
     services via `@inject`. Sets the runtime identifiers `run_id` and `benchmark_run` as DI
-    configuration so they can be injected into the monitoring utilities.
+    configuration so they can be injected into the monitoring utilities. `script_id` and
+    `duckdb_profile` select the DuckDB resource settings applied to the shared DuckDB connection, and
+    `remote_io_backend` selects how DuckDB reads GeoParquet from blob storage. `vmt_db_driver` selects
+    the database driver and `vmt_tile_cache_mode` the tile cache of the MVT tile server.
     :param run_id: Identifier for the current benchmark run, propagated to all monitored entrypoints.
     :param benchmark_run: Iteration counter for the run within the broader benchmark suite.
+    :param script_id: Script identifier used to look up the container resources in the benchmark YAML file.
+    :param duckdb_profile: DuckDB profile name. Defaults to `Config.DUCKDB_PROFILE`.
+    :param remote_io_backend: Remote I/O backend name. Defaults to `Config.REMOTE_IO_BACKEND`.
+    :param vmt_db_driver: MVT database driver name. Defaults to `Config.VMT_DB_DRIVER`.
+    :param vmt_tile_cache_mode: MVT tile cache mode. Defaults to `Config.VMT_TILE_CACHE_MODE`.
     :return: None
     """
     container = Containers()
 
     container.config.run_id.from_value(run_id)
     container.config.benchmark_run.from_value(benchmark_run)
+    container.config.script_id.from_value(script_id)
+    container.config.duckdb_profile.from_value(duckdb_profile or Config.DUCKDB_PROFILE)
+    container.config.remote_io_backend.from_value(remote_io_backend or Config.REMOTE_IO_BACKEND)
+    container.config.vmt_db_driver.from_value(vmt_db_driver or Config.VMT_DB_DRIVER)
+    container.config.vmt_tile_cache_mode.from_value(vmt_tile_cache_mode or Config.VMT_TILE_CACHE_MODE)
 
     container.wire(
         modules=[
@@ -66,6 +88,32 @@ def initialize_dependencies(run_id: str, benchmark_run: int) -> None:
             "src.presentation.entrypoints.national_scale_spatial_join_databricks_4_nodes",
             "src.presentation.entrypoints.national_scale_spatial_join_databricks_8_nodes",
 
+            "src.presentation.entrypoints.national_scale_spatial_join_duckdb_out_of_core",
+
+            "src.presentation.entrypoints.national_scale_spatial_join_duckdb_pruned",
+
+            "src.presentation.entrypoints.db_scan_blob_storage_parallel",
+
+            "src.presentation.entrypoints.spatial_aggregation_grid_duckdb_parallel",
+
+            "src.presentation.entrypoints.vector_tiles_load_vmt_sync",
+
+            "src.presentation.entrypoints.vector_tiles_load_vmt_async",
+
+            "src.presentation.entrypoints.vector_tiles_single_tile_static_mvt",
+
+            "src.presentation.entrypoints.vector_tiles_100k_static_mvt",
+
+            "src.presentation.entrypoints.conflation_iou_sql",
+
+            "src.presentation.entrypoints.conflation_iou_strtree",
+
+            "src.presentation.entrypoints.partition_key_vectorized",
+
+            "src.presentation.entrypoints.fkb_polygonization_tiled",
+
+            "src.presentation.entrypoints.fkb_polygonization_global",
+
             "src.presentation.entrypoints.setup_benchmarking_framework",
 
             "src.presentation.endpoints.tile_server"
@@ -1,10 +1,13 @@
 ﻿from contextlib import asynccontextmanager
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import FastAPI, HTTPException, Response
+from fastapi import FastAPI, HTTPException, Request, Response
 from starlette.middleware.cors import CORSMiddleware
 
-from src.application.contracts import IMVTService
+from src import Config
+from src.application.common import logger
+from src.application.contracts import IMVTService, ITileCacheService
+from src.domain.enums import TileCacheMode
 from src.infra.infrastructure import Containers
 from src.presentation.configuration import initialize_dependencies
 
@@ -14,11 +17,32 @@ async def _db_call(z: int, x: int, y: int, mvt_service: IMVTService = Provide[Co
     return await mvt_service.get_mvt_tiles(z=z, x=x, y=y)
 
 
+@inject
+def _get_cache_service(
+        tile_cache_service: ITileCacheService = Provide[Containers.tile_cache_service]
+) -> ITileCacheService:
+    return tile_cache_service
+
+
+@inject
+async def _close_db(mvt_service: IMVTService = Provide[Containers.mvt_service]) -> None:
+    await mvt_service.close()
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
-    """FastAPI lifespan context that initializes the DI container before serving requests."""
+    """
+    FastAPI lifespan context that initializes the DI container before serving requests and releases
+    the database connections on shutdown. Runs once per uvicorn worker process, so every worker owns
+    its own connection pool.
+    """
     initialize_dependencies(run_id="not-needed", benchmark_run=1)
+    logger.info(
+        f"Serving MVT tiles with the '{Config.VMT_DB_DRIVER}' database driver "
+        f"and the '{Config.VMT_TILE_CACHE_MODE}' tile cache"
+    )
     yield
+    await _close_db()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -28,35 +52,79 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Cache"],
 )
 
 
+@app.get("/tiles/stats")
+async def get_tile_cache_stats():
+    """
+    HTTP GET ``/tiles/stats``. Returns the tile cache counters summed over all worker processes of the
+    server: hits, misses, coalesced misses, ``304`` responses, cache size, hit ratio and mean hit and
+    miss latency.
+    :return: Tile cache statistics as JSON.
+    :rtype: dict
+    """
+    return _get_cache_service().get_stats().to_dict()
+
+
+@app.post("/tiles/stats/reset")
+async def reset_tile_cache_stats():
+    """
+    HTTP POST ``/tiles/stats/reset``. Resets the tile cache counters of all worker processes of the
+    server. Cached tiles are kept.
+    :return: Tile cache statistics after the reset as JSON.
+    :rtype: dict
+    """
+    tile_cache_service = _get_cache_service()
+    tile_cache_service.reset_stats()
+    return tile_cache_service.get_stats().to_dict()
+
+
 @app.get("/tiles/{z}/{x}/{y}")
-async def get_tiles(z: int, x: int, y: int):
+async def get_tiles(z: int, x: int, y: int, request: Request):
     """
     HTTP GET ``/tiles/{z}/{x}/{y}``. Returns the buildings MVT tile as
     ``application/x-protobuf`` bytes. Responds 400 for zoom levels outside [0, 22]
-    and 404 when no features intersect the tile. Caching headers are disabled.
+    and 404 when no features intersect the tile. Tiles are served through the tile
+    cache selected by ``VMT_TILE_CACHE_MODE``; every response carries an ``ETag`` and
+    an ``X-Cache`` header, and a matching ``If-None-Match`` header returns 304. With
+    the ``none`` cache mode caching headers are disabled, otherwise clients are asked
+    to revalidate.
     :param z: Tile zoom level (0-22).
     :param x: Tile X coordinate.
     :param y: Tile Y coordinate.
+    :param request: Incoming request, read for the ``If-None-Match`` header.
     :return: FastAPI Response carrying the MVT tile bytes.
     :rtype: Response
     """
     if z < 0 or z > 22:
         raise HTTPException(status_code=400, detail="Invalid zoom")
 
-    tile = await _db_call(z, x, y)
-    if not tile:
-        raise HTTPException(status_code=404, detail="Tile not found")
+    tile_cache_service = _get_cache_service()
+    tile = await tile_cache_service.get_tile(z=z, x=x, y=y, render=lambda: _db_call(z, x, y))
+    if not tile.content:
+        raise HTTPException(status_code=404, detail="Tile not found", headers={"X-Cache": tile.cache_status})
 
-    return Response(
-        content=tile,
-        media_type="application/x-protobuf",
-        headers={
-            "Content-Encoding": "identity",
+    headers = {
+        "Content-Encoding": "identity",
+        "ETag": tile.etag,
+        "X-Cache": tile.cache_status,
+    }
+    if Config.VMT_TILE_CACHE_MODE == TileCacheMode.NONE.value:
+        headers.update({
             "Cache-Control": "no-store, no-cache, must-revalidate, proxy-revalidate, max-age=0, s-maxage=0",
             "Pragma": "no-cache",
             "Expires": "0",
-        }
+        })
+    else:
+        headers["Cache-Control"] = "no-cache"
+
+    if tile_cache_service.is_not_modified(tile=tile, if_none_match=request.headers.get("If-None-Match")):
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=tile.content,
+        media_type="application/x-protobuf",
+        headers=headers
     )
@@ -31,3 +31,16 @@ from .national_scale_spatial_join_postgis import national_scale_spatial_join_pos
 from .national_scale_spatial_join_databricks_2_nodes import national_scale_spatial_join_databricks_2_nodes
 from .national_scale_spatial_join_databricks_4_nodes import national_scale_spatial_join_databricks_4_nodes
 from .national_scale_spatial_join_databricks_8_nodes import national_scale_spatial_join_databricks_8_nodes
+from .national_scale_spatial_join_duckdb_out_of_core import national_scale_spatial_join_duckdb_out_of_core
+from .national_scale_spatial_join_duckdb_pruned import national_scale_spatial_join_duckdb_pruned
+from .db_scan_blob_storage_parallel import db_scan_blob_storage_parallel
+from .spatial_aggregation_grid_duckdb_parallel import spatial_aggregation_grid_duckdb_parallel
+from .vector_tiles_load_vmt_sync import vector_tiles_load_vmt_sync
+from .vector_tiles_load_vmt_async import vector_tiles_load_vmt_async
+from .vector_tiles_single_tile_static_mvt import vector_tiles_single_tile_static_mvt
+from .vector_tiles_100k_static_mvt import vector_tiles_100k_static_mvt
+from .conflation_iou_sql import conflation_iou_sql
+from .conflation_iou_strtree import conflation_iou_strtree
+from .partition_key_vectorized import partition_key_vectorized
+from .fkb_polygonization_tiled import fkb_polygonization_tiled
+from .fkb_polygonization_global import fkb_polygonization_global
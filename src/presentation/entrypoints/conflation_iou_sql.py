@@ -0,0 +1,42 @@
+from dependency_injector.wiring import Provide, inject
+
+from src import Config
+from src.application.common.monitor import monitor
+from src.application.contracts import IConflationService
+from src.application.dtos import CostConfiguration
+from src.domain.enums import BenchmarkIteration, ConflationEngine, Theme
+from src.infra.infrastructure import Containers
+
+
+@inject
+@monitor(
+    query_id="conflation-iou-sql",
+    benchmark_iteration=BenchmarkIteration.CONFLATION_IOU,
+    cost_configuration=CostConfiguration(include_aci=True, include_blob_storage=True)
+)
+def conflation_iou_sql(
+        conflation_service: IConflationService = Provide[Containers.conflation_service],
+) -> list:
+    """
+    Benchmark: FKB/OSM building conflation with the DuckDB SQL engine, which joins
+    the raw buildings on a 0.01 degree centroid grid and computes the IoU of each pair
+    in three separate CTEs. Returns the number of FKB-only, OSM-only and overlapping
+    buildings for each county in ``Config.CONFLATION_BENCHMARK_REGIONS``. Paired with
+    ``conflation-iou-strtree``.
+    """
+    rows = []
+    for region in Config.CONFLATION_BENCHMARK_REGIONS:
+        ids_df = conflation_service.get_fkb_osm_id_relations(
+            release=Config.BENCHMARK_DOPPA_DATA_RELEASE,
+            theme=Theme.BUILDINGS,
+            region=region,
+            engine=ConflationEngine.SQL,
+        )
+        rows.append((
+            region,
+            int(ids_df["osm_id"].isna().sum()),
+            int(ids_df["fkb_id"].isna().sum()),
+            int((ids_df["fkb_id"].notna() & ids_df["osm_id"].notna()).sum()),
+        ))
+
+    return rows
@@ -0,0 +1,89 @@
+import pandas as pd
+from dependency_injector.wiring import Provide, inject
+
+from src import Config
+from src.application.common import logger
+from src.application.common.monitor import monitor
+from src.application.contracts import IConflationService
+from src.application.dtos import CostConfiguration
+from src.domain.enums import BenchmarkIteration, ConflationEngine, Theme
+from src.infra.infrastructure import Containers
+
+
+@inject
+def conflation_iou_strtree(
+        conflation_service: IConflationService = Provide[Containers.conflation_service],
+) -> None:
+    """
+    Benchmark: FKB/OSM building conflation with the STRtree engine, which finds every
+    intersecting pair once with a spatial index and computes each IoU once in vectorized
+    shapely. Before the timed runs, the relations are compared with the SQL engine for
+    each county in ``Config.CONFLATION_BENCHMARK_REGIONS``. Paired with ``conflation-iou-sql``.
+    """
+    for region in Config.CONFLATION_BENCHMARK_REGIONS:
+        _compare_with_sql_engine(conflation_service=conflation_service, region=region)
+
+    _benchmark()
+
+
+def _compare_with_sql_engine(conflation_service: IConflationService, region: str) -> None:
+    relations_by_engine = {
+        engine: conflation_service.get_fkb_osm_id_relations(
+            release=Config.BENCHMARK_DOPPA_DATA_RELEASE,
+            theme=Theme.BUILDINGS,
+            region=region,
+            engine=engine,
+        )
+        for engine in (ConflationEngine.SQL, ConflationEngine.STRTREE)
+    }
+    sql_pairs, strtree_pairs = (
+        _to_pairs(ids_df=relations_by_engine[engine]) for engine in (ConflationEngine.SQL, ConflationEngine.STRTREE)
+    )
+
+    # The SQL engine misses pairs straddling grid cells, so differences are expected and only reported
+    if sql_pairs == strtree_pairs:
+        logger.info(f"STRtree conflation matches the SQL engine for region '{region}': {len(sql_pairs)} relations.")
+        return
+
+    logger.warning(
+        f"STRtree conflation differs from the SQL engine for region '{region}': "
+        f"{len(strtree_pairs - sql_pairs)} relations only found by STRtree and "
+        f"{len(sql_pairs - strtree_pairs)} relations only found by SQL."
+    )
+
+
+def _to_pairs(ids_df: pd.DataFrame) -> set[tuple[str | None, str | None]]:
+    return {
+        (
+            None if pd.isna(fkb_id) else str(fkb_id),
+            None if pd.isna(osm_id) else str(osm_id),
+        )
+        for fkb_id, osm_id in zip(ids_df["fkb_id"], ids_df["osm_id"])
+    }
+
+
+@inject
+@monitor(
+    query_id="conflation-iou-strtree",
+    benchmark_iteration=BenchmarkIteration.CONFLATION_IOU,
+    cost_configuration=CostConfiguration(include_aci=True, include_blob_storage=True),
+)
+def _benchmark(
+        conflation_service: IConflationService = Provide[Containers.conflation_service],
+) -> list:
+    rows = []
+    for region in Config.CONFLATION_BENCHMARK_REGIONS:
+        ids_df = conflation_service.get_fkb_osm_id_relations(
+            release=Config.BENCHMARK_DOPPA_DATA_RELEASE,
+            theme=Theme.BUILDINGS,
+            region=region,
+            engine=ConflationEngine.STRTREE,
+        )
+        rows.append((
+            region,
+            int(ids_df["osm_id"].isna().sum()),
+            int(ids_df["fkb_id"].isna().sum()),
+            int((ids_df["fkb_id"].notna() & ids_df["osm_id"].notna()).sum()),
+        ))
+
+    return rows
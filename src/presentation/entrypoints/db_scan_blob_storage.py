@@ -3,7 +3,7 @@ from duckdb import DuckDBPyConnection
 
 from src import Config
 from src.application.common.monitor import monitor
-from src.application.contracts import IFilePathService
+from src.application.contracts import IFilePathService, IRemoteIOService
 from src.application.dtos import CostConfiguration
 from src.domain.enums import StorageContainer, Theme, BenchmarkIteration, DatasetSize
 from src.infra.infrastructure import Containers
@@ -17,11 +17,13 @@ from src.infra.infrastructure import Containers
 )
 def db_scan_blob_storage(
         db_context: DuckDBPyConnection = Provide[Containers.duckdb_context],
-        path_service: IFilePathService = Provide[Containers.file_path_service]
+        path_service: IFilePathService = Provide[Containers.file_path_service],
+        remote_io_service: IRemoteIOService = Provide[Containers.remote_io_service]
 ) -> list:
     """
     Benchmark: full table scan (``COUNT(*)``) on the small buildings dataset using
-    DuckDB over Azure Blob Storage via the ``read_parquet`` virtual filesystem.
+    DuckDB over Azure Blob Storage via the ``read_parquet`` virtual filesystem, or
+    via the remote I/O backend selected for the run.
     """
     path = path_service.create_release_virtual_filesystem_path(
         storage_scheme="az",
@@ -33,4 +35,5 @@ def db_scan_blob_storage(
         file_name="*.parquet"
     )
 
-    return db_context.execute(f"SELECT count(*) AS count FROM read_parquet('{path}')").fetchall()
+    source = remote_io_service.create_parquet_source(path=path)
+    return db_context.execute(f"SELECT count(*) AS count FROM {source}").fetchall()
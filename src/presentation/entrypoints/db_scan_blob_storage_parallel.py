@@ -0,0 +1,40 @@
+from dependency_injector.wiring import Provide, inject
+
+from src import Config
+from src.application.common.monitor import monitor
+from src.application.contracts import IParallelScanService
+from src.application.dtos import CostConfiguration
+from src.domain.enums import Theme, BenchmarkIteration, DatasetSize
+from src.infra.infrastructure import Containers
+
+
+@inject
+@monitor(
+    query_id="db-scan-blob-storage-parallel",
+    benchmark_iteration=BenchmarkIteration.DB_SCAN,
+    cost_configuration=CostConfiguration(include_aci=True, include_blob_storage=True)
+)
+def db_scan_blob_storage_parallel(
+        parallel_scan_service: IParallelScanService = Provide[Containers.parallel_scan_service]
+) -> list:
+    """
+    Benchmark: full table scan (``COUNT(*)``) on the small buildings dataset using
+    DuckDB over Azure Blob Storage, fanned out over the release manifest with one
+    cursor per file group. The partial counts are summed into the total. Paired with
+    ``db-scan-blob-storage``, which reads the same files through a single glob. The
+    manifest blob listing is part of each timed run, as the glob is listed in the
+    paired query as well.
+    """
+    files = parallel_scan_service.get_release_manifest(
+        release=Config.BENCHMARK_DOPPA_DATA_RELEASE,
+        theme=Theme.BUILDINGS,
+        dataset_size=DatasetSize.SMALL
+    )
+
+    return parallel_scan_service.scan_and_merge(
+        files=files,
+        partial_sql="SELECT count(*) AS count FROM {source}",
+        merge_sql="SELECT SUM(count)::BIGINT AS count FROM partials",
+        max_workers=Config.PARALLEL_SCAN_MAX_WORKERS,
+        files_per_task=Config.PARALLEL_SCAN_FILES_PER_TASK
+    )
@@ -0,0 +1,47 @@
+import geopandas as gpd
+import pandas as pd
+from dependency_injector.wiring import Provide, inject
+
+from src.application.common.monitor import monitor
+from src.application.contracts import IFKBService
+from src.application.dtos import CostConfiguration, QueryResult
+from src.domain.enums import BenchmarkIteration, BoundingBox, EPSGCode, PolygonizationStrategy
+from src.infra.infrastructure import Containers
+
+
+@inject
+def fkb_polygonization_global(
+        fkb_service: IFKBService = Provide[Containers.fkb_service],
+) -> None:
+    """
+    Benchmark: FKB building polygonization with the global strategy, which unions every
+    roof-edge line with ``ST_Union_Agg`` and runs one ``ST_Polygonize`` over the FKB
+    contribution features inside ``BoundingBox.TRONDHEIM_WGS84``. The features are
+    loaded before timing. Paired with ``fkb-polygonization-tiled``.
+    """
+    minx, miny, maxx, maxy = BoundingBox.TRONDHEIM_WGS84.value
+    fkb_dataset = pd.concat(
+        [batch.cx[minx:maxx, miny:maxy] for batch in fkb_service.extract_fkb_data()],
+        ignore_index=True
+    )
+
+    _benchmark(fkb_dataset=fkb_dataset)
+
+
+@inject
+@monitor(
+    query_id="fkb-polygonization-global",
+    benchmark_iteration=BenchmarkIteration.FKB_POLYGONIZATION,
+    cost_configuration=CostConfiguration(include_aci=True, include_blob_storage=True),
+)
+def _benchmark(
+        fkb_dataset: gpd.GeoDataFrame,
+        fkb_service: IFKBService = Provide[Containers.fkb_service],
+) -> QueryResult:
+    buildings = fkb_service.create_building_polygons(
+        gdf=fkb_dataset,
+        crs=EPSGCode.WGS84,
+        strategy=PolygonizationStrategy.GLOBAL
+    )
+
+    return QueryResult(rows=[("buildings", len(buildings))], metrics={"features": len(fkb_dataset)})
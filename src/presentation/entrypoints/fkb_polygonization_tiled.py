@@ -0,0 +1,72 @@
+import geopandas as gpd
+import pandas as pd
+from dependency_injector.wiring import Provide, inject
+
+from src.application.common import logger
+from src.application.common.monitor import monitor
+from src.application.contracts import IFKBService
+from src.application.dtos import CostConfiguration, QueryResult
+from src.domain.enums import BenchmarkIteration, BoundingBox, EPSGCode, PolygonizationStrategy
+from src.infra.infrastructure import Containers
+
+
+@inject
+def fkb_polygonization_tiled(
+        fkb_service: IFKBService = Provide[Containers.fkb_service],
+) -> None:
+    """
+    Benchmark: FKB building polygonization with the tiled strategy over the FKB
+    contribution features inside ``BoundingBox.TRONDHEIM_WGS84``. Before timing, the
+    same input is polygonized once with both strategies, and differences in building
+    count and area are logged. Paired with ``fkb-polygonization-global``, which times
+    the global strategy under the same harness.
+    """
+    minx, miny, maxx, maxy = BoundingBox.TRONDHEIM_WGS84.value
+    fkb_dataset = pd.concat(
+        [batch.cx[minx:maxx, miny:maxy] for batch in fkb_service.extract_fkb_data()],
+        ignore_index=True
+    )
+
+    _compare_with_global_strategy(fkb_service=fkb_service, fkb_dataset=fkb_dataset)
+    _benchmark(fkb_dataset=fkb_dataset)
+
+
+def _compare_with_global_strategy(fkb_service: IFKBService, fkb_dataset: gpd.GeoDataFrame) -> None:
+    logger.info(f"Polygonizing {len(fkb_dataset)} FKB features with both strategies...")
+
+    global_buildings, tiled_buildings = (
+        fkb_service.create_building_polygons(gdf=fkb_dataset, crs=EPSGCode.WGS84, strategy=strategy)
+        for strategy in (PolygonizationStrategy.GLOBAL, PolygonizationStrategy.TILED)
+    )
+
+    global_area, tiled_area = global_buildings.geometry.area.sum(), tiled_buildings.geometry.area.sum()
+    message = f"global: {len(global_buildings)} buildings, tiled: {len(tiled_buildings)} buildings"
+
+    # Noding may differ slightly between DuckDB and shapely, so differences are only reported
+    if len(global_buildings) == len(tiled_buildings) and abs(global_area - tiled_area) <= 1e-9 * max(global_area, 1):
+        logger.info(f"Tiled polygonization matches the global strategy. {message}")
+    else:
+        logger.warning(
+            f"Tiled polygonization differs from the global strategy by "
+            f"{len(tiled_buildings) - len(global_buildings)} buildings and "
+            f"{tiled_area - global_area:.3e} square degrees. {message}"
+        )
+
+
+@inject
+@monitor(
+    query_id="fkb-polygonization-tiled",
+    benchmark_iteration=BenchmarkIteration.FKB_POLYGONIZATION,
+    cost_configuration=CostConfiguration(include_aci=True, include_blob_storage=True),
+)
+def _benchmark(
+        fkb_dataset: gpd.GeoDataFrame,
+        fkb_service: IFKBService = Provide[Containers.fkb_service],
+) -> QueryResult:
+    buildings = fkb_service.create_building_polygons(
+        gdf=fkb_dataset,
+        crs=EPSGCode.WGS84,
+        strategy=PolygonizationStrategy.TILED
+    )
+
+    return QueryResult(rows=[("buildings", len(buildings))], metrics={"features": len(fkb_dataset)})
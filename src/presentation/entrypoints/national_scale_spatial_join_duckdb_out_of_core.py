@@ -0,0 +1,102 @@
+from collections import defaultdict
+
+from dependency_injector.wiring import Provide, inject
+from duckdb import DuckDBPyConnection
+
+from src import Config
+from src.application.common import logger
+from src.application.common.monitor import monitor
+from src.application.common.resource_sampler import ResourceSampler
+from src.application.contracts import IFilePathService, ICountyService
+from src.application.dtos import CostConfiguration, DuckDBSettings, QueryResult
+from src.domain.enums import StorageContainer, Theme, BenchmarkIteration, DatasetSize, DuckDBProfile
+from src.infra.infrastructure import Containers
+
+
+@inject
+def national_scale_spatial_join_duckdb_out_of_core(
+    db_context: DuckDBPyConnection = Provide[Containers.duckdb_context],
+    county_service: ICountyService = Provide[Containers.county_service],
+    duckdb_settings: DuckDBSettings = Provide[Containers.duckdb_settings],
+) -> None:
+    """
+    Benchmark: national-scale spatial join between Norwegian counties and the large
+    buildings dataset using DuckDB with bounded memory. Buildings are streamed through
+    the join one ``region=`` partition at a time and the per-county counts are merged
+    in Python, so only a single partition is in flight at once. Meant to run with the
+    ``out_of_core`` DuckDB profile, which sets a memory limit below the container size
+    and a temp directory DuckDB can spill to. Peak RSS and peak spill bytes are stored
+    in the ``query_metrics`` column of each sample.
+    """
+    if duckdb_settings.profile != DuckDBProfile.OUT_OF_CORE.value:
+        logger.warning(
+            f"Running out-of-core spatial join with DuckDB profile '{duckdb_settings.profile}'. "
+            f"Use '--duckdb-profile {DuckDBProfile.OUT_OF_CORE.value}' to enable spilling."
+        )
+
+    _create_counties_table(db_context=db_context)
+    _benchmark(regions=county_service.get_county_ids())
+
+
+def _create_counties_table(db_context: DuckDBPyConnection) -> None:
+    counties_path = f"az://{StorageContainer.METADATA.value}/{Config.DATABRICKS_MUNICIPALITIES_FILE}"
+
+    logger.info(f"Loading counties from '{counties_path}' into DuckDB...")
+    db_context.execute(f"""
+        CREATE OR REPLACE TEMP TABLE counties AS
+        SELECT
+            region AS county_name,
+            ST_GeomFromWKB(wkb) AS geometry
+        FROM read_parquet('{counties_path}')
+    """)
+
+
+@inject
+@monitor(
+    query_id="national-scale-spatial-join-duckdb-out-of-core",
+    benchmark_iteration=BenchmarkIteration.NATIONAL_SCALE_SPATIAL_JOIN,
+    cost_configuration=CostConfiguration(include_aci=True, include_blob_storage=True),
+)
+def _benchmark(
+    regions: list[str],
+    db_context: DuckDBPyConnection = Provide[Containers.duckdb_context],
+    path_service: IFilePathService = Provide[Containers.file_path_service],
+) -> QueryResult:
+    spill_cursor = db_context.cursor()
+    building_counts: dict[str, int] = defaultdict(int)
+
+    with ResourceSampler(spill_bytes_reader=lambda: _get_spill_bytes(spill_cursor)) as sampler:
+        for region in regions:
+            buildings_path = path_service.create_release_virtual_filesystem_path(
+                storage_scheme="az",
+                release=Config.BENCHMARK_DOPPA_DATA_RELEASE,
+                container=StorageContainer.DATA,
+                theme=Theme.BUILDINGS,
+                dataset_size=DatasetSize.LARGE,
+                region=region,
+                file_name="*.parquet",
+            )
+
+            rows = db_context.execute(f"""
+                SELECT
+                    c.county_name,
+                    COUNT(*) AS building_count
+                FROM counties c
+                JOIN read_parquet('{buildings_path}') b
+                  ON ST_Intersects(c.geometry, b.geometry)
+                GROUP BY c.county_name
+            """).fetchall()
+
+            for county_name, building_count in rows:
+                building_counts[county_name] += building_count
+
+    spill_cursor.close()
+
+    return QueryResult(
+        rows=sorted(building_counts.items(), key=lambda row: row[1], reverse=True),
+        metrics={**sampler.to_metrics(), "regions": len(regions)},
+    )
+
+
+def _get_spill_bytes(cursor: DuckDBPyConnection) -> int:
+    return cursor.execute("SELECT COALESCE(SUM(size), 0) FROM duckdb_temporary_files()").fetchone()[0]
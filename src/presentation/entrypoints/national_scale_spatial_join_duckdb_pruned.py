@@ -0,0 +1,65 @@
+from dependency_injector.wiring import Provide, inject
+
+from src import Config
+from src.application.common import logger
+from src.application.common.monitor import monitor
+from src.application.contracts import ISpatialJoinService
+from src.application.dtos import CostConfiguration
+from src.domain.enums import BenchmarkIteration, DatasetSize
+from src.infra.infrastructure import Containers
+
+
+@inject
+def national_scale_spatial_join_duckdb_pruned(
+    spatial_join_service: ISpatialJoinService = Provide[Containers.spatial_join_service],
+) -> None:
+    """
+    Benchmark: national-scale spatial join between Norwegian counties and the small
+    buildings dataset using the partition-pruned DuckDB join. County polygons are
+    subdivided up front, then each county is joined on its own cursor against only
+    the files from its ``region=`` partition and the files whose bbox overlaps it.
+    The result is validated against the naive join before the timed runs, which are
+    paired with ``national-scale-spatial-join-duckdb``.
+    """
+    spatial_join_service.prepare_county_pieces(max_vertices=Config.SPATIAL_JOIN_SUBDIVIDE_MAX_VERTICES)
+    _validate_against_naive_join(spatial_join_service=spatial_join_service)
+    _benchmark()
+
+
+def _validate_against_naive_join(spatial_join_service: ISpatialJoinService) -> None:
+    logger.info("Validating pruned spatial join against the naive join...")
+    naive_result = dict(spatial_join_service.count_buildings_per_county_naive(
+        release=Config.BENCHMARK_DOPPA_DATA_RELEASE,
+        dataset_size=DatasetSize.SMALL,
+    ))
+    pruned_result = dict(spatial_join_service.count_buildings_per_county(
+        release=Config.BENCHMARK_DOPPA_DATA_RELEASE,
+        dataset_size=DatasetSize.SMALL,
+        max_workers=Config.SPATIAL_JOIN_MAX_WORKERS,
+    ))
+
+    if naive_result != pruned_result:
+        mismatches = {
+            county: (naive_result.get(county), pruned_result.get(county))
+            for county in naive_result.keys() | pruned_result.keys()
+            if naive_result.get(county) != pruned_result.get(county)
+        }
+        raise ValueError(f"Pruned spatial join differs from the naive join (naive, pruned): {mismatches}")
+
+    logger.info(f"Pruned spatial join matches the naive join for {len(naive_result)} counties.")
+
+
+@inject
+@monitor(
+    query_id="national-scale-spatial-join-duckdb-pruned",
+    benchmark_iteration=BenchmarkIteration.NATIONAL_SCALE_SPATIAL_JOIN,
+    cost_configuration=CostConfiguration(include_aci=True, include_blob_storage=True),
+)
+def _benchmark(
+    spatial_join_service: ISpatialJoinService = Provide[Containers.spatial_join_service],
+) -> list:
+    return spatial_join_service.count_buildings_per_county(
+        release=Config.BENCHMARK_DOPPA_DATA_RELEASE,
+        dataset_size=DatasetSize.SMALL,
+        max_workers=Config.SPATIAL_JOIN_MAX_WORKERS,
+    )
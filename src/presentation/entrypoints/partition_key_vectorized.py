@@ -0,0 +1,105 @@
+import time
+
+import geopandas as gpd
+import numpy as np
+import pygeohash as phg
+from dependency_injector.wiring import Provide, inject
+from duckdb import DuckDBPyConnection
+
+from src import Config
+from src.application.common import logger
+from src.application.common.monitor import monitor
+from src.application.contracts import IFilePathService, IVectorService
+from src.application.dtos import CostConfiguration, QueryResult
+from src.domain.enums import BenchmarkIteration, DatasetSize, EPSGCode, StorageContainer, Theme
+from src.infra.infrastructure import Containers
+
+
+@inject
+def partition_key_vectorized(
+        db_context: DuckDBPyConnection = Provide[Containers.duckdb_context],
+        path_service: IFilePathService = Provide[Containers.file_path_service],
+        vector_service: IVectorService = Provide[Containers.vector_service],
+) -> None:
+    """
+    Benchmark: partition key computation over the small buildings dataset for
+    ``Config.PARTITION_KEY_BENCHMARK_REGION``. Before timing, the vectorized geohash
+    keys are checked for equality against the previous per-row ``pygeohash`` path,
+    which reprojects the whole GeoDataFrame to LAEA and back. The pygeohash runtime
+    is stored in the ``query_metrics`` column next to the feature count.
+    """
+    path = path_service.create_release_virtual_filesystem_path(
+        storage_scheme="az",
+        release=Config.BENCHMARK_DOPPA_DATA_RELEASE,
+        container=StorageContainer.DATA,
+        theme=Theme.BUILDINGS,
+        dataset_size=DatasetSize.SMALL,
+        region=Config.PARTITION_KEY_BENCHMARK_REGION,
+        file_name="*.parquet",
+    )
+
+    wkbs = db_context.execute(
+        f"SELECT ST_AsWKB(geometry) AS geometry FROM read_parquet('{path}')"
+    ).fetch_arrow_table().column("geometry").to_numpy(zero_copy_only=False)
+    dataframe = gpd.GeoDataFrame(
+        geometry=gpd.GeoSeries.from_wkb(wkbs),
+        crs=f"EPSG:{EPSGCode.WGS84.value}"
+    )
+
+    pygeohash_seconds = _validate_against_pygeohash(dataframe=dataframe, vector_service=vector_service)
+    _benchmark(dataframe=dataframe, pygeohash_seconds=pygeohash_seconds)
+
+
+def _validate_against_pygeohash(dataframe: gpd.GeoDataFrame, vector_service: IVectorService) -> float:
+    logger.info(f"Validating vectorized partition keys for {len(dataframe)} features against pygeohash...")
+
+    started_at = time.perf_counter()
+    centroids = (
+        dataframe.geometry
+        .to_crs(epsg=EPSGCode.LAEA_EUROPE.value)
+        .centroid
+        .to_crs(epsg=EPSGCode.WGS84.value)
+    )
+    reference_keys = np.array([
+        phg.encode(lat, lon, precision=Config.PARTITION_RESOLUTION)
+        for lat, lon in zip(centroids.y.values, centroids.x.values)
+    ], dtype=object)
+    pygeohash_seconds = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    vectorized_keys = vector_service.compute_partition_key(dataframe)["partition_key"].to_numpy(dtype=object)
+    vectorized_seconds = time.perf_counter() - started_at
+
+    mismatches = np.flatnonzero(reference_keys != vectorized_keys)
+    if len(mismatches) > 0:
+        examples = {int(i): (reference_keys[i], vectorized_keys[i]) for i in mismatches[:10]}
+        raise ValueError(
+            f"Vectorized partition keys differ from pygeohash for {len(mismatches)} features "
+            f"(pygeohash, vectorized): {examples}"
+        )
+
+    logger.info(
+        f"Vectorized partition keys match pygeohash. pygeohash: {pygeohash_seconds:.2f}s, "
+        f"vectorized: {vectorized_seconds:.2f}s ({pygeohash_seconds / max(vectorized_seconds, 1e-9):.1f}x)"
+    )
+    return pygeohash_seconds
+
+
+@inject
+@monitor(
+    query_id="partition-key-vectorized",
+    benchmark_iteration=BenchmarkIteration.PARTITION_KEY,
+    cost_configuration=CostConfiguration(include_aci=True),
+)
+def _benchmark(
+        dataframe: gpd.GeoDataFrame,
+        pygeohash_seconds: float,
+        vector_service: IVectorService = Provide[Containers.vector_service],
+) -> QueryResult:
+    partition_keys = vector_service.compute_partition_key(dataframe)["partition_key"]
+    rows = sorted(partition_keys.value_counts().items())
+
+    return QueryResult(
+        rows=rows,
+        metrics={"features": len(dataframe), "pygeohash_seconds": pygeohash_seconds},
+    )
@@ -1,14 +1,11 @@
 ﻿import json
-import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-import geopandas as gpd
 from osgeo import ogr
 from pyproj import CRS
 from dependency_injector.wiring import Provide, inject
-from duckdb import DuckDBPyConnection
-import numpy as np
-import shapely
-from sqlalchemy import Engine, text
 
 from src import Config
 from src.application.common import logger
@@ -16,13 +13,14 @@ from src.application.contracts import (
     IFilePathService,
     IBlobStorageService,
     IBytesService,
-    ITileService,
-    ITileApiService,
     ITestDatasetService,
     IDatasetSynthesisService,
     IBenchmarkService,
+    IPostgresSeedService,
+    ITileBuilderService,
 )
-from src.domain.enums import StorageContainer, Theme, EPSGCode, DatasetSize
+from src.application.dtos import TileStorageReport
+from src.domain.enums import StorageContainer, Theme, DatasetSize
 from src.infra.infrastructure import Containers
 
 
@@ -36,32 +34,42 @@ def setup_benchmarking_framework(
     ],
 ) -> None:
     """
-    Provisions the benchmarking framework's input data in five steps: (1) run the
+    Provisions the benchmarking framework's input data in six steps: (1) run the
     test dataset pipeline to produce the small buildings dataset, (2) synthesize
-    the medium dataset from it, (3) synthesize the large dataset, (4) seed
-    PostgreSQL with each ``buildings_<size>`` table plus a GIST spatial index,
-    and (5) materialize and upload the shapefile copy of the small buildings
-    dataset to blob storage.
+    the nested medium and large datasets from it in one pass, (3) seed
+    PostgreSQL with each ``buildings_<size>`` table through parallel ``COPY``
+    loaders, plus a clustered GIST spatial index, (4) prepare the small table for
+    MVT serving with a Web Mercator geometry column and per-zoom generalized
+    tables, (5) build the PMTiles archive and z/x/y MVT tiles of the small
+    buildings dataset in one pass, upload both to blob storage together with a
+    storage footprint and upload time report per tile serving strategy, and
+    write the z13 tiles file with per-tile building counts, and (6) materialize
+    and upload the shapefile copy of the small buildings dataset to blob storage.
     """
     logger.info("Starting benchmarking framework setup...")
 
-    logger.info("Step 1/5: Running test dataset pipeline...")
+    logger.info("Step 1/6: Running test dataset pipeline...")
     release = test_dataset_service.run_pipeline()
     logger.info(f"Test dataset pipeline complete. Release: '{release}'")
 
-    logger.info("Step 2/5: Synthesizing medium dataset...")
-    dataset_synthesis_service.run_pipeline(release=release, target_size=DatasetSize.MEDIUM)
-    logger.info("Medium dataset synthesis complete.")
+    logger.info("Step 2/6: Synthesizing medium and large datasets...")
+    dataset_synthesis_service.run_pipeline(release=release, target_sizes=[DatasetSize.MEDIUM, DatasetSize.LARGE])
+    logger.info("Medium and large dataset synthesis complete.")
 
-    logger.info("Step 3/5: Synthesizing large dataset...")
-    dataset_synthesis_service.run_pipeline(release=release, target_size=DatasetSize.LARGE)
-    logger.info("Large dataset synthesis complete.")
-
-    logger.info("Step 4/5: Seeding Postgres with buildings...")
+    logger.info("Step 3/6: Seeding Postgres with buildings...")
     _postgres_buildings_seed(release=release)
     logger.info("Postgres seed complete.")
 
-    logger.info("Step 5/5: Creating shapefile copy in blob storage...")
+    logger.info("Step 4/6: Preparing MVT tile tables in Postgres...")
+    tile_table_seconds = _prepare_mvt_tile_tables()
+    logger.info("MVT tile tables complete.")
+
+    logger.info("Step 5/6: Building PMTiles and MVT tiles...")
+    _create_tiles(release=release, tile_table_seconds=tile_table_seconds)
+    _generate_tiles_file(release=release)
+    logger.info("Tile pyramid complete.")
+
+    logger.info("Step 6/6: Creating shapefile copy in blob storage...")
     _create_shapefile_copy(release=release)
     logger.info("Shapefile copy complete.")
 
@@ -71,184 +79,82 @@ def setup_benchmarking_framework(
 @inject
 def _postgres_buildings_seed(
     release: str | None = None,
-    duckdb_context: DuckDBPyConnection = Provide[Containers.duckdb_context],
-    postgres_db_context: Engine = Provide[Containers.postgres_context],
-    file_path_service: IFilePathService = Provide[Containers.file_path_service],
+    postgres_seed_service: IPostgresSeedService = Provide[Containers.postgres_seed_service],
 ) -> None:
     effective_release = release or Config.BENCHMARK_DOPPA_DATA_RELEASE
 
     for size in DatasetSize:
-        _seed_postgres_for_size(
+        postgres_seed_service.seed_buildings(
             release=effective_release,
-            size=size,
-            duckdb_context=duckdb_context,
-            postgres_db_context=postgres_db_context,
-            file_path_service=file_path_service,
-        )
-
-
-def _seed_postgres_for_size(
-    release: str,
-    size: DatasetSize,
-    duckdb_context: DuckDBPyConnection,
-    postgres_db_context: Engine,
-    file_path_service: IFilePathService,
-) -> None:
-    table_name = f"buildings_{size.value}"
-    index_name = f"{table_name}_geometry_idx"
-
-    path = file_path_service.create_release_virtual_filesystem_path(
-        storage_scheme="az",
-        release=release,
-        container=StorageContainer.DATA,
-        theme=Theme.BUILDINGS,
-        dataset_size=size,
-        region="*",
-        file_name="*.parquet",
-    )
-
-    total_rows = duckdb_context.execute(
-        f"SELECT COUNT(*) FROM read_parquet('{path}')"
-    ).fetchone()[0]
-
-    if total_rows == 0:
-        logger.warning(
-            f"No buildings found at blob storage path '{path}' for size '{size.value}'. Skipping table '{table_name}'."
+            dataset_size=size,
+            loader_count=Config.POSTGRES_SEED_LOADER_COUNT,
         )
-        return
-
-    duckdb_vector_size = 2048
-    vectors_per_chunk = max(1, Config.BUILDINGS_BATCH_SIZE // duckdb_vector_size)
-
-    logger.info(
-        f"Streaming {total_rows} rows from '{path}' into '{table_name}' in chunks of ~{vectors_per_chunk * duckdb_vector_size}..."
-    )
-
-    streaming_result = duckdb_context.execute(
-        f"SELECT ST_AsWKB(geometry) AS geometry, * EXCLUDE geometry FROM read_parquet('{path}')"
-    )
 
-    inserted_rows = 0
-    is_first_chunk = True
 
-    with postgres_db_context.connect() as conn:
-        while True:
-            chunk_df = streaming_result.fetch_df_chunk(vectors_per_chunk)
-            if chunk_df.empty:
-                break
-
-            geometry_array = chunk_df["geometry"].to_numpy()
-            geometry_array = np.array(
-                [bytes(g) if isinstance(g, (memoryview, bytearray)) else g for g in geometry_array],
-                dtype=object,
-            )
-            chunk_df["geometry"] = shapely.from_wkb(geometry_array)
-
-            chunk_gdf = gpd.GeoDataFrame(
-                chunk_df,
-                geometry="geometry",
-                crs=EPSGCode.WGS84.value,
-            )
-
-            chunk_gdf.to_postgis(
-                name=table_name,
-                con=conn,
-                if_exists="replace" if is_first_chunk else "append",
-                index=False,
-            )
-
-            inserted_rows += len(chunk_gdf)
-            is_first_chunk = False
-            logger.info(
-                f"Inserted {inserted_rows} of {total_rows} rows into '{table_name}'"
-            )
-
-        logger.info(
-            f"Creating GIST spatial index '{index_name}' on '{table_name}.geometry'..."
-        )
-        conn.execute(
-            text(
-                f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} USING GIST (geometry)"
-            )
-        )
-        conn.commit()
-        logger.info(f"Spatial index '{index_name}' created.")
-
-    logger.info(
-        f"Insertion into '{table_name}' completed: {inserted_rows} rows"
-    )
+@inject
+def _prepare_mvt_tile_tables(
+    postgres_seed_service: IPostgresSeedService = Provide[Containers.postgres_seed_service],
+) -> dict[str, float]:
+    return postgres_seed_service.prepare_tile_tables(dataset_size=DatasetSize.SMALL)
 
 
 @inject
-def _create_pmtiles(
+def _create_tiles(
     release: str | None = None,
-    duckdb_context: DuckDBPyConnection = Provide[Containers.duckdb_context],
-    file_path_service: IFilePathService = Provide[Containers.file_path_service],
+    tile_table_seconds: dict[str, float] | None = None,
+    tile_builder_service: ITileBuilderService = Provide[Containers.tile_builder_service],
+    postgres_seed_service: IPostgresSeedService = Provide[Containers.postgres_seed_service],
     blob_storage_service: IBlobStorageService = Provide[
         Containers.blob_storage_service
     ],
-    bytes_service: IBytesService = Provide[Containers.bytes_service],
 ) -> None:
-    path = file_path_service.create_release_virtual_filesystem_path(
-        storage_scheme="az",
+    build_report = tile_builder_service.build_tiles(
         release=release or Config.BENCHMARK_DOPPA_DATA_RELEASE,
-        container=StorageContainer.DATA,
-        theme=Theme.BUILDINGS,
         dataset_size=DatasetSize.SMALL,
-        region="*",
-        file_name="*.parquet",
+        min_zoom=Config.TILE_BUILDER_MIN_ZOOM,
+        max_zoom=Config.TILE_BUILDER_MAX_ZOOM,
+        pmtiles_path=Config.BUILDINGS_PMTILES_FILE,
+        mvt_dir=Config.BUILDINGS_MVT_DIR,
     )
-
-    Config.BUILDINGS_GEOJSONL_FILE.parent.mkdir(parents=True, exist_ok=True)
-    Config.BUILDINGS_PMTILES_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-    logger.info("Fetching buildings as GeoJSONL file.")
-
-    duckdb_context.execute(f"""
-        COPY (
-            SELECT
-                * EXCLUDE (geometry, bbox),
-                ST_XMax(geometry) AS bbox_maxx,
-                ST_YMax(geometry) AS bbox_maxy,
-                ST_XMin(geometry) AS bbox_minx,
-                ST_YMin(geometry) AS bbox_miny,
-                geometry
-            FROM read_parquet('{path}')
-        )
-        TO '{Config.BUILDINGS_GEOJSONL_FILE.as_posix()}'
-        WITH (
-            FORMAT GDAL,
-            DRIVER 'GeoJSONSeq'
-        );
-        """)
-
-    logger.info(f"Saved buildings to '{Config.BUILDINGS_GEOJSONL_FILE}'")
-
-    cmd = [
-        "tippecanoe",
-        "-o",
-        Config.BUILDINGS_PMTILES_FILE.as_posix(),
-        "-zg",
-        "--drop-densest-as-needed",
-        "--coalesce",
-        "--read-parallel",
-        "-l",
-        "buildings",
-        Config.BUILDINGS_GEOJSONL_FILE.as_posix(),
+    build_seconds = build_report.phase_seconds["total"]
+
+    storage_reports = [
+        TileStorageReport(
+            strategy="vmt",
+            objects=len(Config.MVT_GENERALIZED_ZOOM_BANDS) + 1,
+            bytes=postgres_seed_service.get_tile_tables_bytes(dataset_size=DatasetSize.SMALL),
+            build_seconds=(tile_table_seconds or {}).get("total", 0.0),
+            upload_seconds=0.0,
+        ),
+        _upload_pmtiles(build_seconds=build_seconds),
+        _upload_static_mvt(build_seconds=build_seconds),
     ]
 
-    logger.info("Running tippecanoe to generate PMTiles (this may take a while)...")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    for storage_report in storage_reports:
+        logger.info(f"Tile storage for '{storage_report.strategy}': {storage_report.to_json()}")
 
-    if result.returncode != 0:
-        raise RuntimeError(
-            f"tippecanoe failed with exit code {result.returncode}:\n"
-            f"STDOUT:\n{result.stdout}\n\nSTDERR:\n{result.stderr}"
-        )
+    report_bytes = json.dumps([storage_report.to_dict() for storage_report in storage_reports], indent=2).encode()
+    Config.TILE_STORAGE_REPORT_FILE.write_bytes(report_bytes)
+    blob_storage_service.upload_file(
+        container_name=StorageContainer.TILES,
+        blob_name=Config.TILE_STORAGE_REPORT_FILE.name,
+        data=report_bytes,
+    )
+
+    logger.info(f"Tile storage report saved to '{Config.TILE_STORAGE_REPORT_FILE}'")
 
-    logger.info(f"PMTiles saved to '{Config.BUILDINGS_PMTILES_FILE}'")
+
+@inject
+def _upload_pmtiles(
+    build_seconds: float,
+    blob_storage_service: IBlobStorageService = Provide[
+        Containers.blob_storage_service
+    ],
+    bytes_service: IBytesService = Provide[Containers.bytes_service],
+) -> TileStorageReport:
     logger.info("Uploading PMTiles to blob storage.")
 
+    started_at = time.perf_counter()
     pmtiles_bytes = bytes_service.convert_pmtiles_to_bytes(
         Config.BUILDINGS_PMTILES_FILE
     )
@@ -257,137 +163,79 @@ def _create_pmtiles(
         blob_name=Config.BUILDINGS_PMTILES_FILE.name,
         data=pmtiles_bytes,
     )
+    upload_seconds = time.perf_counter() - started_at
 
     logger.info(f"Uploaded PMTiles to container '{StorageContainer.TILES.value}'")
+    return TileStorageReport(
+        strategy="pmtiles",
+        objects=1,
+        bytes=len(pmtiles_bytes),
+        build_seconds=build_seconds,
+        upload_seconds=upload_seconds,
+    )
 
 
 @inject
-def _create_mvt(
-    release: str | None = None,
-    duckdb_context: DuckDBPyConnection = Provide[Containers.duckdb_context],
-    file_path_service: IFilePathService = Provide[Containers.file_path_service],
+def _upload_static_mvt(
+    build_seconds: float,
     blob_storage_service: IBlobStorageService = Provide[
         Containers.blob_storage_service
     ],
-) -> None:
-    path = file_path_service.create_release_virtual_filesystem_path(
-        storage_scheme="az",
-        release=release or Config.BENCHMARK_DOPPA_DATA_RELEASE,
-        container=StorageContainer.DATA,
-        theme=Theme.BUILDINGS,
-        dataset_size=DatasetSize.SMALL,
-        region="*",
-        file_name="*.parquet",
-    )
-
-    Config.BUILDINGS_GEOJSONL_FILE.parent.mkdir(parents=True, exist_ok=True)
-    Config.BUILDINGS_MVT_DIR.parent.mkdir(parents=True, exist_ok=True)
-
-    if not Config.BUILDINGS_GEOJSONL_FILE.exists():
-        logger.info("Fetching buildings as GeoJSONL file for MVT generation.")
-
-        duckdb_context.execute(f"""
-            COPY (
-                SELECT
-                    * EXCLUDE (geometry, bbox),
-                    ST_XMax(geometry) AS bbox_maxx,
-                    ST_YMax(geometry) AS bbox_maxy,
-                    ST_XMin(geometry) AS bbox_minx,
-                    ST_YMin(geometry) AS bbox_miny,
-                    geometry
-                FROM read_parquet('{path}')
-            )
-            TO '{Config.BUILDINGS_GEOJSONL_FILE.as_posix()}'
-            WITH (
-                FORMAT GDAL,
-                DRIVER 'GeoJSONSeq'
-            );
-            """)
-
-        logger.info(f"Saved buildings to '{Config.BUILDINGS_GEOJSONL_FILE}'")
-    else:
-        logger.info(
-            f"GeoJSONL file already exists at '{Config.BUILDINGS_GEOJSONL_FILE}', skipping creation."
-        )
-
-    cmd = [
-        "tippecanoe",
-        "-e",
-        Config.BUILDINGS_MVT_DIR.as_posix(),
-        "-zg",
-        "--drop-densest-as-needed",
-        "--coalesce",
-        "--read-parallel",
-        "--no-tile-compression",
-        "--force",
-        "-l",
-        "buildings",
-        Config.BUILDINGS_GEOJSONL_FILE.as_posix(),
-    ]
-
-    logger.info("Running tippecanoe to generate MVT tiles (this may take a while)...")
-    result = subprocess.run(cmd, capture_output=True, text=True)
-
-    if result.returncode != 0:
-        raise RuntimeError(
-            f"tippecanoe failed with exit code {result.returncode}:\n"
-            f"STDOUT:\n{result.stdout}\n\nSTDERR:\n{result.stderr}"
-        )
-
-    logger.info(f"MVT tiles saved to '{Config.BUILDINGS_MVT_DIR}'")
+) -> TileStorageReport:
     logger.info("Uploading MVT tiles to blob storage.")
 
     mvt_dir = Config.BUILDINGS_MVT_DIR
-    tile_count = 0
-
-    for tile_file in mvt_dir.rglob("*.pbf"):
-        relative_path = tile_file.relative_to(mvt_dir)
-        blob_name = f"mvt/{relative_path.as_posix()}"
+    tile_files = list(mvt_dir.rglob("*.pbf"))
 
+    def _upload(tile_file: Path) -> int:
         tile_bytes = tile_file.read_bytes()
         blob_storage_service.upload_file(
             container_name=StorageContainer.TILES,
-            blob_name=blob_name,
+            blob_name=f"{Config.BUILDINGS_MVT_BLOB_PREFIX}/{tile_file.relative_to(mvt_dir).as_posix()}",
             data=tile_bytes,
         )
-        tile_count += 1
+        return len(tile_bytes)
+
+    # Every tile is its own blob, so uploads are issued in parallel to hide the per-request latency
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=Config.TILE_UPLOAD_WORKERS) as pool:
+        uploaded_bytes = sum(pool.map(_upload, tile_files))
+    upload_seconds = time.perf_counter() - started_at
 
     logger.info(
-        f"Uploaded {tile_count} MVT tiles to container '{StorageContainer.TILES.value}' under 'mvt/' prefix."
+        f"Uploaded {len(tile_files)} MVT tiles to container '{StorageContainer.TILES.value}' "
+        f"under '{Config.BUILDINGS_MVT_BLOB_PREFIX}/' prefix."
+    )
+    return TileStorageReport(
+        strategy="static_mvt",
+        objects=len(tile_files),
+        bytes=uploaded_bytes,
+        build_seconds=build_seconds,
+        upload_seconds=upload_seconds,
     )
 
 
 @inject
 def _generate_tiles_file(
-    tile_service: ITileService = Provide[Containers.tile_service],
-    tile_api_service: ITileApiService = Provide[Containers.tile_api_service],
+    release: str | None = None,
+    tile_builder_service: ITileBuilderService = Provide[Containers.tile_builder_service],
 ) -> None:
     TILE_ZOOM: int = 13
 
-    min_lat, min_lon, max_lat, max_lon = Config.BUILDINGS_SPATIAL_EXTENT
-    candidate_tiles = tile_service.build_candidate_tiles(
-        min_lat=min_lat,
-        min_lon=min_lon,
-        max_lat=max_lat,
-        max_lon=max_lon,
+    logger.info(f"Counting buildings per tile at zoom {TILE_ZOOM}...")
+    tile_counts = tile_builder_service.count_features_per_tile(
+        release=release or Config.BENCHMARK_DOPPA_DATA_RELEASE,
+        dataset_size=DatasetSize.SMALL,
         zoom=TILE_ZOOM,
     )
 
-    logger.info(f"Created {len(candidate_tiles)} candidate tiles")
-    logger.info("Finding candidate tiles with data...")
-
-    existing_tiles: list[tuple[int, int, int]] = []
-    for candidate_tile in candidate_tiles:
-        z, x, y = candidate_tile
-        if tile_api_service.fetch_vmt_tile(z=z, x=x, y=y) is not None:
-            existing_tiles.append(candidate_tile)
-
     logger.info(
-        f"Found {len(existing_tiles)} tiles with data out of {len(candidate_tiles)} candidates"
+        f"Found {len(tile_counts)} tiles with data covering {sum(count for *_, count in tile_counts)} tile features"
     )
 
+    Config.MVT_TILES_PATH.parent.mkdir(parents=True, exist_ok=True)
     with open(Config.MVT_TILES_PATH, "w", encoding="utf-8") as f:
-        json.dump([list(tile) for tile in existing_tiles], f)
+        json.dump([list(tile) for tile in tile_counts], f)
 
     logger.info(f"Tiles file saved to '{Config.MVT_TILES_PATH}'")
 
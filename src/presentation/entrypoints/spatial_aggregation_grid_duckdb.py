@@ -3,7 +3,7 @@ from duckdb import DuckDBPyConnection
 
 from src import Config
 from src.application.common.monitor import monitor
-from src.application.contracts import IFilePathService
+from src.application.contracts import IFilePathService, IRemoteIOService
 from src.application.dtos import CostConfiguration
 from src.domain.enums import StorageContainer, Theme, BenchmarkIteration, DatasetSize
 from src.infra.infrastructure import Containers
@@ -18,11 +18,13 @@ from src.infra.infrastructure import Containers
 def spatial_aggregation_grid_duckdb(
         db_context: DuckDBPyConnection = Provide[Containers.duckdb_context],
         path_service: IFilePathService = Provide[Containers.file_path_service],
+        remote_io_service: IRemoteIOService = Provide[Containers.remote_io_service],
 ) -> list:
     """
     Benchmark: spatial aggregation on the small buildings dataset using DuckDB's
     spatial extension over Azure Blob Storage. Bins each building centroid into a
-    0.01 degree lat/lon grid cell and returns per-cell counts ordered by count.
+    0.01 degree lat/lon grid cell and returns per-cell counts ordered by count. Files
+    are read through the remote I/O backend selected for the run.
     """
     path = path_service.create_release_virtual_filesystem_path(
         storage_scheme="az",
@@ -34,12 +36,13 @@ def spatial_aggregation_grid_duckdb(
         file_name="*.parquet",
     )
 
+    source = remote_io_service.create_parquet_source(path=path)
     cell_size = 0.01
 
     query = f"""
         WITH buildings AS (
             SELECT ST_Centroid(geometry) AS centroid
-            FROM read_parquet('{path}')
+            FROM {source}
             WHERE ST_IsValid(geometry)
         )
         SELECT
@@ -0,0 +1,65 @@
+from dependency_injector.wiring import Provide, inject
+
+from src import Config
+from src.application.common.monitor import monitor
+from src.application.contracts import IParallelScanService
+from src.application.dtos import CostConfiguration
+from src.domain.enums import Theme, BenchmarkIteration, DatasetSize
+from src.infra.infrastructure import Containers
+
+
+@inject
+@monitor(
+    query_id="spatial-aggregation-grid-duckdb-parallel",
+    benchmark_iteration=BenchmarkIteration.SPATIAL_AGGREGATION_GRID,
+    cost_configuration=CostConfiguration(include_aci=True, include_blob_storage=True)
+)
+def spatial_aggregation_grid_duckdb_parallel(
+        parallel_scan_service: IParallelScanService = Provide[Containers.parallel_scan_service]
+) -> list:
+    """
+    Benchmark: spatial aggregation on the small buildings dataset using DuckDB's
+    spatial extension over Azure Blob Storage, fanned out over the release manifest
+    with one cursor per file group. Each cursor bins building centroids into a 0.01
+    degree lat/lon grid and the partial cell counts are summed per cell. Paired with
+    ``spatial-aggregation-grid-duckdb``, which reads the same files through a single glob.
+    The manifest blob listing is part of each timed run, as the glob is listed in the
+    paired query as well.
+    """
+    files = parallel_scan_service.get_release_manifest(
+        release=Config.BENCHMARK_DOPPA_DATA_RELEASE,
+        theme=Theme.BUILDINGS,
+        dataset_size=DatasetSize.SMALL
+    )
+
+    cell_size = 0.01
+
+    partial_sql = """
+        WITH buildings AS (
+            SELECT ST_Centroid(geometry) AS centroid
+            FROM {source}
+            WHERE ST_IsValid(geometry)
+        )
+        SELECT
+            FLOOR(ST_Y(centroid) / ?) AS lat_cell,
+            FLOOR(ST_X(centroid) / ?) AS lng_cell,
+            COUNT(*) AS building_count
+        FROM buildings
+        GROUP BY lat_cell, lng_cell
+    """
+
+    merge_sql = """
+        SELECT lat_cell, lng_cell, SUM(building_count)::BIGINT AS building_count
+        FROM partials
+        GROUP BY lat_cell, lng_cell
+        ORDER BY building_count DESC;
+    """
+
+    return parallel_scan_service.scan_and_merge(
+        files=files,
+        partial_sql=partial_sql,
+        merge_sql=merge_sql,
+        parameters=[cell_size, cell_size],
+        max_workers=Config.PARALLEL_SCAN_MAX_WORKERS,
+        files_per_task=Config.PARALLEL_SCAN_FILES_PER_TASK
+    )
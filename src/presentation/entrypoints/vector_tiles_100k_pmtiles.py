@@ -1,10 +1,9 @@
 ﻿from dependency_injector.wiring import inject, Provide
-from pmtiles.reader import Reader
 
 from src import Config
 from src.application.common.monitor import monitor
-from src.application.contracts import IFilePathService, ITileApiService, ITileService
-from src.application.dtos import CostConfiguration
+from src.application.contracts import IFilePathService, IAsyncTileClientService, ITileWorkloadService
+from src.application.dtos import CostConfiguration, QueryResult
 from src.domain.enums import StorageContainer, BenchmarkIteration
 from src.infra.infrastructure import Containers
 
@@ -14,23 +13,26 @@ TOTAL_REQUESTS: int = 100_000
 @inject
 def vector_tiles_100k_pmtiles(
         file_path_service: IFilePathService = Provide[Containers.file_path_service],
-        tile_service: ITileService = Provide[Containers.tile_service],
-        tile_api_service: ITileApiService = Provide[Containers.tile_api_service]
+        tile_workload_service: ITileWorkloadService = Provide[Containers.tile_workload_service]
 ) -> None:
     """
     Benchmark: 100k vector tile fetches from the buildings PMTiles archive on Azure
-    Blob Storage. Opens a PMTiles reader against the blob URL and loads the
-    candidate tile list before timing sequential per-tile reads.
+    Blob Storage. Resolves the blob URL and replays the map-session tile trace for
+    ``Config.TILE_WORKLOAD_SEED`` before timing the reads, which an async HTTP
+    client issues as range requests with ``Config.TILE_CLIENT_CONCURRENCY`` batches
+    of ``Config.PMTILES_CLIENT_BATCH_TILES`` tiles in flight and HTTP/2 per
+    ``Config.TILE_CLIENT_HTTP2``. Adjacent tile ranges of a batch are merged, and the
+    leaf directories are prefetched when ``Config.PMTILES_PREFETCH_LEAF_DIRECTORIES``
+    is set. Throughput, latency percentiles, range request counters and the trace
+    summary are stored in the ``query_metrics`` column.
     """
     pmtiles_azure_url = file_path_service.create_url_to_blob_resource(
         container=StorageContainer.TILES,
         blob_path=Config.BUILDINGS_PMTILES_FILE.name
     )
 
-    reader = tile_api_service.create_pmtiles_reader(pmtiles_url=pmtiles_azure_url)
-
-    tiles = tile_service.load_tiles(number_of_tiles=TOTAL_REQUESTS)
-    _benchmark(reader=reader, tiles=tiles)
+    trace = tile_workload_service.load_trace(number_of_requests=TOTAL_REQUESTS, seed=Config.TILE_WORKLOAD_SEED)
+    _benchmark(pmtiles_url=pmtiles_azure_url, tiles=trace.to_tiles(), workload=trace.to_dict())
 
 
 @inject
@@ -40,10 +42,18 @@ def vector_tiles_100k_pmtiles(
     cost_configuration=CostConfiguration(include_aci=True, include_blob_storage=True)
 )
 def _benchmark(
-        reader: Reader,
+        pmtiles_url: str,
         tiles: list[tuple[int, int, int]],
-        tile_api_service: ITileApiService = Provide[Containers.tile_api_service]
-) -> None:
-    for tile in tiles:
-        z, x, y = tile
-        tile_api_service.fetch_pmtiles_tile(reader=reader, z=z, x=x, y=y)
+        workload: dict[str, int],
+        async_tile_client_service: IAsyncTileClientService = Provide[Containers.async_tile_client_service]
+) -> QueryResult:
+    report = async_tile_client_service.fetch_pmtiles_tiles(
+        pmtiles_url=pmtiles_url,
+        tiles=tiles,
+        concurrency=Config.TILE_CLIENT_CONCURRENCY,
+        http2=Config.TILE_CLIENT_HTTP2,
+        batch_size=Config.PMTILES_CLIENT_BATCH_TILES,
+        prefetch=Config.PMTILES_PREFETCH_LEAF_DIRECTORIES
+    )
+
+    return QueryResult(rows=tiles, metrics={**report.to_dict(), "workload": workload})
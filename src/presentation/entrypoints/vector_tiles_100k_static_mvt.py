@@ -0,0 +1,55 @@
+from dependency_injector.wiring import inject, Provide
+
+from src import Config
+from src.application.common.monitor import monitor
+from src.application.contracts import IFilePathService, IAsyncTileClientService, ITileWorkloadService
+from src.application.dtos import CostConfiguration, QueryResult
+from src.domain.enums import StorageContainer, BenchmarkIteration
+from src.infra.infrastructure import Containers
+
+TOTAL_REQUESTS: int = 100_000
+
+
+@inject
+def vector_tiles_100k_static_mvt(
+        file_path_service: IFilePathService = Provide[Containers.file_path_service],
+        tile_workload_service: ITileWorkloadService = Provide[Containers.tile_workload_service]
+) -> None:
+    """
+    Benchmark: 100k vector tile fetches of the pre-rendered ``mvt/{z}/{x}/{y}.pbf``
+    blobs on Azure Blob Storage. Resolves the blob prefix URL and replays the
+    map-session tile trace for ``Config.TILE_WORKLOAD_SEED`` before timing the
+    fetches, which an async HTTP client issues as one GET per tile with
+    ``Config.TILE_CLIENT_CONCURRENCY`` requests in flight and HTTP/2 per
+    ``Config.TILE_CLIENT_HTTP2``. Throughput, latency percentiles and the trace
+    summary are stored in the ``query_metrics`` column.
+    """
+    mvt_azure_url = file_path_service.create_url_to_blob_resource(
+        container=StorageContainer.TILES,
+        blob_path=Config.BUILDINGS_MVT_BLOB_PREFIX
+    )
+
+    trace = tile_workload_service.load_trace(number_of_requests=TOTAL_REQUESTS, seed=Config.TILE_WORKLOAD_SEED)
+    _benchmark(base_url=mvt_azure_url, tiles=trace.to_tiles(), workload=trace.to_dict())
+
+
+@inject
+@monitor(
+    query_id="vector-tiles-100k-static-mvt",
+    benchmark_iteration=BenchmarkIteration.VECTOR_TILE_100K,
+    cost_configuration=CostConfiguration(include_aci=True, include_blob_storage=True)
+)
+def _benchmark(
+        base_url: str,
+        tiles: list[tuple[int, int, int]],
+        workload: dict[str, int],
+        async_tile_client_service: IAsyncTileClientService = Provide[Containers.async_tile_client_service]
+) -> QueryResult:
+    report = async_tile_client_service.fetch_static_mvt_tiles(
+        base_url=base_url,
+        tiles=tiles,
+        concurrency=Config.TILE_CLIENT_CONCURRENCY,
+        http2=Config.TILE_CLIENT_HTTP2
+    )
+
+    return QueryResult(rows=tiles, metrics={**report.to_dict(), "workload": workload})
@@ -1,23 +1,31 @@
 from dependency_injector.wiring import inject, Provide
 
+from src import Config
 from src.application.common.monitor import monitor
-from src.application.contracts import ITileApiService, ITileService
-from src.application.dtos import CostConfiguration
-from src.domain.enums import BenchmarkIteration
+from src.application.contracts import IAsyncTileClientService, ITileApiService, ITileWorkloadService
+from src.application.dtos import CostConfiguration, QueryResult
+from src.domain.enums import BenchmarkIteration, TileCacheMode
 from src.infra.infrastructure import Containers
 
 TOTAL_REQUESTS: int = 100_000
 
 
 @inject
-def vector_tiles_100k_vmt(tile_service: ITileService = Provide[Containers.tile_service]) -> None:
+def vector_tiles_100k_vmt(
+        tile_workload_service: ITileWorkloadService = Provide[Containers.tile_workload_service]
+) -> None:
     """
     Benchmark: 100k vector tile fetches from the on-demand MVT tile server backed by
-    PostGIS. Loads the candidate tile list before timing sequential per-tile HTTP
-    requests.
+    PostGIS. Replays the map-session tile trace for ``Config.TILE_WORKLOAD_SEED``,
+    generating it first if needed, before timing the fetches, which an async
+    HTTP client issues with ``Config.TILE_CLIENT_CONCURRENCY`` requests in flight and
+    HTTP/2 per ``Config.TILE_CLIENT_HTTP2``. The server's tile cache mode is read from
+    its stats endpoint; when a cache is enabled the client revalidates tiles it has
+    already seen with their ``ETag``, like a browser would. Throughput, latency
+    percentiles and the cache hit ratio are stored in the ``query_metrics`` column.
     """
-    tiles = tile_service.load_tiles(number_of_tiles=TOTAL_REQUESTS)
-    _benchmark(tiles=tiles)
+    trace = tile_workload_service.load_trace(number_of_requests=TOTAL_REQUESTS, seed=Config.TILE_WORKLOAD_SEED)
+    _benchmark(tiles=trace.to_tiles(), workload=trace.to_dict())
 
 
 @inject
@@ -28,8 +36,27 @@ def vector_tiles_100k_vmt(tile_service: ITileService = Provide[Containers.tile_s
 )
 def _benchmark(
         tiles: list[tuple[int, int, int]],
-        tile_api_service: ITileApiService = Provide[Containers.tile_api_service]
-) -> None:
-    for tile in tiles:
-        z, x, y = tile
-        tile_api_service.fetch_vmt_tile(z=z, x=x, y=y)
+        workload: dict[str, int],
+        tile_api_service: ITileApiService = Provide[Containers.tile_api_service],
+        async_tile_client_service: IAsyncTileClientService = Provide[Containers.async_tile_client_service]
+) -> QueryResult:
+    cache_mode = tile_api_service.fetch_vmt_cache_stats(reset=True)["mode"]
+
+    report = async_tile_client_service.fetch_vmt_tiles(
+        tiles=tiles,
+        concurrency=Config.TILE_CLIENT_CONCURRENCY,
+        http2=Config.TILE_CLIENT_HTTP2,
+        revalidate=cache_mode != TileCacheMode.NONE.value
+    )
+
+    server_hits = report.cache_statuses.get("HIT", 0) + report.cache_statuses.get("COALESCED", 0)
+    return QueryResult(
+        rows=tiles,
+        metrics={
+            **report.to_dict(),
+            "workload": workload,
+            "cache_mode": cache_mode,
+            "hit_ratio": server_hits / report.requests if report.requests else 0.0,
+            "server_stats": tile_api_service.fetch_vmt_cache_stats(),
+        },
+    )
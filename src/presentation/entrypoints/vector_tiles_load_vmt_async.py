@@ -0,0 +1,42 @@
+from dependency_injector.wiring import inject, Provide
+
+from src import Config
+from src.application.common.monitor import monitor
+from src.application.contracts import ITileLoadService, ITileService
+from src.application.dtos import CostConfiguration, QueryResult
+from src.domain.enums import BenchmarkIteration
+from src.infra.infrastructure import Containers
+
+
+@inject
+def vector_tiles_load_vmt_async(tile_service: ITileService = Provide[Containers.tile_service]) -> None:
+    """
+    Benchmark: concurrent vector tile load against the MVT tile server deployment that
+    reads PostGIS through the asyncpg pool with prepared tile statements. Each concurrency level in
+    ``Config.VMT_LOAD_CONCURRENCY_LEVELS`` replays the same tile list, and the per-level
+    throughput, latency percentiles and error counts are stored in the ``query_metrics``
+    column. Paired with ``vector-tiles-load-vmt-sync``.
+    """
+    tiles = tile_service.load_tiles(number_of_tiles=Config.VMT_LOAD_REQUESTS_PER_LEVEL)
+    _benchmark(tiles=tiles)
+
+
+@inject
+@monitor(
+    query_id="vector-tiles-load-vmt-async",
+    benchmark_iteration=BenchmarkIteration.VECTOR_TILE_LOAD,
+    cost_configuration=CostConfiguration(include_aci=True, include_postgres=True)
+)
+def _benchmark(
+        tiles: list[tuple[int, int, int]],
+        tile_load_service: ITileLoadService = Provide[Containers.tile_load_service]
+) -> QueryResult:
+    reports = [
+        tile_load_service.run_vmt_load(tiles=tiles, server_url=Config.AZURE_VMT_ASYNC_SERVER_URL, concurrency=concurrency)
+        for concurrency in Config.VMT_LOAD_CONCURRENCY_LEVELS
+    ]
+
+    return QueryResult(
+        rows=tiles,
+        metrics={"levels": [report.to_dict() for report in reports]},
+    )
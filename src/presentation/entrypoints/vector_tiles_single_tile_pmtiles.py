@@ -4,7 +4,7 @@ from pmtiles.reader import Reader
 from src import Config
 from src.application.common.monitor import monitor
 from src.application.contracts import IFilePathService, ITileApiService
-from src.application.dtos import CostConfiguration
+from src.application.dtos import CostConfiguration, QueryResult
 from src.domain.enums import StorageContainer, BenchmarkIteration
 from src.infra.infrastructure import Containers
 
@@ -19,7 +19,8 @@ def vector_tiles_single_tile_pmtiles(
     """
     Benchmark: single vector tile fetch (z=13, x=4340, y=2382) from the buildings
     PMTiles archive on Azure Blob Storage. Opens a PMTiles reader against the blob
-    URL before timing the single tile read.
+    URL before timing the single tile read. The reader's range requests and directory cache
+    hits are stored under `pmtiles_reader` in `query_metrics`.
     """
     pmtiles_azure_url = file_path_service.create_url_to_blob_resource(
         container=StorageContainer.TILES,
@@ -35,7 +36,16 @@ def vector_tiles_single_tile_pmtiles(
     benchmark_iteration=BenchmarkIteration.VECTOR_TILE_SINGLE_TILE,
     cost_configuration=CostConfiguration(include_aci=True, include_postgres=True)
 )
-def _benchmark(reader: Reader, tile_api_service: ITileApiService = Provide[Containers.tile_api_service]) -> None:
+def _benchmark(
+        reader: Reader,
+        tile_api_service: ITileApiService = Provide[Containers.tile_api_service]
+) -> QueryResult:
     tile_bytes = tile_api_service.fetch_pmtiles_tile(reader=reader, z=Z, x=X, y=Y)
     if tile_bytes is None:
         raise RuntimeError("Tile not found in archive")
+
+    reader_stats = tile_api_service.get_pmtiles_reader_stats(reader=reader)
+    return QueryResult(
+        rows=[(Z, X, Y)],
+        metrics={"pmtiles_reader": reader_stats.to_dict() if reader_stats is not None else None}
+    )
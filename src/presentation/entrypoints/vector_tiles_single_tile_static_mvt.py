@@ -0,0 +1,39 @@
+from dependency_injector.wiring import inject, Provide
+
+from src import Config
+from src.application.common.monitor import monitor
+from src.application.contracts import IFilePathService, ITileApiService
+from src.application.dtos import CostConfiguration
+from src.domain.enums import StorageContainer, BenchmarkIteration
+from src.infra.infrastructure import Containers
+
+Z, X, Y = 13, 4340, 2382
+
+
+@inject
+def vector_tiles_single_tile_static_mvt(
+        file_path_service: IFilePathService = Provide[Containers.file_path_service]
+) -> None:
+    """
+    Benchmark: single vector tile fetch (z=13, x=4340, y=2382) of the pre-rendered
+    ``mvt/{z}/{x}/{y}.pbf`` blob on Azure Blob Storage. Resolves the blob prefix URL
+    before timing the single GET request.
+    """
+    mvt_azure_url = file_path_service.create_url_to_blob_resource(
+        container=StorageContainer.TILES,
+        blob_path=Config.BUILDINGS_MVT_BLOB_PREFIX
+    )
+
+    _benchmark(base_url=mvt_azure_url)
+
+
+@inject
+@monitor(
+    query_id="vector-tiles-single-tile-static-mvt",
+    benchmark_iteration=BenchmarkIteration.VECTOR_TILE_SINGLE_TILE,
+    cost_configuration=CostConfiguration(include_aci=True, include_blob_storage=True)
+)
+def _benchmark(base_url: str, tile_api_service: ITileApiService = Provide[Containers.tile_api_service]) -> None:
+    tile_bytes = tile_api_service.fetch_static_mvt_tile(base_url=base_url, z=Z, x=X, y=Y)
+    if tile_bytes is None:
+        raise RuntimeError("Tile not found in blob storage")
@@ -0,0 +1,66 @@
+import numpy as np
+import pygeohash
+import pytest
+
+from src.infra.infrastructure.services.vector_service import encode_geohash
+
+PRECISIONS: tuple[int, ...] = (1, 3, 5, 8, 12)
+
+
+def _get_cell_edges(lower: float, upper: float, bits: int, rng: np.random.Generator) -> np.ndarray:
+    # Every edge, including both bounds, at coarse precisions and a random sample of them at fine precisions
+    cell_count = 1 << bits
+    edge_indices = np.arange(cell_count + 1) if cell_count <= 4_096 else rng.integers(0, cell_count + 1, 4_096)
+    return lower + edge_indices * ((upper - lower) / cell_count)
+
+
+def _assert_matches_pygeohash(latitudes: np.ndarray, longitudes: np.ndarray, precision: int) -> None:
+    expected = [pygeohash.encode(latitude, longitude, precision) for latitude, longitude in zip(latitudes, longitudes)]
+    actual = encode_geohash(latitudes=latitudes, longitudes=longitudes, precision=precision)
+
+    assert actual.tolist() == expected
+
+
+@pytest.mark.parametrize("precision", PRECISIONS)
+def test_encode_geohash_matches_pygeohash_for_random_points(precision: int) -> None:
+    rng = np.random.default_rng(precision)
+    latitudes = rng.uniform(-90.0, 90.0, 5_000)
+    longitudes = rng.uniform(-180.0, 180.0, 5_000)
+
+    _assert_matches_pygeohash(latitudes=latitudes, longitudes=longitudes, precision=precision)
+
+
+@pytest.mark.parametrize("precision", PRECISIONS)
+def test_encode_geohash_matches_pygeohash_on_cell_edges(precision: int) -> None:
+    total_bits = 5 * precision
+    rng = np.random.default_rng(precision)
+    latitudes = _get_cell_edges(lower=-90.0, upper=90.0, bits=total_bits // 2, rng=rng)
+    longitudes = _get_cell_edges(lower=-180.0, upper=180.0, bits=(total_bits + 1) // 2, rng=rng)
+    latitude_grid, longitude_grid = np.meshgrid(
+        latitudes[::max(1, len(latitudes) // 64)],
+        longitudes[::max(1, len(longitudes) // 64)]
+    )
+
+    _assert_matches_pygeohash(
+        latitudes=np.concatenate([latitudes, np.zeros(len(longitudes)), latitude_grid.ravel()]),
+        longitudes=np.concatenate([np.zeros(len(latitudes)), longitudes, longitude_grid.ravel()]),
+        precision=precision
+    )
+
+
+@pytest.mark.parametrize("precision", PRECISIONS)
+@pytest.mark.parametrize("latitude, longitude", [
+    (0.0, 0.0),
+    (-45.0, -90.0),
+    (90.0, 180.0),
+    (90.0, -180.0),
+    (-90.0, 180.0),
+    (-90.0, -180.0),
+    (0.0, 180.0),
+    (0.0, -180.0),
+    (90.0, 0.0),
+    (-90.0, 0.0),
+    (59.9139, 10.7522),
+])
+def test_encode_geohash_matches_pygeohash_on_bounds(precision: int, latitude: float, longitude: float) -> None:
+    _assert_matches_pygeohash(latitudes=np.array([latitude]), longitudes=np.array([longitude]), precision=precision)